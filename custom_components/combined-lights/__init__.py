@@ -2,24 +2,161 @@
 
 from __future__ import annotations
 
-from homeassistant.config_entries import ConfigEntry
+import logging
+
+from homeassistant.config_entries import ConfigEntry, ConfigEntryState
 from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import ConfigEntryError
+from homeassistant.helpers.dispatcher import async_dispatcher_send
+
+from .const import (
+    CONF_INSTRUMENTATION,
+    CONF_STAGE_1_BRIGHTNESS_RANGES,
+    CONF_STAGE_1_LIGHTS,
+    CONF_STAGE_2_BRIGHTNESS_RANGES,
+    CONF_STAGE_2_LIGHTS,
+    CONF_STAGE_3_BRIGHTNESS_RANGES,
+    CONF_STAGE_3_LIGHTS,
+    CONF_STAGE_4_BRIGHTNESS_RANGES,
+    CONF_STAGE_4_LIGHTS,
+    CONF_ZONE_BRIGHTNESS_RANGES,
+    CONF_ZONE_LIGHTS,
+    DEFAULT_INSTRUMENTATION,
+    DEFAULT_STAGE_1_BRIGHTNESS_RANGES,
+    DEFAULT_STAGE_2_BRIGHTNESS_RANGES,
+    DEFAULT_STAGE_3_BRIGHTNESS_RANGES,
+    DEFAULT_STAGE_4_BRIGHTNESS_RANGES,
+    DOMAIN,
+    SIGNAL_PLAN_UPDATED,
+)
+from .coordinator import async_get_coordinator
+from .instrumentation import Instrumentation
+from .nesting import compile_flat_zone_plan, parent_entries
+
+_LOGGER = logging.getLogger(__name__)
 
 # Define the platforms this integration will set up.
 PLATFORMS: list[str] = ["light"]
+# Diagnostic sensors are only set up with instrumentation enabled
+INSTRUMENTATION_PLATFORMS: list[str] = [*PLATFORMS, "sensor"]
+
+# Version 1 (lights key, ranges key, default ranges) of the fixed four zones
+_LEGACY_ZONE_KEYS = (
+    (
+        CONF_STAGE_1_LIGHTS,
+        CONF_STAGE_1_BRIGHTNESS_RANGES,
+        DEFAULT_STAGE_1_BRIGHTNESS_RANGES,
+    ),
+    (
+        CONF_STAGE_2_LIGHTS,
+        CONF_STAGE_2_BRIGHTNESS_RANGES,
+        DEFAULT_STAGE_2_BRIGHTNESS_RANGES,
+    ),
+    (
+        CONF_STAGE_3_LIGHTS,
+        CONF_STAGE_3_BRIGHTNESS_RANGES,
+        DEFAULT_STAGE_3_BRIGHTNESS_RANGES,
+    ),
+    (
+        CONF_STAGE_4_LIGHTS,
+        CONF_STAGE_4_BRIGHTNESS_RANGES,
+        DEFAULT_STAGE_4_BRIGHTNESS_RANGES,
+    ),
+)
 
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up Combined Lights from a config entry."""
+    # Compile the configuration once; entities read the plan on hot paths.
+    # Nested combined lights are flattened so commands go to the leaf lights.
+    try:
+        entry.runtime_data = compile_flat_zone_plan(hass, entry.entry_id, entry.data)
+    except ValueError as err:
+        raise ConfigEntryError(f"Invalid zone configuration: {err}") from err
+    entry.async_on_unload(entry.add_update_listener(async_update_listener))
+
+    platforms = PLATFORMS
+    if entry.data.get(CONF_INSTRUMENTATION, DEFAULT_INSTRUMENTATION):
+        async_get_coordinator(hass).instrumentation[entry.entry_id] = Instrumentation()
+        platforms = INSTRUMENTATION_PLATFORMS
+
     # Forward the setup to the light platform, providing the list of platforms.
     # This will be called on initial setup and after reconfiguration.
-    await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+    await hass.config_entries.async_forward_entry_setups(entry, platforms)
 
     return True
 
 
+async def async_migrate_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
+    """Migrate an old config entry."""
+    if entry.version > 2:
+        # Downgraded from a future version
+        return False
+
+    if entry.version == 1:
+        # Move the fixed stage_1..stage_4 keys into per-zone lists
+        data = dict(entry.data)
+        zone_lights = []
+        zone_ranges = []
+        for lights_key, ranges_key, default_ranges in _LEGACY_ZONE_KEYS:
+            zone_lights.append(list(data.pop(lights_key, [])))
+            zone_ranges.append(list(data.pop(ranges_key, default_ranges)))
+        data[CONF_ZONE_LIGHTS] = zone_lights
+        data[CONF_ZONE_BRIGHTNESS_RANGES] = zone_ranges
+        hass.config_entries.async_update_entry(entry, data=data, version=2)
+        _LOGGER.debug("Migrated %s to configuration version 2", entry.title)
+
+    return True
+
+
+async def async_update_listener(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Recompile the zone plan when the config entry is updated.
+
+    The entities pick up the new plan in place, without a reload. Combined
+    lights this entry is flattened into are recompiled as well. Only turning
+    instrumentation on or off reloads the entry, as it adds or removes the
+    sensor platform.
+    """
+    updated_entries = [entry, *parent_entries(hass, entry.entry_id)]
+    instrumented = entry.entry_id in async_get_coordinator(hass).instrumentation
+    if instrumented != bool(
+        entry.data.get(CONF_INSTRUMENTATION, DEFAULT_INSTRUMENTATION)
+    ):
+        # Setting the entry up again compiles its plan
+        hass.config_entries.async_schedule_reload(entry.entry_id)
+        updated_entries.remove(entry)
+
+    for updated_entry in updated_entries:
+        try:
+            updated_entry.runtime_data = compile_flat_zone_plan(
+                hass, updated_entry.entry_id, updated_entry.data
+            )
+        except ValueError as err:
+            _LOGGER.error(
+                "Keeping the previous zones of %s: %s", updated_entry.title, err
+            )
+            continue
+        async_dispatcher_send(hass, SIGNAL_PLAN_UPDATED.format(updated_entry.entry_id))
+
+
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
     # Unload the platforms that were set up.
     # This will be called before reconfiguration to clean up the current setup.
-    return await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
+    # The entry data may already be updated, so the platforms set up are
+    # told by the instrumentation rather than by the option.
+    instrumentation = async_get_coordinator(hass).instrumentation
+    platforms = (
+        INSTRUMENTATION_PLATFORMS if entry.entry_id in instrumentation else PLATFORMS
+    )
+    unloaded = await hass.config_entries.async_unload_platforms(entry, platforms)
+    if unloaded:
+        instrumentation.pop(entry.entry_id, None)
+        if not any(
+            other.state is ConfigEntryState.LOADED
+            for other in hass.config_entries.async_entries(DOMAIN)
+            if other.entry_id != entry.entry_id
+        ):
+            # The last entry is gone; a new coordinator starts with the next
+            hass.data.pop(DOMAIN, None)
+    return unloaded
@@ -0,0 +1,90 @@
+"""Incrementally maintained child light state for Combined Lights."""
+
+from __future__ import annotations
+
+from homeassistant.components.light import ATTR_BRIGHTNESS
+from homeassistant.const import STATE_ON, STATE_UNAVAILABLE, STATE_UNKNOWN
+from homeassistant.core import State
+
+from .zone_plan import ZonePlan
+
+
+class ZoneAggregate:
+    """Running per-zone counters of the child lights that are on.
+
+    Each child's last counted contribution is remembered, so a state change
+    is applied by removing the old contribution and adding the new one
+    without scanning the other children. The brightness of calibrated
+    children is counted as the zone brightness it corresponds to.
+    """
+
+    __slots__ = (
+        "_calibration_inverse",
+        "_child_zones",
+        "_contributions",
+        "unavailable",
+        "zone_brightness_count",
+        "zone_brightness_sum",
+    )
+
+    def __init__(self, plan: ZonePlan) -> None:
+        """Initialize empty counters for the zones of a plan."""
+        child_zones: dict[str, list[int]] = {}
+        for zone, lights in enumerate(plan.zone_lights):
+            for entity_id in lights:
+                child_zones.setdefault(entity_id, []).append(zone)
+        self._child_zones = {
+            entity_id: tuple(zones) for entity_id, zones in child_zones.items()
+        }
+        self._calibration_inverse = plan.calibration_inverse
+        # Zone brightness (None if not reported) of every child currently on
+        self._contributions: dict[str, int | None] = {}
+        # Children without a known state yet, or unavailable
+        self.unavailable: set[str] = set(self._child_zones)
+
+        zone_count = len(plan.zone_lights)
+        self.zone_brightness_sum = [0] * zone_count
+        self.zone_brightness_count = [0] * zone_count
+
+    @property
+    def lights_on(self) -> int:
+        """Return the number of distinct child lights that are on."""
+        return len(self._contributions)
+
+    def update(self, entity_id: str, state: State | None) -> None:
+        """Replace the contribution of a child with its new state."""
+        zones = self._child_zones.get(entity_id)
+        if zones is None:
+            return
+
+        if state is None or state.state in (STATE_UNAVAILABLE, STATE_UNKNOWN):
+            self.unavailable.add(entity_id)
+        else:
+            self.unavailable.discard(entity_id)
+
+        contributions = self._contributions
+        if entity_id in contributions:
+            self._apply(zones, contributions.pop(entity_id), -1)
+
+        if state is not None and state.state == STATE_ON:
+            brightness = state.attributes.get(ATTR_BRIGHTNESS)
+            inverse = self._calibration_inverse.get(entity_id)
+            if inverse is not None and brightness is not None:
+                brightness = inverse[min(255, max(0, int(brightness)))]
+            contributions[entity_id] = brightness
+            self._apply(zones, brightness, 1)
+
+    def _apply(self, zones: tuple[int, ...], brightness: int | None, sign: int) -> None:
+        """Add (sign=1) or remove (sign=-1) a contribution from its zones."""
+        if brightness is None:
+            return
+        for zone in zones:
+            self.zone_brightness_sum[zone] += sign * brightness
+            self.zone_brightness_count[zone] += sign
+
+    def zone_average(self, zone: int) -> int | None:
+        """Get average brightness of the lights that are on in a zone."""
+        count = self.zone_brightness_count[zone]
+        if not count:
+            return None
+        return int(self.zone_brightness_sum[zone] / count)
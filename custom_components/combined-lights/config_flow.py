@@ -2,36 +2,64 @@
 
 from __future__ import annotations
 
+from collections.abc import Mapping
 import logging
 from typing import Any
 
 import voluptuous as vol
 
-from homeassistant.config_entries import ConfigFlow, ConfigFlowResult
+from homeassistant.config_entries import (
+    SOURCE_RECONFIGURE,
+    ConfigEntryState,
+    ConfigFlow,
+    ConfigFlowResult,
+)
 from homeassistant.const import CONF_NAME
 from homeassistant.helpers import selector
 
 from .const import (
     CONF_BREAKPOINTS,
     CONF_BRIGHTNESS_CURVE,
-    CONF_STAGE_1_BRIGHTNESS_RANGES,
-    CONF_STAGE_1_LIGHTS,
-    CONF_STAGE_2_BRIGHTNESS_RANGES,
-    CONF_STAGE_2_LIGHTS,
-    CONF_STAGE_3_BRIGHTNESS_RANGES,
-    CONF_STAGE_3_LIGHTS,
-    CONF_STAGE_4_BRIGHTNESS_RANGES,
-    CONF_STAGE_4_LIGHTS,
+    CONF_COMMAND_TOLERANCE,
+    CONF_EXTERNAL_CHANGE_EVENTS,
+    CONF_EXTERNAL_CHANGE_WINDOW_MS,
+    CONF_INSTRUMENTATION,
+    CONF_LIGHT_CALIBRATION,
+    CONF_MAX_CONCURRENT_COMMANDS,
+    CONF_MIN_DISPATCH_INTERVAL_MS,
+    CONF_TRANSITION_STEP_RATE,
+    CONF_UPDATE_COALESCE_MS,
+    CONF_UPDATE_MAX_LATENCY_MS,
+    CONF_ZONE_BRIGHTNESS_RANGES,
+    CONF_ZONE_COUNT,
+    CONF_ZONE_LIGHTS,
     CURVE_CUBIC,
     CURVE_LINEAR,
     CURVE_QUADRATIC,
-    DEFAULT_BREAKPOINTS,
     DEFAULT_BRIGHTNESS_CURVE,
-    DEFAULT_STAGE_1_BRIGHTNESS_RANGES,
-    DEFAULT_STAGE_2_BRIGHTNESS_RANGES,
-    DEFAULT_STAGE_3_BRIGHTNESS_RANGES,
-    DEFAULT_STAGE_4_BRIGHTNESS_RANGES,
+    DEFAULT_COMMAND_TOLERANCE,
+    DEFAULT_EXTERNAL_CHANGE_EVENTS,
+    DEFAULT_EXTERNAL_CHANGE_WINDOW_MS,
+    DEFAULT_INSTRUMENTATION,
+    DEFAULT_LIGHT_CALIBRATION,
+    DEFAULT_MAX_CONCURRENT_COMMANDS,
+    DEFAULT_MIN_DISPATCH_INTERVAL_MS,
+    DEFAULT_TRANSITION_STEP_RATE,
+    DEFAULT_UPDATE_COALESCE_MS,
+    DEFAULT_UPDATE_MAX_LATENCY_MS,
+    DEFAULT_ZONE_COUNT,
     DOMAIN,
+    EXTERNAL_CHANGE_EVENTS_OFF,
+    EXTERNAL_CHANGE_EVENTS_PER_EVENT,
+    EXTERNAL_CHANGE_EVENTS_SUMMARY,
+    MAX_ZONES,
+    MIN_ZONES,
+)
+from .nesting import NestingCycleError, check_nesting, compile_flat_zone_plan
+from .zone_plan import (
+    ZonePlan,
+    default_breakpoints,
+    default_zone_ranges,
 )
 
 _LOGGER = logging.getLogger(__name__)
@@ -54,26 +82,52 @@ def create_basic_schema(defaults: dict[str, Any] | None = None) -> vol.Schema:
             vol.Required(
                 CONF_NAME, default=defaults.get(CONF_NAME, "")
             ): selector.TextSelector(),
+            vol.Required(
+                CONF_ZONE_COUNT,
+                default=len(defaults.get(CONF_ZONE_LIGHTS, [])) or DEFAULT_ZONE_COUNT,
+            ): selector.NumberSelector(
+                selector.NumberSelectorConfig(
+                    min=MIN_ZONES,
+                    max=MAX_ZONES,
+                    step=1,
+                    mode=selector.NumberSelectorMode.BOX,
+                )
+            ),
+        }
+    )
+
+
+def zone_lights_key(zone: int) -> str:
+    """Return the form field of the lights of a zone (1-based)."""
+    return f"zone_{zone}_lights"
+
+
+def create_zones_schema(
+    zone_count: int, defaults: dict[str, Any] | None = None
+) -> vol.Schema:
+    """Create the light selection schema for a number of zones."""
+    defaults = defaults or {}
+    zone_lights = defaults.get(CONF_ZONE_LIGHTS, [])
+
+    return vol.Schema(
+        {
             vol.Optional(
-                CONF_STAGE_1_LIGHTS,
-                default=defaults.get(CONF_STAGE_1_LIGHTS, []),
-            ): create_light_entity_selector(),
-            vol.Optional(
-                CONF_STAGE_2_LIGHTS,
-                default=defaults.get(CONF_STAGE_2_LIGHTS, []),
-            ): create_light_entity_selector(),
-            vol.Optional(
-                CONF_STAGE_3_LIGHTS,
-                default=defaults.get(CONF_STAGE_3_LIGHTS, []),
-            ): create_light_entity_selector(),
-            vol.Optional(
-                CONF_STAGE_4_LIGHTS,
-                default=defaults.get(CONF_STAGE_4_LIGHTS, []),
-            ): create_light_entity_selector(),
+                zone_lights_key(zone),
+                default=zone_lights[zone - 1] if zone <= len(zone_lights) else [],
+            ): create_light_entity_selector()
+            for zone in range(1, zone_count + 1)
         }
     )
 
 
+def parse_zone_lights(zone_count: int, user_input: dict[str, Any]) -> list[list[str]]:
+    """Collect the selected lights into one list per zone."""
+    return [
+        list(user_input.get(zone_lights_key(zone), []))
+        for zone in range(1, zone_count + 1)
+    ]
+
+
 def create_curve_selector() -> selector.SelectSelector:
     """Create brightness curve selector for reuse."""
     return selector.SelectSelector(
@@ -93,38 +147,72 @@ def create_curve_selector() -> selector.SelectSelector:
     )
 
 
-def create_advanced_schema(defaults: dict[str, Any] | None = None) -> vol.Schema:
-    """Create advanced configuration schema using YAML editor."""
+def create_advanced_schema(
+    zone_count: int,
+    defaults: dict[str, Any] | None = None,
+    submitted: dict[str, Any] | None = None,
+) -> vol.Schema:
+    """Create advanced configuration schema using YAML editor.
+
+    A submitted advanced configuration that was rejected is shown again as
+    entered, so it can be corrected.
+    """
     defaults = defaults or {}
 
+    # Stages and ranges only carry over while the number of zones is unchanged
+    if len(defaults.get(CONF_ZONE_LIGHTS, [])) == zone_count:
+        breakpoints = defaults.get(CONF_BREAKPOINTS, default_breakpoints(zone_count))
+        zone_ranges = defaults.get(
+            CONF_ZONE_BRIGHTNESS_RANGES, default_zone_ranges(zone_count)
+        )
+    else:
+        breakpoints = default_breakpoints(zone_count)
+        zone_ranges = default_zone_ranges(zone_count)
+
     # Create the default YAML configuration with simplified range format
     default_config = {
-        CONF_BREAKPOINTS: defaults.get(CONF_BREAKPOINTS, DEFAULT_BREAKPOINTS),
+        CONF_BREAKPOINTS: breakpoints,
         CONF_BRIGHTNESS_CURVE: defaults.get(
             CONF_BRIGHTNESS_CURVE, DEFAULT_BRIGHTNESS_CURVE
         ),
-        CONF_STAGE_1_BRIGHTNESS_RANGES: format_ranges_for_yaml(
-            defaults.get(
-                CONF_STAGE_1_BRIGHTNESS_RANGES, DEFAULT_STAGE_1_BRIGHTNESS_RANGES
-            )
+        CONF_ZONE_BRIGHTNESS_RANGES: [
+            format_ranges_for_yaml(ranges) for ranges in zone_ranges
+        ],
+        CONF_MAX_CONCURRENT_COMMANDS: defaults.get(
+            CONF_MAX_CONCURRENT_COMMANDS, DEFAULT_MAX_CONCURRENT_COMMANDS
         ),
-        CONF_STAGE_2_BRIGHTNESS_RANGES: format_ranges_for_yaml(
-            defaults.get(
-                CONF_STAGE_2_BRIGHTNESS_RANGES, DEFAULT_STAGE_2_BRIGHTNESS_RANGES
-            )
+        CONF_COMMAND_TOLERANCE: defaults.get(
+            CONF_COMMAND_TOLERANCE, DEFAULT_COMMAND_TOLERANCE
         ),
-        CONF_STAGE_3_BRIGHTNESS_RANGES: format_ranges_for_yaml(
-            defaults.get(
-                CONF_STAGE_3_BRIGHTNESS_RANGES, DEFAULT_STAGE_3_BRIGHTNESS_RANGES
-            )
+        CONF_UPDATE_COALESCE_MS: defaults.get(
+            CONF_UPDATE_COALESCE_MS, DEFAULT_UPDATE_COALESCE_MS
         ),
-        CONF_STAGE_4_BRIGHTNESS_RANGES: format_ranges_for_yaml(
-            defaults.get(
-                CONF_STAGE_4_BRIGHTNESS_RANGES, DEFAULT_STAGE_4_BRIGHTNESS_RANGES
-            )
+        CONF_UPDATE_MAX_LATENCY_MS: defaults.get(
+            CONF_UPDATE_MAX_LATENCY_MS, DEFAULT_UPDATE_MAX_LATENCY_MS
+        ),
+        CONF_MIN_DISPATCH_INTERVAL_MS: defaults.get(
+            CONF_MIN_DISPATCH_INTERVAL_MS, DEFAULT_MIN_DISPATCH_INTERVAL_MS
+        ),
+        CONF_TRANSITION_STEP_RATE: defaults.get(
+            CONF_TRANSITION_STEP_RATE, DEFAULT_TRANSITION_STEP_RATE
+        ),
+        CONF_EXTERNAL_CHANGE_EVENTS: defaults.get(
+            CONF_EXTERNAL_CHANGE_EVENTS, DEFAULT_EXTERNAL_CHANGE_EVENTS
+        ),
+        CONF_EXTERNAL_CHANGE_WINDOW_MS: defaults.get(
+            CONF_EXTERNAL_CHANGE_WINDOW_MS, DEFAULT_EXTERNAL_CHANGE_WINDOW_MS
+        ),
+        CONF_INSTRUMENTATION: defaults.get(
+            CONF_INSTRUMENTATION, DEFAULT_INSTRUMENTATION
+        ),
+        CONF_LIGHT_CALIBRATION: defaults.get(
+            CONF_LIGHT_CALIBRATION, DEFAULT_LIGHT_CALIBRATION
         ),
     }
 
+    if submitted is not None and "advanced_config" in submitted:
+        default_config = submitted["advanced_config"]
+
     return vol.Schema(
         {
             vol.Required(
@@ -142,46 +230,100 @@ def merge_config_with_defaults(
     """Merge configuration data with defaults for missing values."""
     # Extract the advanced config from the YAML input
     advanced_config = user_input.get("advanced_config", {})
+    if not isinstance(advanced_config, Mapping):
+        raise ValueError("Advanced configuration must be a mapping of options")  # noqa: TRY004
 
-    # Parse brightness ranges from simplified format
-    stage_1_ranges = parse_ranges_from_yaml(
-        advanced_config.get(
-            CONF_STAGE_1_BRIGHTNESS_RANGES,
-            format_ranges_for_yaml(DEFAULT_STAGE_1_BRIGHTNESS_RANGES),
-        )
-    )
-    stage_2_ranges = parse_ranges_from_yaml(
-        advanced_config.get(
-            CONF_STAGE_2_BRIGHTNESS_RANGES,
-            format_ranges_for_yaml(DEFAULT_STAGE_2_BRIGHTNESS_RANGES),
-        )
-    )
-    stage_3_ranges = parse_ranges_from_yaml(
-        advanced_config.get(
-            CONF_STAGE_3_BRIGHTNESS_RANGES,
-            format_ranges_for_yaml(DEFAULT_STAGE_3_BRIGHTNESS_RANGES),
-        )
-    )
-    stage_4_ranges = parse_ranges_from_yaml(
-        advanced_config.get(
-            CONF_STAGE_4_BRIGHTNESS_RANGES,
-            format_ranges_for_yaml(DEFAULT_STAGE_4_BRIGHTNESS_RANGES),
+    zone_count = len(config_data.get(CONF_ZONE_LIGHTS, []))
+
+    # Parse brightness ranges from simplified format, one list per zone
+    zone_ranges = [
+        parse_ranges_from_yaml(ranges)
+        for ranges in advanced_config.get(
+            CONF_ZONE_BRIGHTNESS_RANGES, default_zone_ranges(zone_count)
         )
-    )
+    ]
 
     return {
         **config_data,
-        CONF_BREAKPOINTS: advanced_config.get(CONF_BREAKPOINTS, DEFAULT_BREAKPOINTS),
+        CONF_BREAKPOINTS: advanced_config.get(
+            CONF_BREAKPOINTS, default_breakpoints(zone_count)
+        ),
         CONF_BRIGHTNESS_CURVE: advanced_config.get(
             CONF_BRIGHTNESS_CURVE, DEFAULT_BRIGHTNESS_CURVE
         ),
-        CONF_STAGE_1_BRIGHTNESS_RANGES: stage_1_ranges,
-        CONF_STAGE_2_BRIGHTNESS_RANGES: stage_2_ranges,
-        CONF_STAGE_3_BRIGHTNESS_RANGES: stage_3_ranges,
-        CONF_STAGE_4_BRIGHTNESS_RANGES: stage_4_ranges,
+        CONF_ZONE_BRIGHTNESS_RANGES: zone_ranges,
+        CONF_MAX_CONCURRENT_COMMANDS: int(
+            advanced_config.get(
+                CONF_MAX_CONCURRENT_COMMANDS, DEFAULT_MAX_CONCURRENT_COMMANDS
+            )
+        ),
+        CONF_COMMAND_TOLERANCE: int(
+            advanced_config.get(CONF_COMMAND_TOLERANCE, DEFAULT_COMMAND_TOLERANCE)
+        ),
+        CONF_UPDATE_COALESCE_MS: int(
+            advanced_config.get(CONF_UPDATE_COALESCE_MS, DEFAULT_UPDATE_COALESCE_MS)
+        ),
+        CONF_UPDATE_MAX_LATENCY_MS: int(
+            advanced_config.get(
+                CONF_UPDATE_MAX_LATENCY_MS, DEFAULT_UPDATE_MAX_LATENCY_MS
+            )
+        ),
+        CONF_MIN_DISPATCH_INTERVAL_MS: int(
+            advanced_config.get(
+                CONF_MIN_DISPATCH_INTERVAL_MS, DEFAULT_MIN_DISPATCH_INTERVAL_MS
+            )
+        ),
+        CONF_TRANSITION_STEP_RATE: float(
+            advanced_config.get(CONF_TRANSITION_STEP_RATE, DEFAULT_TRANSITION_STEP_RATE)
+        ),
+        CONF_EXTERNAL_CHANGE_EVENTS: str(
+            advanced_config.get(
+                CONF_EXTERNAL_CHANGE_EVENTS, DEFAULT_EXTERNAL_CHANGE_EVENTS
+            )
+        ),
+        CONF_EXTERNAL_CHANGE_WINDOW_MS: int(
+            advanced_config.get(
+                CONF_EXTERNAL_CHANGE_WINDOW_MS, DEFAULT_EXTERNAL_CHANGE_WINDOW_MS
+            )
+        ),
+        CONF_INSTRUMENTATION: bool(
+            advanced_config.get(CONF_INSTRUMENTATION, DEFAULT_INSTRUMENTATION)
+        ),
+        CONF_LIGHT_CALIBRATION: dict(
+            advanced_config.get(CONF_LIGHT_CALIBRATION) or DEFAULT_LIGHT_CALIBRATION
+        ),
     }
 
 
+def validate_runtime_options(config_data: Mapping[str, Any]) -> None:
+    """Reject runtime options the combined light cannot work with."""
+    if config_data[CONF_MAX_CONCURRENT_COMMANDS] < 1:
+        raise ValueError("max_concurrent_commands must be at least 1")
+    for option in (
+        CONF_COMMAND_TOLERANCE,
+        CONF_UPDATE_COALESCE_MS,
+        CONF_UPDATE_MAX_LATENCY_MS,
+        CONF_MIN_DISPATCH_INTERVAL_MS,
+        CONF_EXTERNAL_CHANGE_WINDOW_MS,
+    ):
+        if config_data[option] < 0:
+            raise ValueError(f"{option} must not be negative: {config_data[option]}")
+    if not config_data[CONF_TRANSITION_STEP_RATE] > 0:
+        raise ValueError(
+            "transition_step_rate must be above 0: "
+            f"{config_data[CONF_TRANSITION_STEP_RATE]}"
+        )
+    events = config_data[CONF_EXTERNAL_CHANGE_EVENTS]
+    if events not in (
+        EXTERNAL_CHANGE_EVENTS_PER_EVENT,
+        EXTERNAL_CHANGE_EVENTS_SUMMARY,
+        EXTERNAL_CHANGE_EVENTS_OFF,
+    ):
+        raise ValueError(
+            f"Unknown external_change_events {events!r}, use per_event, summary or off"
+        )
+
+
 def format_ranges_for_yaml(ranges: list[list[int]]) -> list[str]:
     """Convert [[min, max], [min, max], ...] to ['min, max', 'min, max', ...] for better YAML display."""
     return [f"{range_pair[0]}, {range_pair[1]}" for range_pair in ranges]
@@ -211,14 +353,72 @@ def parse_ranges_from_yaml(
     return result
 
 
+def format_plan_preview(plan: ZonePlan) -> str:
+    """Return a markdown table of every zone's brightness at the stage edges."""
+    positions = sorted(
+        {
+            1,
+            100,
+            *(int(edge) for edge in plan.breakpoints),
+            *(int(edge) + 1 for edge in plan.breakpoints),
+        }
+    )
+    zone_headers = [f"Zone {zone}" for zone in range(1, len(plan.zone_tables) + 1)]
+    lines = [
+        "| Slider | Stage | " + " | ".join(zone_headers) + " |",
+        "|---" * (len(zone_headers) + 2) + "|",
+    ]
+    for position in positions:
+        brightness = min(255, position * 255 // 100)
+        zone_values = [
+            f"{table[brightness] * 100 // 255}%" if table[brightness] else "off"
+            for table in plan.zone_tables
+        ]
+        lines.append(
+            f"| {position}% | {plan.stage_table[brightness] + 1} | "
+            + " | ".join(zone_values)
+            + " |"
+        )
+    return "\n".join(lines)
+
+
 class CombinedLightsConfigFlow(ConfigFlow, domain=DOMAIN):
     """Handle a config flow for Combined Lights."""
 
-    VERSION = 1
+    VERSION = 2
 
     def __init__(self) -> None:
         """Initialize config flow."""
         self._config_data: dict[str, Any] = {}
+        self._zone_count = DEFAULT_ZONE_COUNT
+        self._plan: ZonePlan | None = None
+
+    def _validate_advanced(
+        self, user_input: dict[str, Any], errors: dict[str, str]
+    ) -> dict[str, str]:
+        """Compile the advanced configuration, the same way setup does.
+
+        On success the configuration and its zone plan are kept for the
+        preview step; otherwise an error is set and its placeholders returned.
+        """
+        try:
+            config_data = merge_config_with_defaults(self._config_data, user_input)
+            validate_runtime_options(config_data)
+            # Nested combined lights are flattened, as they are at runtime
+            plan = compile_flat_zone_plan(
+                self.hass, self.context.get("entry_id"), config_data
+            )
+        except NestingCycleError as err:
+            _LOGGER.warning("Rejected zone lights: %s", err)
+            errors["base"] = "nested_cycle"
+            return {"error": str(err)}
+        except (TypeError, ValueError) as err:
+            _LOGGER.debug("Rejected advanced configuration: %s", err)
+            errors["base"] = "invalid_zone_config"
+            return {"error": str(err)}
+        self._config_data = config_data
+        self._plan = plan
+        return {}
 
     async def async_step_user(
         self, user_input: dict[str, Any] | None = None
@@ -228,10 +428,11 @@ class CombinedLightsConfigFlow(ConfigFlow, domain=DOMAIN):
 
         if user_input is not None:
             # Store basic configuration
-            self._config_data.update(user_input)
+            self._config_data[CONF_NAME] = user_input[CONF_NAME]
+            self._zone_count = int(user_input[CONF_ZONE_COUNT])
 
-            # Proceed to advanced configuration
-            return await self.async_step_advanced()
+            # Proceed to light selection
+            return await self.async_step_zones()
 
         # Use utility function to create schema
         data_schema = create_basic_schema()
@@ -241,6 +442,29 @@ class CombinedLightsConfigFlow(ConfigFlow, domain=DOMAIN):
             step_id="user",
             data_schema=data_schema,
             errors=errors,
+            description_placeholders={
+                "description": "Name the controller and choose how many light zones it has. Next step will let you pick the lights of every zone."
+            },
+        )
+
+    async def async_step_zones(
+        self, user_input: dict[str, Any] | None = None
+    ) -> ConfigFlowResult:
+        """Handle the light selection step."""
+        errors: dict[str, str] = {}
+
+        if user_input is not None:
+            self._config_data[CONF_ZONE_LIGHTS] = parse_zone_lights(
+                self._zone_count, user_input
+            )
+
+            # Proceed to advanced configuration
+            return await self.async_step_advanced()
+
+        return self.async_show_form(
+            step_id="zones",
+            data_schema=create_zones_schema(self._zone_count),
+            errors=errors,
             description_placeholders={
                 "description": "Configure your light zones. Next step will allow customizing breakpoints and brightness ranges."
             },
@@ -252,36 +476,41 @@ class CombinedLightsConfigFlow(ConfigFlow, domain=DOMAIN):
         """Handle advanced configuration step."""
         errors: dict[str, str] = {}
 
-        if user_input is not None:
-            # Merge advanced configuration with defaults using utility function
-            config_data = merge_config_with_defaults(self._config_data, user_input)
+        placeholders: dict[str, str] = {}
 
-            # Create the config entry
-            return self.async_create_entry(
-                title=self._config_data[CONF_NAME], data=config_data
-            )
+        if user_input is not None:
+            # Compile and check the configuration, then preview it
+            placeholders = self._validate_advanced(user_input, errors)
+            if not errors:
+                return await self.async_step_preview()
 
         # Use utility function to create advanced schema
-        data_schema = create_advanced_schema()
+        data_schema = create_advanced_schema(self._zone_count, submitted=user_input)
 
         return self.async_show_form(
             step_id="advanced",
             data_schema=data_schema,
             errors=errors,
             description_placeholders={
+                **placeholders,
                 "description": (
                     "Advanced: Configure breakpoints and brightness ranges using YAML.\n\n"
                     "Example configuration:\n"
                     "- breakpoints: [30, 60, 90] (creates stages 1-30%, 31-60%, 61-90%, 91-100%)\n"
                     "- brightness_curve: linear (or quadratic, cubic)\n"
-                    "- brightness ranges: use simplified format like:\n"
-                    "  stage_1_brightness_ranges:\n"
-                    "    - '5, 20'   # Stage 1: min 5%, max 20%\n"
-                    "    - '10, 40'  # Stage 2: min 10%, max 40%\n"
-                    "    - '20, 70'  # Stage 3: min 20%, max 70%\n"
-                    "    - '50, 100' # Stage 4: min 50%, max 100%\n"
-                    "- Use '0, 0' to turn lights off in that stage"
-                )
+                    "- zone_brightness_ranges: one list per zone with one range per stage, e.g. for zone 1:\n"
+                    "    - ['5, 20', '10, 40', '20, 70', '50, 100']\n"
+                    "    # Stage 1: min 5%, max 20% ... Stage 4: min 50%, max 100%\n"
+                    "- Use '0, 0' to turn lights off in that stage\n"
+                    "- max_concurrent_commands: 8 (child commands sent at once, 1 = one by one)\n"
+                    "- command_tolerance: 1 (skip lights already within this brightness of the target)\n"
+                    "- update_coalesce_ms: 50 / update_max_latency_ms: 250 (merge bursts of light changes)\n"
+                    "- min_dispatch_interval_ms: 100 (while dragging the slider only the latest value is sent)\n"
+                    "- transition_step_rate: 2 (fade steps per second for lights without transition support)\n"
+                    "- external_change_events: per_event (or summary, off) / external_change_window_ms: 1000 (combined_light.external_change events)\n"
+                    "- instrumentation: false (time the hot paths; adds diagnostic sensors)\n"
+                    "- light_calibration: per light, e.g. light.strip: {min: 3, max: 90, gamma: 1.0, off_threshold: 1} (brightness % the light gets while on, and the zone brightness % below which it stays off)"
+                ),
             },
         )
 
@@ -300,10 +529,14 @@ class CombinedLightsConfigFlow(ConfigFlow, domain=DOMAIN):
 
         if user_input is not None:
             # Store basic configuration for reconfiguration
-            self._config_data = {**config_entry.data, **user_input}
+            self._config_data = {
+                **config_entry.data,
+                CONF_NAME: user_input[CONF_NAME],
+            }
+            self._zone_count = int(user_input[CONF_ZONE_COUNT])
 
-            # Proceed to advanced configuration
-            return await self.async_step_reconfigure_advanced()
+            # Proceed to light selection
+            return await self.async_step_reconfigure_zones()
 
         # Use utility function to create schema with current values as defaults
         data_schema = create_basic_schema(config_entry.data)
@@ -312,6 +545,44 @@ class CombinedLightsConfigFlow(ConfigFlow, domain=DOMAIN):
             step_id="reconfigure",
             data_schema=data_schema,
             errors=errors,
+            description_placeholders={
+                "description": "Update the name and the number of light zones. Next step will let you pick the lights of every zone."
+            },
+        )
+
+    async def async_step_reconfigure_zones(
+        self, user_input: dict[str, Any] | None = None
+    ) -> ConfigFlowResult:
+        """Handle light selection during reconfiguration."""
+        errors: dict[str, str] = {}
+
+        if user_input is not None:
+            self._config_data[CONF_ZONE_LIGHTS] = parse_zone_lights(
+                self._zone_count, user_input
+            )
+
+            # A combined light must not end up containing itself
+            try:
+                check_nesting(
+                    self.hass,
+                    self.context["entry_id"],
+                    (
+                        light
+                        for lights in self._config_data[CONF_ZONE_LIGHTS]
+                        for light in lights
+                    ),
+                )
+            except NestingCycleError as err:
+                _LOGGER.warning("Rejected zone lights: %s", err)
+                errors["base"] = "nested_cycle"
+            else:
+                # Proceed to advanced configuration
+                return await self.async_step_reconfigure_advanced()
+
+        return self.async_show_form(
+            step_id="reconfigure_zones",
+            data_schema=create_zones_schema(self._zone_count, self._config_data),
+            errors=errors,
             description_placeholders={
                 "description": "Update your light zones configuration. Next step will allow customizing breakpoints and brightness ranges."
             },
@@ -329,37 +600,78 @@ class CombinedLightsConfigFlow(ConfigFlow, domain=DOMAIN):
         if config_entry is None:
             return self.async_abort(reason="entry_not_found")
 
+        placeholders: dict[str, str] = {}
+
         if user_input is not None:
-            # Merge advanced configuration with current config data using utility function
-            updated_config = merge_config_with_defaults(self._config_data, user_input)
-
-            # Update the config entry
-            return self.async_update_reload_and_abort(
-                config_entry,
-                data_updates=updated_config,
-                reason="reconfigure_successful",
-            )
+            # Compile and check the configuration, then preview it
+            placeholders = self._validate_advanced(user_input, errors)
+            if not errors:
+                return await self.async_step_preview()
 
         # Use utility function to create advanced schema with current values as defaults
-        data_schema = create_advanced_schema(config_entry.data)
+        data_schema = create_advanced_schema(
+            self._zone_count, config_entry.data, user_input
+        )
 
         return self.async_show_form(
             step_id="reconfigure_advanced",
             data_schema=data_schema,
             errors=errors,
             description_placeholders={
+                **placeholders,
                 "description": (
                     "Advanced: Update breakpoints and brightness ranges using YAML.\n\n"
                     "Example configuration:\n"
                     "- breakpoints: [30, 60, 90] (creates stages 1-30%, 31-60%, 61-90%, 91-100%)\n"
                     "- brightness_curve: linear (or quadratic, cubic)\n"
-                    "- brightness ranges: use simplified format like:\n"
-                    "  stage_1_brightness_ranges:\n"
-                    "    - '5, 20'   # Stage 1: min 5%, max 20%\n"
-                    "    - '10, 40'  # Stage 2: min 10%, max 40%\n"
-                    "    - '20, 70'  # Stage 3: min 20%, max 70%\n"
-                    "    - '50, 100' # Stage 4: min 50%, max 100%\n"
-                    "- Use '0, 0' to turn lights off in that stage"
-                )
+                    "- zone_brightness_ranges: one list per zone with one range per stage, e.g. for zone 1:\n"
+                    "    - ['5, 20', '10, 40', '20, 70', '50, 100']\n"
+                    "    # Stage 1: min 5%, max 20% ... Stage 4: min 50%, max 100%\n"
+                    "- Use '0, 0' to turn lights off in that stage\n"
+                    "- max_concurrent_commands: 8 (child commands sent at once, 1 = one by one)\n"
+                    "- command_tolerance: 1 (skip lights already within this brightness of the target)\n"
+                    "- update_coalesce_ms: 50 / update_max_latency_ms: 250 (merge bursts of light changes)\n"
+                    "- min_dispatch_interval_ms: 100 (while dragging the slider only the latest value is sent)\n"
+                    "- transition_step_rate: 2 (fade steps per second for lights without transition support)\n"
+                    "- external_change_events: per_event (or summary, off) / external_change_window_ms: 1000 (combined_light.external_change events)\n"
+                    "- instrumentation: false (time the hot paths; adds diagnostic sensors)\n"
+                    "- light_calibration: per light, e.g. light.strip: {min: 3, max: 90, gamma: 1.0, off_threshold: 1} (brightness % the light gets while on, and the zone brightness % below which it stays off)"
+                ),
             },
         )
+
+    async def async_step_preview(
+        self, user_input: dict[str, Any] | None = None
+    ) -> ConfigFlowResult:
+        """Show the zone brightness of the checked configuration before saving."""
+        if user_input is not None:
+            if self.source != SOURCE_RECONFIGURE:
+                return self.async_create_entry(
+                    title=self._config_data[CONF_NAME], data=self._config_data
+                )
+
+            config_entry = self.hass.config_entries.async_get_entry(
+                self.context["entry_id"]
+            )
+            if config_entry is None:
+                return self.async_abort(reason="entry_not_found")
+
+            if config_entry.state is not ConfigEntryState.LOADED:
+                # Try setting up again with the corrected configuration
+                return self.async_update_reload_and_abort(
+                    config_entry,
+                    data_updates=self._config_data,
+                    reason="reconfigure_successful",
+                )
+
+            # The update listener swaps the new zone plan in without a reload
+            self.hass.config_entries.async_update_entry(
+                config_entry, data={**config_entry.data, **self._config_data}
+            )
+            return self.async_abort(reason="reconfigure_successful")
+
+        return self.async_show_form(
+            step_id="preview",
+            data_schema=vol.Schema({}),
+            description_placeholders={"preview": format_plan_preview(self._plan)},
+        )
@@ -5,10 +5,25 @@ DOMAIN = "combined_lights"
 # Platforms to be set up.
 NUMBER_PLATFORM = "number"
 
+# Dispatcher signal sent after an entry's zone plan was recompiled.
+SIGNAL_PLAN_UPDATED = "combined_lights_plan_updated_{}"
+
 # Configuration keys used in the config flow.
 CONF_NAME = "name"
 
-# Configuration keys updated to use stage-based terminology
+# Lights of every zone, and the [min, max] brightness of every zone in every
+# stage, stored as lists in zone order. The number of stages is one more than
+# the number of breakpoints.
+CONF_ZONE_LIGHTS = "zone_lights"
+CONF_ZONE_BRIGHTNESS_RANGES = "zone_brightness_ranges"
+
+# Number of zones offered by the config flow (not stored)
+CONF_ZONE_COUNT = "zone_count"
+MIN_ZONES = 1
+MAX_ZONES = 8
+DEFAULT_ZONE_COUNT = 4
+
+# Version 1 keys of the fixed four zones, read only to migrate old entries
 CONF_STAGE_1_LIGHTS = "stage_1_lights"
 CONF_STAGE_2_LIGHTS = "stage_2_lights"
 CONF_STAGE_3_LIGHTS = "stage_3_lights"
@@ -16,6 +31,7 @@ CONF_STAGE_4_LIGHTS = "stage_4_lights"
 
 # Advanced configuration keys for breakpoints and brightness ranges
 CONF_BREAKPOINTS = "breakpoints"  # [25, 50, 75] - slider positions where zones activate
+# Version 1 brightness ranges of the fixed four zones
 CONF_STAGE_1_BRIGHTNESS_RANGES = (
     "stage_1_brightness_ranges"  # [[1,40], [41,60], [61,80], [81,100]]
 )
@@ -40,6 +56,89 @@ CURVE_CUBIC = "cubic"  # Even more precision at low brightness
 # Default curve - linear provides most predictable behavior
 DEFAULT_BRIGHTNESS_CURVE = CURVE_LINEAR
 
+# Maximum number of child light commands in flight at once (1 = sequential)
+CONF_MAX_CONCURRENT_COMMANDS = "max_concurrent_commands"
+DEFAULT_MAX_CONCURRENT_COMMANDS = 8
+
+# Minimum time (ms) between two dispatches to the children; brightness changes
+# requested in between replace each other and only the latest is sent
+CONF_MIN_DISPATCH_INTERVAL_MS = "min_dispatch_interval_ms"
+DEFAULT_MIN_DISPATCH_INTERVAL_MS = 100
+
+# Brightness difference (0-255) below which a child counts as already at target
+CONF_COMMAND_TOLERANCE = "command_tolerance"
+DEFAULT_COMMAND_TOLERANCE = 1
+
+# Child state changes arriving within this window (ms) are folded into one
+# recomputation and state write, delayed at most by the maximum latency (ms).
+# A window of 0 refreshes on every change.
+CONF_UPDATE_COALESCE_MS = "update_coalesce_ms"
+DEFAULT_UPDATE_COALESCE_MS = 50
+CONF_UPDATE_MAX_LATENCY_MS = "update_max_latency_ms"
+DEFAULT_UPDATE_MAX_LATENCY_MS = 250
+
+# Steps per second used to fade children that do not support transitions
+CONF_TRANSITION_STEP_RATE = "transition_step_rate"
+DEFAULT_TRANSITION_STEP_RATE = 2
+
+# Event fired when a child light is changed by something other than us, and
+# how it is emitted: one event per change, at most one summary per window (ms)
+# listing the changed lights, or not at all
+EVENT_EXTERNAL_CHANGE = "combined_light.external_change"
+CONF_EXTERNAL_CHANGE_EVENTS = "external_change_events"
+EXTERNAL_CHANGE_EVENTS_OFF = "off"
+EXTERNAL_CHANGE_EVENTS_PER_EVENT = "per_event"
+EXTERNAL_CHANGE_EVENTS_SUMMARY = "summary"
+DEFAULT_EXTERNAL_CHANGE_EVENTS = EXTERNAL_CHANGE_EVENTS_PER_EVENT
+CONF_EXTERNAL_CHANGE_WINDOW_MS = "external_change_window_ms"
+DEFAULT_EXTERNAL_CHANGE_WINDOW_MS = 1000
+
+# Time the hot paths and count events and commands, shown in the diagnostics
+# and in diagnostic sensors; costs nothing while disabled
+CONF_INSTRUMENTATION = "instrumentation"
+DEFAULT_INSTRUMENTATION = False
+
+# Per child calibration, by entity id: the lowest brightness (%) sent while on,
+# the highest (%), the gamma applied in between and the zone brightness (%)
+# below which the child is turned off instead. Folded into the zone plan.
+CONF_LIGHT_CALIBRATION = "light_calibration"
+DEFAULT_LIGHT_CALIBRATION: dict[str, dict[str, float]] = {}
+CALIBRATION_MIN = "min"
+CALIBRATION_MAX = "max"
+CALIBRATION_GAMMA = "gamma"
+CALIBRATION_OFF_THRESHOLD = "off_threshold"
+DEFAULT_CALIBRATION = {
+    CALIBRATION_MIN: 0,
+    CALIBRATION_MAX: 100,
+    CALIBRATION_GAMMA: 1.0,
+    CALIBRATION_OFF_THRESHOLD: 0,
+}
+
+# Seconds to wait for a single child light command before giving up on it
+CHILD_COMMAND_TIMEOUT = 10
+
+# Feedback loop detection: how long (s) the contexts of our service calls and
+# the brightness we asked for are remembered, how many of each are kept at
+# most (contexts per entry and shared by all entries), and the brightness
+# difference still counted as a match
+FEEDBACK_CONTEXT_TTL = 30
+FEEDBACK_EXPECTATION_TTL = 30
+FEEDBACK_MAX_CONTEXTS = 256
+FEEDBACK_MAX_SHARED_CONTEXTS = 1024
+FEEDBACK_MAX_EXPECTATIONS = 1024
+FEEDBACK_BRIGHTNESS_TOLERANCE = 5
+
+# How long (s) a command not reported back yet counts over the state a child
+# reports when deciding whether to send it a command; after that the reported
+# state wins, so a command a device missed is sent again
+COMMAND_PENDING_WINDOW = 1
+
+# Keys of the statistics of a combined light
+ATTR_DISPATCH_LATENCY = "dispatch_latency_ms"
+ATTR_COMMANDS_SENT = "commands_sent"
+ATTR_COMMANDS_SUPPRESSED = "commands_suppressed"
+ATTR_FEEDBACK = "feedback"
+
 # Default configuration matching your original request
 DEFAULT_BREAKPOINTS = [25, 50, 75]  # 1-25%, 26-50%, 51-75%, 76-100%
 
@@ -71,3 +170,11 @@ DEFAULT_STAGE_4_BRIGHTNESS_RANGES = [
     [0, 0],  # Stage 3: lights off
     [1, 100],  # Stage 4 (76-100%): lights at 1-100%
 ]
+
+# Default brightness ranges of four zones, in zone order
+DEFAULT_ZONE_BRIGHTNESS_RANGES = [
+    DEFAULT_STAGE_1_BRIGHTNESS_RANGES,
+    DEFAULT_STAGE_2_BRIGHTNESS_RANGES,
+    DEFAULT_STAGE_3_BRIGHTNESS_RANGES,
+    DEFAULT_STAGE_4_BRIGHTNESS_RANGES,
+]
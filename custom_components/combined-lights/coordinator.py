@@ -0,0 +1,176 @@
+"""Coordinator shared by all Combined Lights entries."""
+
+from __future__ import annotations
+
+from collections.abc import Callable, Iterable
+import logging
+from typing import Any
+
+from homeassistant.core import (
+    CALLBACK_TYPE,
+    Context,
+    Event,
+    EventStateChangedData,
+    HomeAssistant,
+    callback,
+)
+from homeassistant.helpers.event import async_track_state_change_event
+
+from .const import DOMAIN, FEEDBACK_MAX_SHARED_CONTEXTS
+from .feedback import IssuedContexts
+from .instrumentation import Instrumentation
+
+_LOGGER = logging.getLogger(__name__)
+
+StateChangeAction = Callable[[Event[EventStateChangedData]], None]
+
+
+@callback
+def async_get_coordinator(hass: HomeAssistant) -> CombinedLightsCoordinator:
+    """Return the coordinator, creating it on first use."""
+    coordinator: CombinedLightsCoordinator | None = hass.data.get(DOMAIN)
+    if coordinator is None:
+        coordinator = hass.data[DOMAIN] = CombinedLightsCoordinator(hass)
+    return coordinator
+
+
+class CombinedLightsCoordinator:
+    """Route child state changes and arbitrate commands across entries.
+
+    Every child light has one state change subscription, shared by all
+    entries owning it; each event is handed only to those entries.
+    Subscriptions are added and removed per child as entries come, go or
+    change their lights.
+
+    Commands in flight are recorded per child, so an entry about to send a
+    child the brightness another entry is already sending it can skip the
+    call and treat the resulting change as its own. The contexts of all
+    calls are remembered together, so an entry sharing a child with another
+    (such as a combined light nested in one that drives its lights directly)
+    can tell that entry's changes from external ones.
+
+    Entries with instrumentation enabled keep it here, where the light and
+    sensor platforms and the diagnostics of the entry find it.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the coordinator."""
+        self.hass = hass
+        # Child entity id -> entry id -> state change action
+        self._routes: dict[str, dict[str, StateChangeAction]] = {}
+        # Entry id -> its subscribed children
+        self._entry_lights: dict[str, frozenset[str]] = {}
+        # Child entity id -> removal of its state change subscription
+        self._remove_listeners: dict[str, CALLBACK_TYPE] = {}
+        # Child entity id -> (brightness, 0 = off; context of the call)
+        self._in_flight: dict[str, tuple[int, Context]] = {}
+        # Contexts of the recent calls of every entry
+        self.issued_contexts = IssuedContexts(max_size=FEEDBACK_MAX_SHARED_CONTEXTS)
+        # Entry id -> instrumentation of entries that enabled it
+        self.instrumentation: dict[str, Instrumentation] = {}
+        # Entry id -> statistics of its combined light, for the diagnostics
+        self.light_stats: dict[str, Callable[[], dict[str, Any]]] = {}
+
+        # Calls an entry skipped as another one was making them, counted by
+        # that entry, and calls replacing another's brightness
+        self.duplicates_skipped = 0
+        self.conflicts = 0
+
+    @callback
+    def async_subscribe(
+        self, entry_id: str, lights: Iterable[str], action: StateChangeAction
+    ) -> CALLBACK_TYPE:
+        """Route state changes of the lights of an entry to an action.
+
+        Subscribing an entry again replaces its lights: only the children
+        added or dropped are touched, and a child is only subscribed to when
+        its first entry comes and unsubscribed from when its last one goes.
+        """
+        old_lights = self._entry_lights.get(entry_id, frozenset())
+        new_lights = frozenset(lights)
+        self._entry_lights[entry_id] = new_lights
+
+        self._remove_routes(entry_id, old_lights - new_lights)
+        for entity_id in new_lights:
+            routes = self._routes.get(entity_id)
+            if routes is None:
+                routes = self._routes[entity_id] = {}
+                self._remove_listeners[entity_id] = async_track_state_change_event(
+                    self.hass, entity_id, self._async_state_changed
+                )
+            if routes.get(entry_id) != action:
+                routes[entry_id] = action
+
+        @callback
+        def _async_unsubscribe() -> None:
+            self._async_unsubscribe(entry_id)
+
+        return _async_unsubscribe
+
+    @callback
+    def _async_unsubscribe(self, entry_id: str) -> None:
+        """Stop routing state changes of an entry's lights."""
+        self._remove_routes(entry_id, self._entry_lights.pop(entry_id, ()))
+
+    @callback
+    def _remove_routes(self, entry_id: str, lights: Iterable[str]) -> None:
+        """Drop the routes of an entry and the subscriptions nobody needs."""
+        for entity_id in lights:
+            routes = self._routes.get(entity_id)
+            if routes is None or routes.pop(entry_id, None) is None:
+                continue
+            if not routes:
+                del self._routes[entity_id]
+                self._remove_listeners.pop(entity_id)()
+
+    @callback
+    def _async_state_changed(self, event: Event[EventStateChangedData]) -> None:
+        """Hand a child state change to the entries owning the child."""
+        routes = self._routes.get(event.data["entity_id"])
+        if routes:
+            for action in list(routes.values()):
+                action(event)
+
+    def in_flight(self, entity_id: str, brightness: int) -> Context | None:
+        """Return the context of a call already sending a child a brightness."""
+        command = self._in_flight.get(entity_id)
+        if command is None or command[0] != brightness:
+            return None
+        return command[1]
+
+    def begin(self, lights: Iterable[str], brightness: int, context: Context) -> None:
+        """Record a call sending children a brightness; the latest call wins."""
+        self.issued_contexts.add(context)
+        in_flight = self._in_flight
+        for entity_id in lights:
+            command = in_flight.get(entity_id)
+            if command is not None and command[0] != brightness:
+                self.conflicts += 1
+                _LOGGER.debug(
+                    "Conflicting commands for %s: %s replaces %s",
+                    entity_id,
+                    brightness,
+                    command[0],
+                )
+            in_flight[entity_id] = (brightness, context)
+
+    def end(self, lights: Iterable[str], context: Context) -> None:
+        """Clear the records of a finished call."""
+        in_flight = self._in_flight
+        for entity_id in lights:
+            command = in_flight.get(entity_id)
+            if command is not None and command[1] is context:
+                del in_flight[entity_id]
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return routing and arbitration statistics."""
+        return {
+            "children": len(self._routes),
+            "entries": len(
+                {entry_id for routes in self._routes.values() for entry_id in routes}
+            ),
+            "commands_in_flight": len(self._in_flight),
+            "issued_contexts": len(self.issued_contexts),
+            "duplicates_skipped": self.duplicates_skipped,
+            "conflicts": self.conflicts,
+        }
@@ -0,0 +1,42 @@
+"""Diagnostics support for Combined Lights."""
+
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .coordinator import async_get_coordinator
+from .zone_plan import ZonePlan
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    plan: ZonePlan = entry.runtime_data
+    coordinator = async_get_coordinator(hass)
+    stats = coordinator.instrumentation.get(entry.entry_id)
+    light_stats = coordinator.light_stats.get(entry.entry_id)
+
+    return {
+        "entry": {
+            "title": entry.title,
+            "version": entry.version,
+            "data": dict(entry.data),
+        },
+        "zone_plan": {
+            "zones": {
+                name: len(lights)
+                for name, lights in zip(plan.zone_names, plan.zone_lights, strict=True)
+            },
+            "breakpoints": list(plan.breakpoints),
+            "lights": len(plan.all_lights),
+            "calibrated_lights": len(plan.light_calibration),
+            "nested_entries": len(plan.nested_entry_ids),
+        },
+        "coordinator": coordinator.as_dict(),
+        "light": light_stats() if light_stats is not None else None,
+        "instrumentation": stats.as_dict() if stats is not None else None,
+    }
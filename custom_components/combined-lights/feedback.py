@@ -0,0 +1,344 @@
+"""Feedback loop detection for Combined Lights."""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+from datetime import datetime
+import time
+from typing import Any
+import uuid
+
+from homeassistant.components.light import ATTR_BRIGHTNESS
+from homeassistant.const import STATE_OFF
+from homeassistant.core import (
+    CALLBACK_TYPE,
+    Context,
+    HassJob,
+    HomeAssistant,
+    State,
+    callback,
+)
+from homeassistant.helpers.event import async_call_later
+
+from .const import (
+    FEEDBACK_BRIGHTNESS_TOLERANCE,
+    FEEDBACK_CONTEXT_TTL,
+    FEEDBACK_EXPECTATION_TTL,
+    FEEDBACK_MAX_CONTEXTS,
+    FEEDBACK_MAX_EXPECTATIONS,
+)
+
+
+class ExpectedStateStore:
+    """Bounded store of the brightness we asked each child for.
+
+    Entries expire after a TTL measured on the monotonic clock. Expired
+    entries are removed by a single scheduled sweep that always targets the
+    oldest entry, rather than by a timer per entry, and the store never
+    holds more than max_size entries. Lookups are counted as hits, misses
+    or expired for diagnostics.
+    """
+
+    def __init__(
+        self,
+        ttl: float = FEEDBACK_EXPECTATION_TTL,
+        max_size: int = FEEDBACK_MAX_EXPECTATIONS,
+    ) -> None:
+        """Initialize the store."""
+        self._ttl = ttl
+        self._max_size = max_size
+        # Entity id -> (expected brightness, 0 = off; expiry time), oldest first
+        self._entries: dict[str, tuple[int, float]] = {}
+        self._hass: HomeAssistant | None = None
+        self._sweep_job = HassJob(self._async_sweep, cancel_on_shutdown=True)
+        self._cancel_sweep: CALLBACK_TYPE | None = None
+
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.evicted = 0
+
+    def __len__(self) -> int:
+        """Return the number of stored expectations."""
+        return len(self._entries)
+
+    @callback
+    def async_start(self, hass: HomeAssistant) -> None:
+        """Enable the expiry sweep."""
+        self._hass = hass
+        self._schedule_sweep()
+
+    @callback
+    def async_stop(self) -> None:
+        """Cancel the expiry sweep and drop all entries."""
+        if self._cancel_sweep is not None:
+            self._cancel_sweep()
+            self._cancel_sweep = None
+        self._hass = None
+        self._entries.clear()
+
+    def set(self, entity_id: str, brightness: int) -> None:
+        """Remember the brightness (0 = off) we just asked a child for."""
+        entries = self._entries
+        # Re-insert so the dict stays ordered by expiry time
+        entries.pop(entity_id, None)
+        entries[entity_id] = (brightness, time.monotonic() + self._ttl)
+        while len(entries) > self._max_size:
+            del entries[next(iter(entries))]
+            self.evicted += 1
+        self._schedule_sweep()
+
+    def discard(self, entity_id: str) -> None:
+        """Forget the expectation for a child."""
+        self._entries.pop(entity_id, None)
+
+    def get(self, entity_id: str, max_age: float | None = None) -> int | None:
+        """Return a child's expected brightness if still valid, keeping it.
+
+        With max_age, only an expectation set at most that many seconds ago
+        is returned. Unlike pop, this is not a classification and is not
+        counted.
+        """
+        entry = self._entries.get(entity_id)
+        if entry is None:
+            return None
+        brightness, expires_at = entry
+        now = time.monotonic()
+        if expires_at < now:
+            return None
+        if max_age is not None and expires_at - self._ttl + max_age < now:
+            return None
+        return brightness
+
+    def pop(self, entity_id: str) -> int | None:
+        """Remove and return a child's expected brightness if still valid."""
+        entry = self._entries.pop(entity_id, None)
+        if entry is None:
+            self.misses += 1
+            return None
+        brightness, expires_at = entry
+        if expires_at < time.monotonic():
+            self.expired += 1
+            return None
+        self.hits += 1
+        return brightness
+
+    def _schedule_sweep(self) -> None:
+        """Schedule the sweep for the oldest entry unless one is pending."""
+        if self._hass is None or self._cancel_sweep is not None or not self._entries:
+            return
+        _, expires_at = next(iter(self._entries.values()))
+        self._cancel_sweep = async_call_later(
+            self._hass, max(0.0, expires_at - time.monotonic()), self._sweep_job
+        )
+
+    @callback
+    def _async_sweep(self, _now: datetime) -> None:
+        """Drop expired entries and schedule the next sweep."""
+        self._cancel_sweep = None
+        entries = self._entries
+        now = time.monotonic()
+        while entries:
+            entity_id, (_, expires_at) = next(iter(entries.items()))
+            if expires_at > now:
+                break
+            del entries[entity_id]
+            self.expired += 1
+        self._schedule_sweep()
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the store counters."""
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "expired": self.expired,
+            "evicted": self.evicted,
+        }
+
+
+class IssuedContexts:
+    """Bounded set of the contexts of recent service calls.
+
+    Contexts are forgotten after a TTL measured on the monotonic clock, and
+    the oldest go first once max_size is reached. A context derived from a
+    remembered one, such as a child of a light group, counts as remembered.
+    """
+
+    def __init__(
+        self,
+        ttl: float = FEEDBACK_CONTEXT_TTL,
+        max_size: int = FEEDBACK_MAX_CONTEXTS,
+    ) -> None:
+        """Initialize the set."""
+        self._ttl = ttl
+        self._max_size = max_size
+        # Context id -> time issued, oldest first
+        self._issued: OrderedDict[str, float] = OrderedDict()
+
+    def __len__(self) -> int:
+        """Return the number of remembered contexts."""
+        return len(self._issued)
+
+    def __contains__(self, context: Context) -> bool:
+        """Return True if a context or its parent is remembered."""
+        self._purge(time.monotonic())
+        return context.id in self._issued or context.parent_id in self._issued
+
+    def add(self, context: Context) -> None:
+        """Remember a context."""
+        now = time.monotonic()
+        self._purge(now)
+        issued = self._issued
+        issued[context.id] = now
+        issued.move_to_end(context.id)
+        while len(issued) > self._max_size:
+            issued.popitem(last=False)
+
+    def _purge(self, now: float) -> None:
+        """Drop contexts older than the TTL."""
+        issued = self._issued
+        cutoff = now - self._ttl
+        while issued:
+            context_id, issued_at = next(iter(issued.items()))
+            if issued_at > cutoff:
+                break
+            del issued[context_id]
+
+
+class FeedbackTracker:
+    """Tell child state changes caused by our own commands from external ones.
+
+    Every service call we make gets a fresh child context whose id is
+    remembered for a while; a state change carrying that context (or a
+    context derived from it) is ours. Changes with a context that clearly
+    belongs to someone else (a user or another automation) are external.
+    Only changes with an anonymous context, such as late reports from a
+    device, fall back to matching the brightness we expected.
+
+    When both signals are available they are compared, and every
+    disagreement of the brightness match with the context is counted as a
+    measured false positive or false negative of that fallback.
+
+    Changes caused by another combined light owning the same child, known
+    from the contexts all of them share, are neither ours nor external.
+    """
+
+    def __init__(
+        self,
+        context_ttl: float = FEEDBACK_CONTEXT_TTL,
+        max_contexts: int = FEEDBACK_MAX_CONTEXTS,
+        tolerance: int = FEEDBACK_BRIGHTNESS_TOLERANCE,
+    ) -> None:
+        """Initialize the tracker."""
+        self._tolerance = tolerance
+        self._issued = IssuedContexts(context_ttl, max_contexts)
+        self.expected = ExpectedStateStore()
+
+        self.other_lights = 0
+        self.own_by_context = 0
+        self.own_by_state = 0
+        self.external = 0
+        self.false_positives = 0
+        self.false_negatives = 0
+
+    def new_context(self, parent: Context | None) -> Context:
+        """Create and remember the context for one of our service calls."""
+        context = Context(
+            user_id=parent.user_id if parent else None,
+            parent_id=parent.id if parent else None,
+            id=str(uuid.uuid4()),
+        )
+        self.adopt(context)
+        return context
+
+    def adopt(self, context: Context) -> None:
+        """Treat changes carrying a context as ours, e.g. a shared command."""
+        self._issued.add(context)
+
+    def expect(self, entity_id: str, brightness: int) -> None:
+        """Remember the brightness (0 = off) we just asked a child for."""
+        self.expected.set(entity_id, brightness)
+
+    def forget(self, entity_id: str) -> None:
+        """Forget the expectation for a child, e.g. after a failed call."""
+        self.expected.discard(entity_id)
+
+    def is_other_light_change(
+        self, entity_id: str, context: Context | None, shared: IssuedContexts
+    ) -> bool:
+        """Return True if another combined light caused a child state change.
+
+        The command replaced any we sent the child, so its expectation is
+        dropped.
+        """
+        if context is None or context in self._issued or context not in shared:
+            return False
+        self.expected.discard(entity_id)
+        self.other_lights += 1
+        return True
+
+    def is_own_change(
+        self, entity_id: str, new_state: State | None, context: Context | None
+    ) -> bool:
+        """Classify a child state change and return True if we caused it."""
+        context_verdict = self._context_verdict(context)
+        state_verdict = self._state_verdict(entity_id, new_state)
+
+        if context_verdict is None:
+            own = state_verdict is True
+            if own:
+                self.own_by_state += 1
+            else:
+                self.external += 1
+            return own
+
+        if state_verdict is not None and state_verdict != context_verdict:
+            if state_verdict:
+                self.false_positives += 1
+            else:
+                self.false_negatives += 1
+
+        if context_verdict:
+            self.own_by_context += 1
+        else:
+            self.external += 1
+        return context_verdict
+
+    def _context_verdict(self, context: Context | None) -> bool | None:
+        """Classify by context; None if the context does not tell."""
+        if context is None:
+            return None
+        if context in self._issued:
+            return True
+        if context.user_id is not None or context.parent_id is not None:
+            return False
+        return None
+
+    def _state_verdict(self, entity_id: str, new_state: State | None) -> bool | None:
+        """Classify by expected brightness; None if nothing was expected."""
+        expected_brightness = self.expected.pop(entity_id)
+        if expected_brightness is None or new_state is None:
+            return None
+
+        if new_state.state == STATE_OFF or expected_brightness == 0:
+            return new_state.state == STATE_OFF and expected_brightness == 0
+
+        actual_brightness = new_state.attributes.get(ATTR_BRIGHTNESS)
+        if actual_brightness is None:
+            return None
+        # Allow small differences due to rounding/device limitations
+        return abs(actual_brightness - expected_brightness) <= self._tolerance
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the classification counters."""
+        return {
+            "other_lights": self.other_lights,
+            "own_by_context": self.own_by_context,
+            "own_by_state": self.own_by_state,
+            "external": self.external,
+            "false_positives": self.false_positives,
+            "false_negatives": self.false_negatives,
+            "tracked_contexts": len(self._issued),
+            "expected_states": self.expected.as_dict(),
+        }
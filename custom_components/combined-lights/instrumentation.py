@@ -0,0 +1,93 @@
+"""Hot path instrumentation for Combined Lights."""
+
+from __future__ import annotations
+
+from collections.abc import Callable
+from typing import Any
+
+
+class TimingStat:
+    """Count, total and maximum of a repeatedly timed operation."""
+
+    __slots__ = ("count", "max", "total")
+
+    def __init__(self) -> None:
+        """Initialize the statistic."""
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, seconds: float) -> None:
+        """Record one timing."""
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    @property
+    def mean_ms(self) -> float | None:
+        """Return the mean time in milliseconds, None before the first timing."""
+        if not self.count:
+            return None
+        return round(self.total / self.count * 1000, 3)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the statistic in milliseconds."""
+        return {
+            "count": self.count,
+            "mean_ms": self.mean_ms,
+            "max_ms": round(self.max * 1000, 3),
+        }
+
+
+class Instrumentation:
+    """Timings and counters of one combined light.
+
+    Only created when instrumentation is enabled for an entry; without it
+    the hot paths skip every measurement after a single None check.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the instrumentation."""
+        # Looking up the child targets for a slider position
+        self.zone_brightness = TimingStat()
+        # One child service call, from sending it to its return
+        self.dispatch = TimingStat()
+        # Handling one child state change
+        self.event_handler = TimingStat()
+        # Latency (s) of the last service call sent to each child
+        self.child_dispatch: dict[str, float] = {}
+        # Child state changes ignored (our own) and acted upon (external or
+        # by another combined light); reports while starting count as neither
+        self.events_filtered = 0
+        self.events_processed = 0
+        # Command and feedback counters kept by the light itself
+        self._light_stats: Callable[[], dict[str, Any]] | None = None
+
+    def attach(self, light_stats: Callable[[], dict[str, Any]] | None) -> None:
+        """Include the statistics of a light, or stop including them."""
+        self._light_stats = light_stats
+
+    def light_stats(self) -> dict[str, Any]:
+        """Return the statistics of the attached light."""
+        return self._light_stats() if self._light_stats is not None else {}
+
+    def record_dispatch(self, entity_ids: list[str], seconds: float) -> None:
+        """Record the latency of a service call to some children."""
+        self.dispatch.add(seconds)
+        child_dispatch = self.child_dispatch
+        for entity_id in entity_ids:
+            child_dispatch[entity_id] = seconds
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the timings and event counters."""
+        return {
+            "zone_brightness": self.zone_brightness.as_dict(),
+            "dispatch": self.dispatch.as_dict(),
+            "event_handler": self.event_handler.as_dict(),
+            "child_dispatch_ms": {
+                entity_id: round(seconds * 1000, 3)
+                for entity_id, seconds in sorted(self.child_dispatch.items())
+            },
+            "events_filtered": self.events_filtered,
+            "events_processed": self.events_processed,
+        }
@@ -2,37 +2,75 @@
 
 from __future__ import annotations
 
+import asyncio
+from collections.abc import Coroutine
+from dataclasses import asdict, dataclass
+from datetime import datetime
 import logging
-from typing import Any
+import time
+from typing import Any, Self
 import uuid
 
-from homeassistant.components.light import ATTR_BRIGHTNESS, ColorMode, LightEntity
+from homeassistant.components.light import (
+    ATTR_BRIGHTNESS,
+    ATTR_TRANSITION,
+    ColorMode,
+    LightEntity,
+    LightEntityFeature,
+)
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import EVENT_STATE_CHANGED
-from homeassistant.core import Context, Event, HomeAssistant, callback
-from homeassistant.exceptions import ServiceNotFound
+from homeassistant.const import ATTR_SUPPORTED_FEATURES, STATE_OFF, STATE_ON
+from homeassistant.core import (
+    CALLBACK_TYPE,
+    Context,
+    Event,
+    EventStateChangedData,
+    HassJob,
+    HomeAssistant,
+    State,
+    callback,
+)
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.event import async_call_later
+from homeassistant.helpers.restore_state import ExtraStoredData, RestoreEntity
+from homeassistant.helpers.start import async_at_started
 
+from .aggregate import ZoneAggregate
 from .const import (
-    CONF_BREAKPOINTS,
-    CONF_BRIGHTNESS_CURVE,
-    CONF_STAGE_1_BRIGHTNESS_RANGES,
-    CONF_STAGE_1_LIGHTS,
-    CONF_STAGE_2_BRIGHTNESS_RANGES,
-    CONF_STAGE_2_LIGHTS,
-    CONF_STAGE_3_BRIGHTNESS_RANGES,
-    CONF_STAGE_3_LIGHTS,
-    CONF_STAGE_4_BRIGHTNESS_RANGES,
-    CONF_STAGE_4_LIGHTS,
-    CURVE_CUBIC,
-    CURVE_QUADRATIC,
-    DEFAULT_BREAKPOINTS,
-    DEFAULT_BRIGHTNESS_CURVE,
-    DEFAULT_STAGE_1_BRIGHTNESS_RANGES,
-    DEFAULT_STAGE_2_BRIGHTNESS_RANGES,
-    DEFAULT_STAGE_3_BRIGHTNESS_RANGES,
-    DEFAULT_STAGE_4_BRIGHTNESS_RANGES,
+    ATTR_COMMANDS_SENT,
+    ATTR_COMMANDS_SUPPRESSED,
+    ATTR_DISPATCH_LATENCY,
+    ATTR_FEEDBACK,
+    CHILD_COMMAND_TIMEOUT,
+    COMMAND_PENDING_WINDOW,
+    CONF_COMMAND_TOLERANCE,
+    CONF_EXTERNAL_CHANGE_EVENTS,
+    CONF_EXTERNAL_CHANGE_WINDOW_MS,
+    CONF_MAX_CONCURRENT_COMMANDS,
+    CONF_MIN_DISPATCH_INTERVAL_MS,
+    CONF_TRANSITION_STEP_RATE,
+    CONF_UPDATE_COALESCE_MS,
+    CONF_UPDATE_MAX_LATENCY_MS,
+    DEFAULT_COMMAND_TOLERANCE,
+    DEFAULT_EXTERNAL_CHANGE_EVENTS,
+    DEFAULT_EXTERNAL_CHANGE_WINDOW_MS,
+    DEFAULT_MAX_CONCURRENT_COMMANDS,
+    DEFAULT_MIN_DISPATCH_INTERVAL_MS,
+    DEFAULT_TRANSITION_STEP_RATE,
+    DEFAULT_UPDATE_COALESCE_MS,
+    DEFAULT_UPDATE_MAX_LATENCY_MS,
+    EVENT_EXTERNAL_CHANGE,
+    EXTERNAL_CHANGE_EVENTS_OFF,
+    EXTERNAL_CHANGE_EVENTS_PER_EVENT,
+    EXTERNAL_CHANGE_EVENTS_SUMMARY,
+    SIGNAL_PLAN_UPDATED,
 )
+from .coordinator import CombinedLightsCoordinator, async_get_coordinator
+from .feedback import FeedbackTracker
+from .instrumentation import Instrumentation
+from .zone_plan import ZonePlan
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -43,34 +81,50 @@ def get_config_value(entry: ConfigEntry, key: str, default: Any) -> Any:
     return entry.data.get(key, default)
 
 
-def get_light_zones(entry: ConfigEntry) -> dict[str, list[str]]:
-    """Get all light zones from configuration."""
-    return {
-        "stage_1": get_config_value(entry, CONF_STAGE_1_LIGHTS, []),
-        "stage_2": get_config_value(entry, CONF_STAGE_2_LIGHTS, []),
-        "stage_3": get_config_value(entry, CONF_STAGE_3_LIGHTS, []),
-        "stage_4": get_config_value(entry, CONF_STAGE_4_LIGHTS, []),
-    }
-
-
-def get_brightness_ranges(entry: ConfigEntry) -> dict[str, list[list[int]]]:
-    """Get all brightness ranges from configuration."""
-    return {
-        "stage_1": get_config_value(
-            entry,
-            CONF_STAGE_1_BRIGHTNESS_RANGES,
-            DEFAULT_STAGE_1_BRIGHTNESS_RANGES,
-        ),
-        "stage_2": get_config_value(
-            entry, CONF_STAGE_2_BRIGHTNESS_RANGES, DEFAULT_STAGE_2_BRIGHTNESS_RANGES
-        ),
-        "stage_3": get_config_value(
-            entry, CONF_STAGE_3_BRIGHTNESS_RANGES, DEFAULT_STAGE_3_BRIGHTNESS_RANGES
-        ),
-        "stage_4": get_config_value(
-            entry, CONF_STAGE_4_BRIGHTNESS_RANGES, DEFAULT_STAGE_4_BRIGHTNESS_RANGES
-        ),
-    }
+def _supports_transition(state: State | None) -> bool:
+    """Return True if a child light can fade by itself."""
+    if state is None:
+        # Unknown capabilities; let the light platform handle the transition
+        return True
+    return bool(
+        state.attributes.get(ATTR_SUPPORTED_FEATURES, 0) & LightEntityFeature.TRANSITION
+    )
+
+
+def _current_brightness(state: State | None) -> int:
+    """Return the current brightness of a child light (0 = off)."""
+    if state is None or state.state != STATE_ON:
+        return 0
+    return state.attributes.get(ATTR_BRIGHTNESS) or 255
+
+
+@dataclass
+class CombinedLightExtraStoredData(ExtraStoredData):
+    """Target of a combined light kept across restarts.
+
+    The fingerprint of the zone plan tells whether the target still means
+    the same child brightness after a restart.
+    """
+
+    target_brightness: int
+    stage: int
+    plan_fingerprint: str
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return a dict representation of the stored data."""
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, restored: dict[str, Any]) -> Self | None:
+        """Initialize the stored data from a dict, None if it is invalid."""
+        try:
+            return cls(
+                int(restored["target_brightness"]),
+                int(restored["stage"]),
+                str(restored["plan_fingerprint"]),
+            )
+        except (KeyError, TypeError, ValueError):
+            return None
 
 
 async def async_setup_entry(
@@ -79,301 +133,476 @@ async def async_setup_entry(
     async_add_entities: AddEntitiesCallback,
 ) -> None:
     """Set up Combined Lights light entity."""
-    # Create a single combined light entity
-    async_add_entities([CombinedLight(entry)], True)
+    # Create a single combined light entity; it reads its children only once
+    # Home Assistant has started
+    async_add_entities([CombinedLight(entry)])
 
 
-class CombinedLight(LightEntity):
+class CombinedLight(LightEntity, RestoreEntity):
     """Combined Light entity that controls multiple light zones."""
 
     def __init__(self, entry: ConfigEntry) -> None:
         """Initialize the Combined Light."""
         self._entry = entry
+        self._plan: ZonePlan = entry.runtime_data
         self._attr_name = get_config_value(entry, "name", "Combined Lights")
         self._attr_unique_id = f"{entry.entry_id}_combined_light"
         self._attr_is_on = False
         self._attr_brightness = 255
         self._attr_supported_color_modes = {ColorMode.BRIGHTNESS}
         self._attr_color_mode = ColorMode.BRIGHTNESS
+        self._attr_supported_features = LightEntityFeature.TRANSITION
         self._remove_listener = None
+        self._coordinator: CombinedLightsCoordinator | None = None
+        self._stats: Instrumentation | None = None  # None unless enabled
+        self._controlled_lights: frozenset[str] = frozenset()
+        self._aggregate = ZoneAggregate(self._plan)
         self._target_brightness = 255  # Track the intended brightness
-        self._target_brightness_initialized = (
-            False  # Track if we've initialized from lights
-        )
-        self._updating_lights = False  # Flag to prevent feedback loops
-        self._expected_light_states = {}  # Track expected states after our changes
+        # Restored, or derived from the children once started
+        self._target_brightness_initialized = False
+        # Until started or every child reported, the zone counters may be incomplete
+        self._awaiting_children = True
+        self._feedback = FeedbackTracker()  # Recognizes our own child changes
         self._integration_context = None  # Context for integration-initiated changes
+        self._last_dispatch_latency: float | None = None
+        self._commands_sent = 0  # Child commands sent since startup
+        self._commands_suppressed = 0  # Child commands skipped as no-ops
+        self._cancel_children_refresh: CALLBACK_TYPE | None = None
+        self._children_refresh_job = HassJob(
+            self._async_children_refresh_due, cancel_on_shutdown=True
+        )
+        self._last_child_change = 0.0
+        # Whether a pending refresh recomputes the target from the children
+        self._estimate_pending = False
+        self._pending_targets: tuple[dict[str, int], float | None] | None = None
+        self._fade_task: asyncio.Task[None] | None = None
+        self._dispatch_running = False
+        self._next_dispatch_at = 0.0
+        self._children_refresh_deadline = 0.0
+        # Externally changed children waiting for the next summary event
+        self._external_changes: dict[str, str] = {}
+        self._external_change_count = 0
+        self._cancel_external_summary: CALLBACK_TYPE | None = None
+        self._external_summary_job = HassJob(
+            self._async_fire_external_summary, cancel_on_shutdown=True
+        )
+        self._load_options()
 
         # No device info - entity will be created without a device
 
+    def _load_options(self) -> None:
+        """Read the runtime tuning options from the config entry."""
+        self._max_concurrent_commands = max(
+            1,
+            int(
+                get_config_value(
+                    self._entry,
+                    CONF_MAX_CONCURRENT_COMMANDS,
+                    DEFAULT_MAX_CONCURRENT_COMMANDS,
+                )
+            ),
+        )
+        self._command_tolerance = int(
+            get_config_value(
+                self._entry, CONF_COMMAND_TOLERANCE, DEFAULT_COMMAND_TOLERANCE
+            )
+        )
+        self._min_dispatch_interval = (
+            get_config_value(
+                self._entry,
+                CONF_MIN_DISPATCH_INTERVAL_MS,
+                DEFAULT_MIN_DISPATCH_INTERVAL_MS,
+            )
+            / 1000
+        )
+        # Steps per second when fading children without transition support
+        self._transition_step_rate = max(
+            0.1,
+            float(
+                get_config_value(
+                    self._entry, CONF_TRANSITION_STEP_RATE, DEFAULT_TRANSITION_STEP_RATE
+                )
+            ),
+        )
+        # Coalescing window and latency cap for child changes, in seconds
+        self._coalesce_window = (
+            get_config_value(
+                self._entry, CONF_UPDATE_COALESCE_MS, DEFAULT_UPDATE_COALESCE_MS
+            )
+            / 1000
+        )
+        self._coalesce_max_latency = max(
+            self._coalesce_window,
+            get_config_value(
+                self._entry, CONF_UPDATE_MAX_LATENCY_MS, DEFAULT_UPDATE_MAX_LATENCY_MS
+            )
+            / 1000,
+        )
+        # How combined_light.external_change events are fired
+        self._external_change_events = get_config_value(
+            self._entry, CONF_EXTERNAL_CHANGE_EVENTS, DEFAULT_EXTERNAL_CHANGE_EVENTS
+        )
+        if self._external_change_events not in (
+            EXTERNAL_CHANGE_EVENTS_OFF,
+            EXTERNAL_CHANGE_EVENTS_PER_EVENT,
+            EXTERNAL_CHANGE_EVENTS_SUMMARY,
+        ):
+            self._external_change_events = DEFAULT_EXTERNAL_CHANGE_EVENTS
+        self._external_change_window = (
+            get_config_value(
+                self._entry,
+                CONF_EXTERNAL_CHANGE_WINDOW_MS,
+                DEFAULT_EXTERNAL_CHANGE_WINDOW_MS,
+            )
+            / 1000
+        )
+
     async def async_added_to_hass(self) -> None:
         """Entity added to Home Assistant."""
         await super().async_added_to_hass()
 
-        # Initialize target brightness based on current state
-        if self.is_on and not self._target_brightness_initialized:
-            # If lights are already on, estimate target brightness from current state
-            self._sync_target_brightness_from_lights()
-            self._target_brightness_initialized = True
+        # Take the target from before the restart; without one that is valid
+        # for the current zones, derive it from the children once started
+        await self._async_restore_target_brightness()
 
-        # Get all controlled lights
-        all_lights = self._get_all_controlled_lights()
+        self._feedback.expected.async_start(self.hass)
 
         # Prepare a fallback context for integration-initiated changes
         # Note: we'll prefer using the calling service's context during operations
         if self._integration_context is None:
             self._integration_context = Context(id=str(uuid.uuid4()), user_id=None)
 
-        # Listen for state changes of controlled lights
-        @callback
-        def light_state_changed(event: Event) -> None:
-            """Handle controlled light state changes."""
-            entity_id = event.data.get("entity_id")
-            if entity_id in all_lights:
-                # Enhanced feedback loop prevention
-                if self._is_our_own_change(entity_id, event):
-                    return
-
-                # Check context for external change
-                if event.context and event.context.id != self._integration_context.id:
-                    _LOGGER.debug(
-                        "External change detected for %s: context_id=%s, expected=%s",
-                        entity_id,
-                        event.context.id,
-                        self._integration_context.id,
-                    )
-                    # Optionally, fire a custom event for external change
-                    self.hass.bus.async_fire(
-                        "combined_light.external_change",
-                        {"entity_id": entity_id, "context_id": event.context.id},
-                    )
+        # Listen only for state changes of our own child lights, routed by the
+        # shared coordinator, and rebuild the subscription whenever the entry
+        # is reconfigured.
+        self._coordinator = async_get_coordinator(self.hass)
+        self._stats = self._coordinator.instrumentation.get(self._entry.entry_id)
+        if self._stats is not None:
+            self._stats.attach(self.light_stats)
+        self._coordinator.light_stats[self._entry.entry_id] = self.light_stats
+        self._subscribe_to_controlled_lights()
+        self.async_on_remove(
+            async_dispatcher_connect(
+                self.hass,
+                SIGNAL_PLAN_UPDATED.format(self._entry.entry_id),
+                self._async_plan_updated,
+            )
+        )
 
-                # Update target brightness based on child light changes
-                self._update_target_brightness_from_children()
-                self.async_schedule_update_ha_state()
+        # Start with cheap defaults and read the children in a single pass
+        # once Home Assistant has started, unless all of them report earlier
+        self.async_on_remove(async_at_started(self.hass, self._async_hass_started))
+
+    async def _async_restore_target_brightness(self) -> None:
+        """Restore the target brightness saved for the current zone plan."""
+        if (last_extra_data := await self.async_get_last_extra_data()) is None:
+            return
+        restored = CombinedLightExtraStoredData.from_dict(last_extra_data.as_dict())
+        if restored is None or restored.plan_fingerprint != self._plan.fingerprint:
+            _LOGGER.debug(
+                "Not restoring the target brightness of %s: zones changed",
+                self.entity_id,
+            )
+            return
+        self._target_brightness = min(255, max(0, restored.target_brightness))
+        self._attr_brightness = self._target_brightness
+        self._target_brightness_initialized = True
 
-        self._remove_listener = self.hass.bus.async_listen(
-            EVENT_STATE_CHANGED, light_state_changed
+    @property
+    def extra_restore_state_data(self) -> CombinedLightExtraStoredData:
+        """Return the target brightness to keep across restarts."""
+        brightness = min(255, max(0, int(self._target_brightness)))
+        return CombinedLightExtraStoredData(
+            brightness, self._plan.stage_table[brightness], self._plan.fingerprint
         )
 
-    def _sync_target_brightness_from_lights(self) -> None:
-        """Sync target brightness from actual light states (used during initialization)."""
-        # Get configuration
-        breakpoints = get_config_value(
-            self._entry, CONF_BREAKPOINTS, DEFAULT_BREAKPOINTS
+    @callback
+    def _async_hass_started(self, _hass: HomeAssistant) -> None:
+        """Read every child once Home Assistant has started."""
+        if not self._awaiting_children:
+            # Every child already reported by itself
+            return
+        self._rebuild_aggregate()
+        # Children still unavailable now may never come back; reconcile with
+        # the ones that are available and treat later reports as changes
+        self._async_children_available()
+
+    @callback
+    def _async_children_available(self) -> None:
+        """Reconcile with the children once started or once all reported."""
+        self._awaiting_children = False
+        if not self._target_brightness_initialized:
+            self._target_brightness_initialized = True
+            if self.is_on:
+                self._update_target_brightness_from_children()
+        self.async_write_ha_state()
+
+    def _subscribe_to_controlled_lights(self) -> None:
+        """(Re)subscribe to state changes of the currently configured lights.
+
+        Subscribing again replaces the previous lights; the coordinator only
+        touches the children that were added or dropped.
+        """
+        self._controlled_lights = self._plan.all_lights
+        self._remove_listener = self._coordinator.async_subscribe(
+            self._entry.entry_id,
+            self._controlled_lights,
+            # Only pay for timing the handler when instrumentation is enabled
+            self._async_light_state_changed
+            if self._stats is None
+            else self._async_light_state_changed_timed,
         )
-        light_zones = get_light_zones(self._entry)
 
-        # Get average brightness from each zone
-        zone_brightness = {
-            zone: self._get_average_brightness(lights)
-            for zone, lights in light_zones.items()
-        }
+    def _rebuild_aggregate(self) -> None:
+        """Rebuild the running zone counters from the current child states."""
+        aggregate = ZoneAggregate(self._plan)
+        for entity_id in self._plan.all_lights:
+            aggregate.update(entity_id, self.hass.states.get(entity_id))
+        self._aggregate = aggregate
+
+    @callback
+    def _async_plan_updated(self) -> None:
+        """Swap in the zone plan recompiled after a config entry update.
+
+        The entity stays in place: the feedback state and the subscriptions
+        of unchanged children are kept, and the zone counters are only
+        rebuilt if the lights of the zones or their calibration changed. The
+        children keep their brightness, so if the new plan maps it to another
+        slider position the target follows.
+        """
+        old_plan, self._plan = self._plan, self._entry.runtime_data
+        self._attr_name = get_config_value(self._entry, "name", "Combined Lights")
+        self._load_options()
+        if (
+            self._plan.zone_lights != old_plan.zone_lights
+            or self._plan.light_calibration != old_plan.light_calibration
+        ):
+            self._rebuild_aggregate()
+        self._subscribe_to_controlled_lights()
+        if (
+            self._plan.fingerprint != old_plan.fingerprint
+            and not self._awaiting_children
+        ):
+            self._update_target_brightness_from_children()
+        self.async_write_ha_state()
 
-        # Simple heuristic: use the highest brightness from active zones
-        # and map it to an appropriate target brightness
-        max_brightness = 0
-        if zone_brightness["stage_4"]:
-            # Highest tier lights suggest we're in stage 4
-            max_brightness = max(
-                max_brightness,
-                breakpoints[2] * 255 // 100 + zone_brightness["stage_4"] // 2,
+    @callback
+    def _async_light_state_changed_timed(
+        self, event: Event[EventStateChangedData]
+    ) -> None:
+        """Handle a controlled light state change and record its cost."""
+        stats = self._stats
+        feedback = self._feedback
+        awaiting_children = self._awaiting_children
+        handled = feedback.external + feedback.other_lights
+        start = time.perf_counter()
+        self._async_light_state_changed(event)
+        stats.event_handler.add(time.perf_counter() - start)
+        if awaiting_children:
+            # Children coming online while starting are neither ours nor
+            # external changes
+            return
+        if feedback.external + feedback.other_lights != handled:
+            stats.events_processed += 1
+        else:
+            stats.events_filtered += 1
+
+    @callback
+    def _async_light_state_changed(self, event: Event[EventStateChangedData]) -> None:
+        """Handle controlled light state changes."""
+        entity_id = event.data["entity_id"]
+        if entity_id not in self._controlled_lights:
+            return
+
+        # Keep the zone counters current, including for our own changes
+        aggregate = self._aggregate
+        was_on = aggregate.lights_on > 0
+        aggregate.update(entity_id, event.data["new_state"])
+        if self._awaiting_children:
+            # Children reporting while Home Assistant starts are coming
+            # online, not being changed; a report settles any command sent
+            # before it, and the target is reconciled once they all are in
+            self._feedback.forget(entity_id)
+            if not aggregate.unavailable:
+                self._async_children_available()
+            return
+
+        if self._feedback.is_other_light_change(
+            entity_id, event.context, self._coordinator.issued_contexts
+        ):
+            # Another combined light sharing the child, e.g. one we are nested
+            # in, moved it; follow the children without reporting a change
+            self._async_schedule_children_refresh()
+            return
+
+        # Feedback loop prevention: ignore changes caused by our own commands
+        if self._feedback.is_own_change(
+            entity_id, event.data["new_state"], event.context
+        ):
+            if (aggregate.lights_on > 0) != was_on:
+                # Children reporting after our call returned turned us on or
+                # off; show it, but keep the target
+                self._async_schedule_children_refresh(estimate=False)
+            return
+
+        _LOGGER.debug(
+            "External change detected for %s: context_id=%s",
+            entity_id,
+            event.context.id,
+        )
+        self._async_report_external_change(entity_id, event.context.id)
+
+        # Update target brightness based on child light changes
+        self._async_schedule_children_refresh()
+
+    @callback
+    def _async_report_external_change(self, entity_id: str, context_id: str) -> None:
+        """Fire or collect the external change event for a child."""
+        mode = self._external_change_events
+        if mode == EXTERNAL_CHANGE_EVENTS_OFF:
+            return
+        if mode == EXTERNAL_CHANGE_EVENTS_PER_EVENT:
+            self.hass.bus.async_fire(
+                EVENT_EXTERNAL_CHANGE,
+                {"entity_id": entity_id, "context_id": context_id},
             )
-        elif zone_brightness["stage_3"]:
-            # Ceiling lights suggest we're in stage 3 or 4
-            max_brightness = max(
-                max_brightness,
-                breakpoints[1] * 255 // 100 + zone_brightness["stage_3"] // 2,
+            return
+
+        # Summary: the first change opens a window, later ones only join it
+        self._external_changes[entity_id] = context_id
+        self._external_change_count += 1
+        if self._cancel_external_summary is None:
+            self._cancel_external_summary = async_call_later(
+                self.hass, self._external_change_window, self._external_summary_job
             )
-        elif zone_brightness["stage_2"]:
-            # Feature lights suggest we're in stage 2 or 3
-            max_brightness = max(
-                max_brightness,
-                breakpoints[0] * 255 // 100 + zone_brightness["stage_2"] // 2,
+
+    @callback
+    def _async_fire_external_summary(self, _now: datetime) -> None:
+        """Fire one event listing the children changed during the window."""
+        self._cancel_external_summary = None
+        if not self._external_changes:
+            return
+        self.hass.bus.async_fire(
+            EVENT_EXTERNAL_CHANGE,
+            {
+                "entity_ids": list(self._external_changes),
+                "context_ids": list(dict.fromkeys(self._external_changes.values())),
+                "changes": self._external_change_count,
+            },
+        )
+        self._external_changes = {}
+        self._external_change_count = 0
+
+    @callback
+    def _async_schedule_children_refresh(self, estimate: bool = True) -> None:
+        """Coalesce a burst of child changes into one state write.
+
+        With estimate, the target is recomputed from the children first.
+        """
+        self._estimate_pending |= estimate
+        if self._coalesce_window <= 0:
+            self._async_refresh_from_children()
+            return
+
+        now = self.hass.loop.time()
+        self._last_child_change = now
+        if self._cancel_children_refresh is None:
+            self._children_refresh_deadline = now + self._coalesce_max_latency
+            self._cancel_children_refresh = async_call_later(
+                self.hass, self._coalesce_window, self._children_refresh_job
             )
-        elif zone_brightness["stage_1"]:
-            # Background lights suggest we're in stage 1 or 2
-            max_brightness = max(max_brightness, zone_brightness["stage_1"])
 
-        if max_brightness > 0:
-            self._target_brightness = min(255, max_brightness)
-            self._attr_brightness = self._target_brightness
+    @callback
+    def _async_children_refresh_due(self, _now: datetime) -> None:
+        """Refresh once the burst went quiet or the latency cap was reached."""
+        self._cancel_children_refresh = None
+        now = self.hass.loop.time()
+        quiet_at = self._last_child_change + self._coalesce_window
+        if now < quiet_at and now < self._children_refresh_deadline:
+            # More changes arrived; wait for the burst to settle, but no longer
+            # than the configured maximum latency.
+            self._cancel_children_refresh = async_call_later(
+                self.hass,
+                min(quiet_at, self._children_refresh_deadline) - now,
+                self._children_refresh_job,
+            )
+            return
+        self._async_refresh_from_children()
+
+    @callback
+    def _async_refresh_from_children(self) -> None:
+        """Recompute the target brightness if needed and write state."""
+        if self._estimate_pending:
+            self._estimate_pending = False
+            self._update_target_brightness_from_children()
+        self.async_write_ha_state()
 
     def _update_target_brightness_from_children(self) -> None:
         """Update target brightness based on current child light states."""
-        # Get configuration
-        breakpoints = get_config_value(
-            self._entry, CONF_BREAKPOINTS, DEFAULT_BREAKPOINTS
-        )
-        light_zones = get_light_zones(self._entry)
-        brightness_ranges = get_brightness_ranges(self._entry)
-
-        # Calculate what our brightness should be based on current child states
-        estimated_brightness = self._estimate_brightness_from_child_states(
-            light_zones, brightness_ranges, breakpoints
+        aggregate = self._aggregate
+        # Look up what our brightness should be based on current child states
+        estimated_brightness = self._plan.estimate_brightness(
+            [
+                aggregate.zone_average(zone)
+                for zone in range(len(self._plan.zone_lights))
+            ],
+            self._target_brightness,
+            self._command_tolerance,
         )
 
         if estimated_brightness is not None:
             self._target_brightness = estimated_brightness
             self._attr_brightness = estimated_brightness
 
-    def _estimate_brightness_from_child_states(
-        self,
-        light_zones: dict[str, list[str]],
-        brightness_ranges: dict[str, list[list[int]]],
-        breakpoints: list[int],
-    ) -> int | None:
-        """Estimate what our brightness should be based on child light states."""
-        # Get current average brightness for each zone
-        zone_brightness = {}
-        for zone_name, lights in light_zones.items():
-            avg_brightness = self._get_average_brightness(lights)
-            if avg_brightness is not None:
-                zone_brightness[zone_name] = (
-                    avg_brightness / 255.0
-                ) * 100  # Convert to percentage
-            else:
-                zone_brightness[zone_name] = 0
-
-        # Find which stage we're most likely in based on active lights
-        likely_stage = self._determine_likely_stage(zone_brightness, brightness_ranges)
-
-        if likely_stage is None:
-            return None
-
-        # Calculate what brightness percentage would produce these zone brightnesses
-        estimated_pct = self._reverse_engineer_brightness(
-            zone_brightness, brightness_ranges, breakpoints, likely_stage
-        )
-
-        return int((estimated_pct / 100.0) * 255) if estimated_pct is not None else None
-
-    def _determine_likely_stage(
-        self,
-        zone_brightness: dict[str, float],
-        brightness_ranges: dict[str, list[list[int]]],
-    ) -> int | None:
-        """Determine which stage we're likely in based on active zones."""
-        # Look for the highest stage with active lights
-        for stage in range(3, -1, -1):  # Check stage 4, 3, 2, 1 (indices 3, 2, 1, 0)
-            for zone_name in ["stage_4", "stage_3", "stage_2", "stage_1"]:
-                if zone_brightness[zone_name] > 0:
-                    # Check if this zone should be active in this stage
-                    stage_range = brightness_ranges[zone_name][stage]
-                    if (
-                        stage_range[0] > 0 or stage_range[1] > 0
-                    ):  # Zone is active in this stage
-                        return stage
-        return None
-
-    def _reverse_engineer_brightness(
-        self,
-        zone_brightness: dict[str, float],
-        brightness_ranges: dict[str, list[list[int]]],
-        breakpoints: list[int],
-        stage: int,
-    ) -> float | None:
-        """Reverse engineer the brightness percentage from zone states."""
-        # Use the most active zone to estimate brightness
-        best_estimate = None
-
-        stage_boundaries = [
-            (0, breakpoints[0]),  # Stage 1
-            (breakpoints[0], breakpoints[1]),  # Stage 2
-            (breakpoints[1], breakpoints[2]),  # Stage 3
-            (breakpoints[2], 100),  # Stage 4
-        ]
-
-        stage_start, stage_end = stage_boundaries[stage]
-
-        for zone_name in ["stage_4", "stage_3", "stage_2", "stage_1"]:
-            if zone_brightness[zone_name] > 0:
-                stage_range = brightness_ranges[zone_name][stage]
-                if stage_range[0] > 0 or stage_range[1] > 0:
-                    # Calculate what progress within stage would give this brightness
-                    min_brightness, max_brightness = stage_range
-                    if max_brightness > min_brightness:
-                        # Calculate progress (0.0 to 1.0) within the stage range
-                        progress = (zone_brightness[zone_name] - min_brightness) / (
-                            max_brightness - min_brightness
-                        )
-                        progress = max(0.0, min(1.0, progress))
-
-                        # Map back to overall brightness percentage
-                        overall_pct = stage_start + (
-                            progress * (stage_end - stage_start)
-                        )
-
-                        # Use the highest estimate (most representative)
-                        if best_estimate is None or overall_pct > best_estimate:
-                            best_estimate = overall_pct
-
-        return best_estimate
-
-    def _is_our_own_change(self, entity_id: str, event: Event) -> bool:
-        """Determine if this state change was caused by our own actions."""
-        # Primary check: are we currently updating lights?
-        if hasattr(self, "_updating_lights") and self._updating_lights:
-            return True
-
-        # Secondary check: does this match our expected state?
-        new_state = event.data.get("new_state")
-        if new_state and entity_id in self._expected_light_states:
-            expected_brightness = self._expected_light_states[entity_id]
-            actual_brightness = new_state.attributes.get("brightness")
-
-            # Handle "off" state specially
-            if new_state.state == "off" and expected_brightness == 0:
-                # Remove from expected states and consider this our change
-                del self._expected_light_states[entity_id]
-                return True
-
-            # If the brightness matches what we set (within tolerance), it's likely our change
-            if actual_brightness is not None and expected_brightness is not None:
-                tolerance = (
-                    5  # Allow small differences due to rounding/device limitations
-                )
-                if abs(actual_brightness - expected_brightness) <= tolerance:
-                    # Remove from expected states and consider this our change
-                    del self._expected_light_states[entity_id]
-                    return True
-
-                # The brightness doesn't match what we expected - this is a manual change
-                # Clean up the expected state since it didn't happen as expected
-                del self._expected_light_states[entity_id]
-                return False
-
-        # If we have no specific expectation for this light, it's likely a manual change
-        return False
-
     async def async_will_remove_from_hass(self) -> None:
         """Entity removed from Home Assistant."""
         if self._remove_listener:
             self._remove_listener()
+            self._remove_listener = None
+        if self._cancel_children_refresh:
+            self._cancel_children_refresh()
+            self._cancel_children_refresh = None
+        if self._cancel_external_summary:
+            self._cancel_external_summary()
+            self._cancel_external_summary = None
+        self._cancel_stepped_fade()
+        self._feedback.expected.async_stop()
+        if self._stats is not None:
+            self._stats.attach(None)
+        if self._coordinator is not None:
+            self._coordinator.light_stats.pop(self._entry.entry_id, None)
         await super().async_will_remove_from_hass()
 
-    def _get_all_controlled_lights(self) -> list[str]:
+    def _get_all_controlled_lights(self) -> frozenset[str]:
         """Get all controlled light entity IDs."""
-        light_zones = get_light_zones(self._entry)
-        all_lights = []
-        for lights in light_zones.values():
-            all_lights.extend(lights)
-        return all_lights
+        return self._plan.all_lights
 
     @property
     def available(self) -> bool:
         """Return if entity is available."""
         return True
 
+    @callback
+    def light_stats(self) -> dict[str, Any]:
+        """Return the command and feedback statistics of the combined light.
+
+        They change with nearly every child event, so they are kept out of
+        the state attributes and shown in the diagnostics and sensors.
+        """
+        latency = self._last_dispatch_latency
+        return {
+            ATTR_DISPATCH_LATENCY: (
+                round(latency * 1000, 1) if latency is not None else None
+            ),
+            ATTR_COMMANDS_SENT: self._commands_sent,
+            ATTR_COMMANDS_SUPPRESSED: self._commands_suppressed,
+            ATTR_FEEDBACK: self._feedback.as_dict(),
+        }
+
     @property
     def is_on(self) -> bool:
         """Return true if any controlled light is on."""
-        all_lights = self._get_all_controlled_lights()
-        for entity_id in all_lights:
-            state = self.hass.states.get(entity_id)
-            if state and state.state == "on":
-                return True
-        return False
+        return self._aggregate.lights_on > 0
 
     @property
     def brightness(self) -> int | None:
@@ -382,27 +611,13 @@ class CombinedLight(LightEntity):
             return None
         return self._target_brightness
 
-    def _get_average_brightness(self, light_entities: list[str]) -> int | None:
-        """Get average brightness of lights that are on."""
-        brightness_values = []
-        for entity_id in light_entities:
-            state = self.hass.states.get(entity_id)
-            if state and state.state == "on":
-                brightness = state.attributes.get("brightness")
-                if brightness is not None:
-                    brightness_values.append(brightness)
-
-        return (
-            int(sum(brightness_values) / len(brightness_values))
-            if brightness_values
-            else None
-        )
-
     async def async_turn_on(self, **kwargs: Any) -> None:
         """Turn on the combined light."""
         if ATTR_BRIGHTNESS in kwargs:
             self._target_brightness = kwargs[ATTR_BRIGHTNESS]
             self._attr_brightness = kwargs[ATTR_BRIGHTNESS]
+            # An explicit target needs no deriving from the children
+            self._target_brightness_initialized = True
 
         self._attr_is_on = True
 
@@ -415,184 +630,267 @@ class CombinedLight(LightEntity):
             # Final fallback if no prior context exists
             self._integration_context = Context(id=str(uuid.uuid4()), user_id=None)
 
-        # Get configuration using utility functions
-        breakpoints = get_config_value(
-            self._entry, CONF_BREAKPOINTS, DEFAULT_BREAKPOINTS
-        )
-        light_zones = get_light_zones(self._entry)
-        brightness_ranges = get_brightness_ranges(self._entry)
-
-        # Convert brightness to percentage (0-100)
-        brightness_pct = (self._target_brightness / 255.0) * 100
+        plan = self._plan
+        brightness = min(255, max(0, int(self._target_brightness)))
 
-        # Determine which stage we're in based on breakpoints
-        stage = self._get_stage_from_brightness(brightness_pct, breakpoints)
-
-        # Calculate and apply brightness for each zone
-        zone_brightness = {}
-        for zone_name in ["stage_1", "stage_2", "stage_3", "stage_4"]:
-            zone_brightness[zone_name] = self._calculate_zone_brightness_from_config(
-                brightness_pct, stage, brightness_ranges[zone_name], breakpoints
+        # Look up and apply the precomputed brightness of every child
+        stats = self._stats
+        if stats is None:
+            light_targets = plan.light_targets(brightness)
+        else:
+            start = time.perf_counter()
+            light_targets = plan.light_targets(brightness)
+            stats.zone_brightness.add(time.perf_counter() - start)
+        await self._async_schedule_targets(light_targets, kwargs.get(ATTR_TRANSITION))
+
+        if _LOGGER.isEnabledFor(logging.DEBUG):
+            _LOGGER.debug(
+                "Combined light turned on - overall: %s%% (stage %s) | %s",
+                brightness * 100 // 255,
+                plan.stage_table[brightness] + 1,
+                " | ".join(
+                    f"{name}: {table[brightness] * 100 // 255}%"
+                    for name, table in zip(
+                        plan.zone_names, plan.zone_tables, strict=True
+                    )
+                ),
             )
 
-        # Control all zones
-        await self._control_all_zones(light_zones, zone_brightness)
-
-        _LOGGER.info(
-            "Combined light turned on - overall: %s%% (stage %s) | stage_1: %s%% | stage_2: %s%% | stage_3: %s%% | stage_4: %s%%",
-            int(brightness_pct),
-            stage + 1,
-            int(zone_brightness["stage_1"]) if zone_brightness["stage_1"] > 0 else 0,
-            int(zone_brightness["stage_2"]) if zone_brightness["stage_2"] > 0 else 0,
-            int(zone_brightness["stage_3"]) if zone_brightness["stage_3"] > 0 else 0,
-            int(zone_brightness["stage_4"]) if zone_brightness["stage_4"] > 0 else 0,
-        )
-
         self.async_write_ha_state()
 
-    async def _control_all_zones(
-        self, light_zones: dict[str, list[str]], zone_brightness: dict[str, float]
+    async def _async_schedule_targets(
+        self, light_targets: dict[str, int], transition: float | None = None
     ) -> None:
-        """Control all light zones based on calculated brightness values."""
-        for zone_name, lights in light_zones.items():
-            if not lights:
-                continue
-
-            brightness = zone_brightness[zone_name]
-            if brightness > 0:
-                await self._control_lights(lights, brightness / 100.0)
+        """Dispatch child targets with latest-value-wins semantics.
+
+        While a dispatch is in flight (or the minimum interval since the last
+        one has not passed), newer targets replace the pending ones instead of
+        queueing behind them; the running call sends whatever is latest.
+        """
+        self._pending_targets = (light_targets, transition)
+        if self._dispatch_running:
+            return
+
+        self._dispatch_running = True
+        loop = self.hass.loop
+        try:
+            while self._pending_targets is not None:
+                wait = self._next_dispatch_at - loop.time()
+                if wait > 0:
+                    await asyncio.sleep(wait)
+                    continue
+                (targets, transition), self._pending_targets = (
+                    self._pending_targets,
+                    None,
+                )
+                self._next_dispatch_at = loop.time() + self._min_dispatch_interval
+                # A new target supersedes any stepped fade still running
+                self._cancel_stepped_fade()
+                await self._async_send_targets(targets, transition)
+        finally:
+            self._dispatch_running = False
+            self._pending_targets = None
+
+    def _needs_command(
+        self, entity_id: str, state: State | None, brightness_value: int
+    ) -> bool:
+        """Return True if a child is not already at or heading to its target.
+
+        A command sent but not reported back yet counts over the reported
+        state for a short while, so going back to the reported brightness is
+        not skipped; after that the reported state counts, so a command the
+        child missed is sent again.
+        """
+        expected = self._feedback.expected.get(entity_id, COMMAND_PENDING_WINDOW)
+        if expected is not None:
+            if expected == 0 or brightness_value == 0:
+                return expected != brightness_value
+            return abs(expected - brightness_value) > self._command_tolerance
+        if state is None:
+            return True
+        if brightness_value == 0:
+            return state.state != STATE_OFF
+        if state.state != STATE_ON:
+            return True
+        current = state.attributes.get(ATTR_BRIGHTNESS)
+        return (
+            current is None or abs(current - brightness_value) > self._command_tolerance
+        )
+
+    async def _async_send_targets(
+        self, light_targets: dict[str, int], transition: float | None = None
+    ) -> None:
+        """Send one service call per distinct target brightness.
+
+        Children that already are at their target are skipped. With a
+        transition, children that can fade by themselves get it passed along;
+        the others are faded in steps by us.
+        """
+        batches: dict[int, list[str]] = {}
+        fades: dict[str, tuple[int, int]] = {}
+        for entity_id, brightness_value in light_targets.items():
+            state = self.hass.states.get(entity_id)
+            if not self._needs_command(entity_id, state, brightness_value):
+                self._commands_suppressed += 1
+            elif (
+                shared_context := self._coordinator.in_flight(
+                    entity_id, brightness_value
+                )
+            ) is not None:
+                # Another combined light is already sending this brightness
+                self._feedback.adopt(shared_context)
+                self._feedback.expect(entity_id, brightness_value)
+                self._coordinator.duplicates_skipped += 1
+                self._commands_suppressed += 1
+            elif transition and not _supports_transition(state):
+                fades[entity_id] = (_current_brightness(state), brightness_value)
             else:
-                await self._turn_off_lights(lights)
-
-    def _get_stage_from_brightness(
-        self, brightness_pct: float, breakpoints: list[int]
-    ) -> int:
-        """Determine stage based on brightness percentage and breakpoints."""
-        if brightness_pct <= breakpoints[0]:
-            return 0  # Stage 1: 0% to breakpoints[0]%
-        if brightness_pct <= breakpoints[1]:
-            return 1  # Stage 2: breakpoints[0]% to breakpoints[1]%
-        if brightness_pct <= breakpoints[2]:
-            return 2  # Stage 3: breakpoints[1]% to breakpoints[2]%
-        return 3  # Stage 4: breakpoints[2]% to 100%
-
-    def _calculate_zone_brightness_from_config(
-        self,
-        overall_pct: float,
-        stage: int,
-        zone_ranges: list[list[int]],
-        breakpoints: list[int],
-    ) -> float:
-        """Calculate brightness for a zone based on configuration and current stage."""
-        # Get the brightness range for this stage
-        stage_range = zone_ranges[stage]
-
-        # If the range is [0, 0], the zone should be off
-        if stage_range[0] == 0 and stage_range[1] == 0:
-            return 0.0
-
-        # Calculate position within the current stage
-        stage_boundaries = [
-            (0, breakpoints[0]),  # Stage 1
-            (breakpoints[0], breakpoints[1]),  # Stage 2
-            (breakpoints[1], breakpoints[2]),  # Stage 3
-            (breakpoints[2], 100),  # Stage 4
-        ]
-
-        stage_start, stage_end = stage_boundaries[stage]
-
-        # Calculate progress within the stage (0.0 to 1.0)
-        if stage_end == stage_start:
-            progress = 0.0
-        else:
-            progress = max(
-                0.0, min(1.0, (overall_pct - stage_start) / (stage_end - stage_start))
-            )
+                batches.setdefault(brightness_value, []).append(entity_id)
+                self._commands_sent += 1
+
+        if fades:
+            self._start_stepped_fade(fades, transition)
 
-        # Map progress to the configured brightness range for this zone
-        min_brightness, max_brightness = stage_range
+        if not batches:
+            return
 
-        # Apply brightness curve to the progress
-        curve_type = get_config_value(
-            self._entry, CONF_BRIGHTNESS_CURVE, DEFAULT_BRIGHTNESS_CURVE
+        semaphore = asyncio.Semaphore(self._max_concurrent_commands)
+        await self._async_dispatch(
+            [
+                self._control_lights(
+                    entity_ids, brightness_value, semaphore, transition
+                )
+                if brightness_value > 0
+                else self._turn_off_lights(entity_ids, semaphore, transition)
+                for brightness_value, entity_ids in batches.items()
+            ]
         )
-        curved_progress = self._apply_brightness_curve(progress, curve_type)
-
-        return min_brightness + (curved_progress * (max_brightness - min_brightness))
-
-    def _apply_brightness_curve(self, progress: float, curve_type: str) -> float:
-        """Apply brightness curve to linear progress for more natural feel."""
-        if curve_type == CURVE_QUADRATIC:
-            # Gentle curve: more linear at very low values, curve kicks in higher
-            # For very low progress (< 10%), use mostly linear
-            if progress < 0.1:
-                return progress * 0.9 + (progress**0.5) * 0.1
-            # For higher progress, use more curve
-            return 0.4 * progress + 0.6 * (progress**0.5)
-        if curve_type == CURVE_CUBIC:
-            # More aggressive curve for maximum low-end precision
-            if progress < 0.1:
-                return progress * 0.8 + (progress ** (1 / 3)) * 0.2
-            return 0.2 * progress + 0.8 * (progress ** (1 / 3))
-        # Linear curve: even response
-        return progress
 
-    async def _control_lights(
-        self, light_entities: list[str], brightness_pct: float
+    @callback
+    def _start_stepped_fade(
+        self, fades: dict[str, tuple[int, int]], duration: float
     ) -> None:
-        """Turn on lights with specified brightness."""
-        brightness_value = int(brightness_pct * 255)
+        """Fade children without transition support in the background."""
+        self._cancel_stepped_fade()
+        self._fade_task = self._entry.async_create_background_task(
+            self.hass,
+            self._async_stepped_fade(fades, duration),
+            f"{self.entity_id} stepped fade",
+        )
+
+    @callback
+    def _cancel_stepped_fade(self) -> None:
+        """Stop a running stepped fade."""
+        if self._fade_task is not None:
+            self._fade_task.cancel()
+            self._fade_task = None
 
-        # Enhanced feedback loop prevention
-        self._updating_lights = True
+    async def _async_stepped_fade(
+        self, fades: dict[str, tuple[int, int]], duration: float
+    ) -> None:
+        """Move children from their start to their end brightness in steps."""
+        steps = max(1, round(duration * self._transition_step_rate))
+        interval = duration / steps
+        for step in range(1, steps + 1):
+            await asyncio.sleep(interval)
+            await self._async_send_targets(
+                {
+                    entity_id: start + (end - start) * step // steps
+                    for entity_id, (start, end) in fades.items()
+                }
+            )
+
+    async def _async_dispatch(self, commands: list[Coroutine[Any, Any, None]]) -> None:
+        """Run child light commands together and record the total latency."""
+        start = time.perf_counter()
 
         try:
-            for entity_id in light_entities:
-                try:
-                    # Store expected state before making the change
-                    self._expected_light_states[entity_id] = brightness_value
+            await asyncio.gather(*commands)
+        finally:
+            self._last_dispatch_latency = time.perf_counter() - start
 
+    async def _async_call_light_service(
+        self,
+        semaphore: asyncio.Semaphore,
+        service: str,
+        service_data: dict[str, Any],
+        brightness_value: int,
+    ) -> None:
+        """Call a light service, waiting for a free dispatch slot first."""
+        light_entities = service_data["entity_id"]
+        # A context of its own lets us recognize the resulting changes
+        context = self._feedback.new_context(self._integration_context)
+        self._coordinator.begin(light_entities, brightness_value, context)
+        stats = self._stats
+        if stats is not None:
+            start = time.perf_counter()
+        try:
+            async with semaphore:
+                # Only the call itself is timed out, not the wait for a slot
+                async with asyncio.timeout(CHILD_COMMAND_TIMEOUT):
                     await self.hass.services.async_call(
                         "light",
-                        "turn_on",
-                        {
-                            "entity_id": entity_id,
-                            "brightness": brightness_value,
-                        },
-                        context=self._integration_context,
+                        service,
+                        service_data,
+                        blocking=True,
+                        context=context,
                     )
-                except (ServiceNotFound, ValueError) as err:
-                    _LOGGER.error("Failed to control light %s: %s", entity_id, err)
-                    # Remove from expected states if the call failed
-                    self._expected_light_states.pop(entity_id, None)
         finally:
-            # Always reset the primary flag
-            self._updating_lights = False
+            self._coordinator.end(light_entities, context)
+            if stats is not None:
+                stats.record_dispatch(light_entities, time.perf_counter() - start)
+
+    async def _control_lights(
+        self,
+        light_entities: list[str],
+        brightness_value: int,
+        semaphore: asyncio.Semaphore,
+        transition: float | None = None,
+    ) -> None:
+        """Turn on lights with the same brightness in a single service call."""
+        # Store expected states before making the change
+        for entity_id in light_entities:
+            self._feedback.expect(entity_id, brightness_value)
 
-    async def _turn_off_lights(self, light_entities: list[str]) -> None:
-        """Turn off lights."""
-        # Enhanced feedback loop prevention
-        self._updating_lights = True
+        service_data: dict[str, Any] = {
+            "entity_id": light_entities,
+            "brightness": brightness_value,
+        }
+        if transition is not None:
+            service_data[ATTR_TRANSITION] = transition
 
         try:
+            await self._async_call_light_service(
+                semaphore, "turn_on", service_data, brightness_value
+            )
+        except (HomeAssistantError, TimeoutError, ValueError) as err:
+            _LOGGER.error("Failed to control lights %s: %s", light_entities, err)
+            # Remove from expected states if the call failed
             for entity_id in light_entities:
-                try:
-                    # Store expected state (off = brightness 0)
-                    self._expected_light_states[entity_id] = 0
+                self._feedback.forget(entity_id)
 
-                    await self.hass.services.async_call(
-                        "light",
-                        "turn_off",
-                        {"entity_id": entity_id},
-                        context=self._integration_context,
-                    )
-                except (ServiceNotFound, ValueError) as err:
-                    _LOGGER.error("Failed to turn off light %s: %s", entity_id, err)
-                    # Remove from expected states if the call failed
-                    self._expected_light_states.pop(entity_id, None)
-        finally:
-            # Always reset the primary flag
-            self._updating_lights = False
+    async def _turn_off_lights(
+        self,
+        light_entities: list[str],
+        semaphore: asyncio.Semaphore,
+        transition: float | None = None,
+    ) -> None:
+        """Turn off lights in a single service call."""
+        # Store expected states (off = brightness 0)
+        for entity_id in light_entities:
+            self._feedback.expect(entity_id, 0)
+
+        service_data: dict[str, Any] = {"entity_id": light_entities}
+        if transition is not None:
+            service_data[ATTR_TRANSITION] = transition
+
+        try:
+            await self._async_call_light_service(semaphore, "turn_off", service_data, 0)
+        except (HomeAssistantError, TimeoutError, ValueError) as err:
+            _LOGGER.error("Failed to turn off lights %s: %s", light_entities, err)
+            # Remove from expected states if the call failed
+            for entity_id in light_entities:
+                self._feedback.forget(entity_id)
 
     async def async_turn_off(self, **kwargs: Any) -> None:
         """Turn off the combined light."""
@@ -609,8 +907,10 @@ class CombinedLight(LightEntity):
         all_lights = self._get_all_controlled_lights()
 
         if all_lights:
-            await self._turn_off_lights(all_lights)
+            await self._async_schedule_targets(
+                dict.fromkeys(all_lights, 0), kwargs.get(ATTR_TRANSITION)
+            )
 
-        _LOGGER.info("Combined light turned off - all configured lights turned off")
+        _LOGGER.debug("Combined light turned off - all configured lights turned off")
 
         self.async_write_ha_state()
@@ -0,0 +1,122 @@
+"""Nested combined lights for the Combined Lights integration."""
+
+from __future__ import annotations
+
+from collections.abc import Iterable, Mapping
+import logging
+from typing import Any
+
+from homeassistant.config_entries import ConfigEntry, ConfigEntryState
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import entity_registry as er
+
+from .const import DOMAIN
+from .zone_plan import ZonePlan, compile_zone_plan
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class NestingCycleError(ValueError):
+    """Raised when combined lights contain each other."""
+
+
+def nested_entry(hass: HomeAssistant, entity_id: str) -> ConfigEntry | None:
+    """Return the config entry of a child light that is a combined light."""
+    registry_entry = er.async_get(hass).async_get(entity_id)
+    if (
+        registry_entry is None
+        or registry_entry.platform != DOMAIN
+        or registry_entry.config_entry_id is None
+    ):
+        return None
+    return hass.config_entries.async_get_entry(registry_entry.config_entry_id)
+
+
+def _entry_title(hass: HomeAssistant, entry_id: str) -> str:
+    """Return the title of a config entry for messages."""
+    entry = hass.config_entries.async_get_entry(entry_id)
+    return entry.title if entry is not None else entry_id
+
+
+def compile_flat_zone_plan(
+    hass: HomeAssistant,
+    entry_id: str,
+    data: Mapping[str, Any],
+    _parents: tuple[str, ...] = (),
+) -> ZonePlan:
+    """Compile config entry data with nested combined lights flattened.
+
+    Raises NestingCycleError if a combined light contains itself, directly
+    or through other combined lights, and ValueError for invalid zones of
+    the entry itself. A nested combined light with invalid zones fails its
+    own setup, not this one: it is driven as a plain light until fixed.
+    """
+    if entry_id in _parents:
+        raise NestingCycleError(
+            "Combined lights contain each other: "
+            + " -> ".join(
+                _entry_title(hass, parent_id) for parent_id in (*_parents, entry_id)
+            )
+        )
+
+    plan = compile_zone_plan(data)
+    nested: dict[str, ZonePlan] = {}
+    nested_entry_ids: set[str] = set()
+    for entity_id in plan.all_lights:
+        child_entry = nested_entry(hass, entity_id)
+        if child_entry is None:
+            continue
+        # Kept even if invalid, so fixing the nested entry recompiles this one
+        nested_entry_ids.add(child_entry.entry_id)
+        try:
+            child_plan = compile_flat_zone_plan(
+                hass, child_entry.entry_id, child_entry.data, (*_parents, entry_id)
+            )
+        except NestingCycleError:
+            raise
+        except ValueError as err:
+            _LOGGER.warning(
+                "Not flattening %s into %s: %s",
+                entity_id,
+                _entry_title(hass, entry_id),
+                err,
+            )
+            continue
+        nested[entity_id] = child_plan
+        nested_entry_ids.update(child_plan.nested_entry_ids)
+
+    if not nested_entry_ids:
+        return plan
+    return plan.flatten(nested, frozenset(nested_entry_ids))
+
+
+def check_nesting(
+    hass: HomeAssistant, entry_id: str | None, lights: Iterable[str]
+) -> None:
+    """Raise NestingCycleError if the lights would nest an entry in itself."""
+    if entry_id is None:
+        # A new entry cannot be contained in anything yet
+        return
+    for entity_id in lights:
+        child_entry = nested_entry(hass, entity_id)
+        if child_entry is None:
+            continue
+        try:
+            compile_flat_zone_plan(
+                hass, child_entry.entry_id, child_entry.data, (entry_id,)
+            )
+        except NestingCycleError:
+            raise
+        except ValueError:
+            # An invalid nested light fails its own setup, not this one
+            continue
+
+
+def parent_entries(hass: HomeAssistant, entry_id: str) -> list[ConfigEntry]:
+    """Return the loaded entries that have an entry flattened into them."""
+    return [
+        entry
+        for entry in hass.config_entries.async_entries(DOMAIN)
+        if entry.state is ConfigEntryState.LOADED
+        and entry_id in entry.runtime_data.nested_entry_ids
+    ]
@@ -0,0 +1,128 @@
+"""Diagnostic sensors for Combined Lights instrumentation."""
+
+from __future__ import annotations
+
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import timedelta
+
+from homeassistant.components.sensor import (
+    SensorEntity,
+    SensorEntityDescription,
+    SensorStateClass,
+)
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import EntityCategory, UnitOfTime
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+
+from .const import ATTR_COMMANDS_SENT, ATTR_COMMANDS_SUPPRESSED, ATTR_FEEDBACK
+from .coordinator import async_get_coordinator
+from .instrumentation import Instrumentation
+
+# The sensors read the instrumentation; nothing is pushed from the hot paths
+SCAN_INTERVAL = timedelta(seconds=30)
+
+
+@dataclass(frozen=True, kw_only=True)
+class CombinedLightsSensorEntityDescription(SensorEntityDescription):
+    """Describes a Combined Lights diagnostic sensor."""
+
+    value_fn: Callable[[Instrumentation], float | int | None]
+
+
+SENSORS: tuple[CombinedLightsSensorEntityDescription, ...] = (
+    CombinedLightsSensorEntityDescription(
+        key="dispatch_latency",
+        name="Dispatch latency",
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda stats: stats.dispatch.mean_ms,
+    ),
+    CombinedLightsSensorEntityDescription(
+        key="zone_brightness_time",
+        name="Zone brightness time",
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda stats: stats.zone_brightness.mean_ms,
+    ),
+    CombinedLightsSensorEntityDescription(
+        key="event_handler_time",
+        name="Event handler time",
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda stats: stats.event_handler.mean_ms,
+    ),
+    CombinedLightsSensorEntityDescription(
+        key="events_processed",
+        name="Events processed",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=lambda stats: stats.events_processed,
+    ),
+    CombinedLightsSensorEntityDescription(
+        key="events_filtered",
+        name="Events filtered",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=lambda stats: stats.events_filtered,
+    ),
+    CombinedLightsSensorEntityDescription(
+        key="commands_sent",
+        name="Commands sent",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=lambda stats: stats.light_stats().get(ATTR_COMMANDS_SENT),
+    ),
+    CombinedLightsSensorEntityDescription(
+        key="commands_suppressed",
+        name="Commands suppressed",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=lambda stats: stats.light_stats().get(ATTR_COMMANDS_SUPPRESSED),
+    ),
+    CombinedLightsSensorEntityDescription(
+        key="external_changes",
+        name="External changes",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=lambda stats: (
+            stats.light_stats().get(ATTR_FEEDBACK, {}).get("external")
+        ),
+    ),
+)
+
+
+async def async_setup_entry(
+    hass: HomeAssistant,
+    entry: ConfigEntry,
+    async_add_entities: AddEntitiesCallback,
+) -> None:
+    """Set up the diagnostic sensors of an entry with instrumentation."""
+    stats = async_get_coordinator(hass).instrumentation.get(entry.entry_id)
+    if stats is None:
+        return
+    async_add_entities(
+        CombinedLightsSensor(entry, stats, description) for description in SENSORS
+    )
+
+
+class CombinedLightsSensor(SensorEntity):
+    """Diagnostic sensor showing one instrumentation value."""
+
+    entity_description: CombinedLightsSensorEntityDescription
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+
+    def __init__(
+        self,
+        entry: ConfigEntry,
+        stats: Instrumentation,
+        description: CombinedLightsSensorEntityDescription,
+    ) -> None:
+        """Initialize the sensor."""
+        self.entity_description = description
+        self._stats = stats
+        self._attr_name = (
+            f"{entry.data.get('name', 'Combined Lights')} {description.name}"
+        )
+        self._attr_unique_id = f"{entry.entry_id}_{description.key}"
+
+    @property
+    def native_value(self) -> float | int | None:
+        """Return the current value."""
+        return self.entity_description.value_fn(self._stats)
@@ -0,0 +1,597 @@
+"""Compiled zone plan for the Combined Lights integration."""
+
+from __future__ import annotations
+
+from array import array
+from bisect import bisect_left
+from collections.abc import Callable, Mapping, Sequence
+import hashlib
+from typing import Any
+
+from .const import (
+    CALIBRATION_GAMMA,
+    CALIBRATION_MAX,
+    CALIBRATION_MIN,
+    CALIBRATION_OFF_THRESHOLD,
+    CONF_BREAKPOINTS,
+    CONF_BRIGHTNESS_CURVE,
+    CONF_LIGHT_CALIBRATION,
+    CONF_ZONE_BRIGHTNESS_RANGES,
+    CONF_ZONE_LIGHTS,
+    CURVE_CUBIC,
+    CURVE_LINEAR,
+    CURVE_QUADRATIC,
+    DEFAULT_BREAKPOINTS,
+    DEFAULT_BRIGHTNESS_CURVE,
+    DEFAULT_CALIBRATION,
+    DEFAULT_LIGHT_CALIBRATION,
+    DEFAULT_ZONE_BRIGHTNESS_RANGES,
+)
+
+
+def _linear_curve(progress: float) -> float:
+    """Linear curve: even response."""
+    return progress
+
+
+def _quadratic_curve(progress: float) -> float:
+    """Gentle curve: more linear at very low values, curve kicks in higher."""
+    # For very low progress (< 10%), use mostly linear
+    if progress < 0.1:
+        return progress * 0.9 + (progress**0.5) * 0.1
+    # For higher progress, use more curve
+    return 0.4 * progress + 0.6 * (progress**0.5)
+
+
+def _cubic_curve(progress: float) -> float:
+    """More aggressive curve for maximum low-end precision."""
+    if progress < 0.1:
+        return progress * 0.8 + (progress ** (1 / 3)) * 0.2
+    return 0.2 * progress + 0.8 * (progress ** (1 / 3))
+
+
+BRIGHTNESS_CURVES: dict[str, Callable[[float], float]] = {
+    CURVE_LINEAR: _linear_curve,
+    CURVE_QUADRATIC: _quadratic_curve,
+    CURVE_CUBIC: _cubic_curve,
+}
+
+
+def default_breakpoints(stage_count: int) -> list[int]:
+    """Return breakpoints splitting the slider into equal stages."""
+    if stage_count == len(DEFAULT_BREAKPOINTS) + 1:
+        return list(DEFAULT_BREAKPOINTS)
+    return [round(100 * stage / stage_count) for stage in range(1, stage_count)]
+
+
+def default_zone_ranges(zone_count: int) -> list[list[list[int]]]:
+    """Return brightness ranges where zone N joins in stage N.
+
+    There is one stage per zone. Once on, a zone spreads its brightness
+    evenly over the remaining stages.
+    """
+    if zone_count == len(DEFAULT_ZONE_BRIGHTNESS_RANGES):
+        return [
+            [list(range_pair) for range_pair in ranges]
+            for ranges in DEFAULT_ZONE_BRIGHTNESS_RANGES
+        ]
+
+    zone_ranges = []
+    for zone in range(zone_count):
+        active_stages = zone_count - zone
+        ranges = [[0, 0] for _ in range(zone)]
+        for step in range(active_stages):
+            ranges.append(
+                [
+                    round(100 * step / active_stages) + 1,
+                    round(100 * (step + 1) / active_stages),
+                ]
+            )
+        zone_ranges.append(ranges)
+    return zone_ranges
+
+
+def calibration_table(
+    min_pct: float, max_pct: float, gamma: float, off_threshold: float
+) -> array[int]:
+    """Return the brightness (0-255) a calibrated child gets per zone brightness.
+
+    Zone brightness below the off threshold (%) turns the child off; the
+    rest is mapped onto min..max (%) through the gamma.
+    """
+    low = min_pct / 100.0 * 255
+    high = max_pct / 100.0 * 255
+    table = array("B", bytes(256))
+    for value in range(1, 256):
+        if value / 255.0 * 100 < off_threshold:
+            continue
+        table[value] = max(1, round(low + (high - low) * (value / 255.0) ** gamma))
+    return table
+
+
+def _nearest_inverse(exact: Mapping[int, int]) -> array[int]:
+    """Map every value 0-255 to the source of the nearest value that can occur.
+
+    exact maps each value that can occur to the source producing it.
+    """
+    known = sorted(exact)
+    inverse = array("B", bytes(256))
+    position = 0
+    for value in range(256):
+        while position + 1 < len(known) and abs(known[position + 1] - value) < abs(
+            known[position] - value
+        ):
+            position += 1
+        inverse[value] = exact[known[position]]
+    return inverse
+
+
+class ZonePlan:
+    """Read-only lookup structure compiled once from config entry data.
+
+    Zones are addressed by index; every per-zone field is a tuple in zone
+    order so hot paths never touch the config entry dicts. The brightness
+    mapping is precomputed for all 256 overall brightness values, so turning
+    on is one indexed read per zone.
+
+    The inverse index is built from the same tables. For every pattern of
+    zones that can be on at the same time it picks the zone with the finest
+    resolution in that pattern and maps each of its 256 possible brightness
+    values to the overall brightness producing the nearest value. An
+    estimate therefore always lies in a stage where exactly the observed
+    zones are on, and re-applying it reproduces the observed brightness of
+    that zone up to the gap between neighbouring table values.
+
+    Nested combined lights are flattened into the plan: every zone of a
+    nested light becomes a zone of its own whose table composes the two
+    mappings, so commands go straight to the leaf lights.
+
+    Calibrated children get a table composing the zone table with their
+    calibration, shared by the children of a zone calibrated alike, so
+    sending them their calibrated brightness costs the same lookup as any
+    other child. Their reported brightness is
+    mapped back to zone brightness before it is aggregated.
+    """
+
+    __slots__ = (
+        "all_lights",
+        "breakpoints",
+        "calibration_inverse",
+        "curve",
+        "fingerprint",
+        "inverse_index",
+        "light_calibration",
+        "nested_entry_ids",
+        "nested_lights",
+        "output_groups",
+        "populated_zones",
+        "stage_boundaries",
+        "stage_table",
+        "zone_lights",
+        "zone_names",
+        "zone_ranges",
+        "zone_tables",
+    )
+
+    def __init__(
+        self,
+        zone_names: tuple[str, ...],
+        zone_lights: tuple[tuple[str, ...], ...],
+        zone_ranges: tuple[tuple[tuple[int, int], ...], ...],
+        breakpoints: tuple[int, ...],
+        curve: Callable[[float], float],
+        zone_tables: tuple[array[int], ...] | None = None,
+        nested_lights: frozenset[str] = frozenset(),
+        nested_entry_ids: frozenset[str] = frozenset(),
+        light_calibration: Mapping[str, array[int]] | None = None,
+    ) -> None:
+        """Initialize the zone plan.
+
+        zone_tables replaces the tables computed from the ranges, e.g. for
+        flattened plans. light_calibration maps calibrated children to their
+        calibration table (zone brightness -> child brightness).
+        """
+        self.zone_names = zone_names
+        self.zone_lights = zone_lights
+        self.zone_ranges = zone_ranges
+        self.breakpoints = breakpoints
+        self.curve = curve
+        # (start, end) percentage of the slider covered by each stage
+        self.stage_boundaries: tuple[tuple[int, int], ...] = tuple(
+            zip((0, *breakpoints), (*breakpoints, 100), strict=True)
+        )
+        self.all_lights: frozenset[str] = frozenset(
+            light for lights in zone_lights for light in lights
+        )
+        # Combined lights flattened into this plan and their config entries
+        self.nested_lights = nested_lights
+        self.nested_entry_ids = nested_entry_ids
+        self.light_calibration: dict[str, array[int]] = dict(light_calibration or {})
+
+        # Overall brightness (0-255) -> stage, and -> brightness (0-255, where
+        # 0 means off) of every zone
+        self.stage_table = array("B", bytes(256))
+        computed_tables = tuple(array("B", bytes(256)) for _ in zone_lights)
+        for brightness in range(256):
+            brightness_pct = (brightness / 255.0) * 100
+            stage = self.stage_for(brightness_pct)
+            self.stage_table[brightness] = stage
+            if zone_tables is not None:
+                continue
+            for table, zone_pct in zip(
+                computed_tables,
+                self.zone_brightness(brightness_pct, stage),
+                strict=True,
+            ):
+                table[brightness] = int(zone_pct / 100.0 * 255) if zone_pct > 0 else 0
+        self.zone_tables: tuple[array[int], ...] = (
+            computed_tables if zone_tables is None else zone_tables
+        )
+
+        # Zones without lights can never be observed as on
+        self.populated_zones: tuple[int, ...] = tuple(
+            zone for zone, lights in enumerate(zone_lights) if lights
+        )
+        self.inverse_index = self._build_inverse_index()
+
+        # Child brightness -> the lowest zone brightness producing the nearest
+        # brightness the child can get, for every calibrated child. Children
+        # calibrated alike share their tables.
+        inverses: dict[bytes, array[int]] = {}
+        self.calibration_inverse: dict[str, array[int]] = {}
+        for entity_id, table in self.light_calibration.items():
+            inverse = inverses.get(key := table.tobytes())
+            if inverse is None:
+                inverse = inverses[key] = _nearest_inverse(
+                    {
+                        output: value
+                        for value, output in reversed(list(enumerate(table)))
+                        if output
+                    }
+                )
+            self.calibration_inverse[entity_id] = inverse
+        self.output_groups = self._build_output_groups()
+        self.fingerprint = self._fingerprint()
+
+    def _build_output_groups(self) -> tuple[tuple[tuple[str, ...], array[int]], ...]:
+        """Return the children sharing a table, with that table.
+
+        Uncalibrated children share the table of their zone; calibrated ones
+        share a table composing it with their calibration with every child
+        of the zone calibrated the same way. A light listed in several zones
+        follows the last.
+        """
+        light_zone: dict[str, int] = {}
+        for zone, lights in enumerate(self.zone_lights):
+            for entity_id in lights:
+                light_zone[entity_id] = zone
+
+        groups: dict[tuple[int, bytes], tuple[list[str], array[int]]] = {}
+        for entity_id, zone in light_zone.items():
+            calibration = self.light_calibration.get(entity_id)
+            key = (zone, b"" if calibration is None else calibration.tobytes())
+            if (group := groups.get(key)) is not None:
+                group[0].append(entity_id)
+                continue
+            table = self.zone_tables[zone]
+            if calibration is not None:
+                table = array("B", (calibration[value] for value in table))
+            groups[key] = ([entity_id], table)
+        return tuple((tuple(lights), table) for lights, table in groups.values())
+
+    def _fingerprint(self) -> str:
+        """Return a short digest of the lights and tables of every zone.
+
+        Plans with the same fingerprint send every child the same brightness
+        for every overall brightness, however they were configured.
+        """
+        digest = hashlib.blake2b(digest_size=8)
+        for lights, table in zip(self.zone_lights, self.zone_tables, strict=True):
+            digest.update("\n".join(lights).encode())
+            digest.update(b"\0")
+            digest.update(table.tobytes())
+        for entity_id, table in sorted(self.light_calibration.items()):
+            digest.update(entity_id.encode())
+            digest.update(b"\0")
+            digest.update(table.tobytes())
+        return digest.hexdigest()
+
+    def _on_mask(self, zone_values: Sequence[int | None]) -> int:
+        """Return a bit mask of the populated zones that are on."""
+        mask = 0
+        for bit, zone in enumerate(self.populated_zones):
+            if zone_values[zone]:
+                mask |= 1 << bit
+        return mask
+
+    def _build_inverse_index(self) -> dict[int, tuple[int, array[int]]]:
+        """Map each on-pattern to (lead zone, zone brightness -> overall brightness)."""
+        candidates: dict[int, list[int]] = {}
+        for brightness in range(1, 256):
+            mask = self._on_mask([table[brightness] for table in self.zone_tables])
+            if mask:
+                candidates.setdefault(mask, []).append(brightness)
+
+        inverse_index: dict[int, tuple[int, array[int]]] = {}
+        for mask, brightness_values in candidates.items():
+            # Lead with the zone that distinguishes the most slider positions,
+            # preferring higher zones on ties
+            lead_zone = max(
+                (
+                    zone
+                    for bit, zone in enumerate(self.populated_zones)
+                    if mask & (1 << bit)
+                ),
+                key=lambda zone: (
+                    len({self.zone_tables[zone][b] for b in brightness_values}),
+                    zone,
+                ),
+            )
+            lead_table = self.zone_tables[lead_zone]
+
+            # The lowest overall brightness producing each lead zone value
+            exact: dict[int, int] = {}
+            for brightness in brightness_values:
+                exact.setdefault(lead_table[brightness], brightness)
+
+            # Every other value maps to the nearest value that can occur
+            inverse_index[mask] = (lead_zone, _nearest_inverse(exact))
+        return inverse_index
+
+    def stage_for(self, brightness_pct: float) -> int:
+        """Determine stage based on brightness percentage and breakpoints."""
+        # A breakpoint still belongs to the stage below it
+        return bisect_left(self.breakpoints, brightness_pct)
+
+    def zone_brightness(self, brightness_pct: float, stage: int) -> tuple[float, ...]:
+        """Calculate the brightness percentage of every zone for a stage."""
+        stage_start, stage_end = self.stage_boundaries[stage]
+
+        # Calculate progress within the stage (0.0 to 1.0)
+        if stage_end == stage_start:
+            progress = 0.0
+        else:
+            progress = max(
+                0.0,
+                min(1.0, (brightness_pct - stage_start) / (stage_end - stage_start)),
+            )
+        curved_progress = self.curve(progress)
+
+        result = []
+        for ranges in self.zone_ranges:
+            min_brightness, max_brightness = ranges[stage]
+            # If the range is [0, 0], the zone should be off
+            if min_brightness == 0 and max_brightness == 0:
+                result.append(0.0)
+            else:
+                result.append(
+                    min_brightness + curved_progress * (max_brightness - min_brightness)
+                )
+        return tuple(result)
+
+    def flatten(
+        self, nested: Mapping[str, ZonePlan], nested_entry_ids: frozenset[str]
+    ) -> ZonePlan:
+        """Return a plan with the given combined lights replaced by their zones.
+
+        nested maps the entity id of each nested combined light to its own
+        (already flattened) plan. A nested light driven at brightness 0 is
+        off, so all of its zones are off too. Calibrating a nested light
+        calibrates the brightness it is driven at; the calibration of the
+        leaf lights of nested plans is kept.
+        """
+        calibration = self.light_calibration
+        light_calibration: dict[str, array[int]] = {}
+        zone_names: list[str] = []
+        zone_lights: list[tuple[str, ...]] = []
+        zone_ranges: list[tuple[tuple[int, int], ...]] = []
+        zone_tables: list[array[int]] = []
+        for zone, lights in enumerate(self.zone_lights):
+            table = self.zone_tables[zone]
+            zone_names.append(self.zone_names[zone])
+            zone_lights.append(tuple(light for light in lights if light not in nested))
+            zone_ranges.append(self.zone_ranges[zone])
+            zone_tables.append(table)
+
+            for entity_id in lights:
+                child = nested.get(entity_id)
+                if child is None:
+                    continue
+                light_calibration.update(child.light_calibration)
+                driven = table
+                if (nested_calibration := calibration.get(entity_id)) is not None:
+                    driven = array("B", (nested_calibration[value] for value in table))
+                for child_zone, child_table in enumerate(child.zone_tables):
+                    zone_names.append(
+                        f"{self.zone_names[zone]}/{entity_id}/{child.zone_names[child_zone]}"
+                    )
+                    zone_lights.append(child.zone_lights[child_zone])
+                    # A nested zone can only be on in the stages of its parent
+                    zone_ranges.append(self.zone_ranges[zone])
+                    zone_tables.append(
+                        array(
+                            "B",
+                            (child_table[value] if value else 0 for value in driven),
+                        )
+                    )
+
+        return ZonePlan(
+            zone_names=tuple(zone_names),
+            zone_lights=tuple(zone_lights),
+            zone_ranges=tuple(zone_ranges),
+            breakpoints=self.breakpoints,
+            curve=self.curve,
+            zone_tables=tuple(zone_tables),
+            nested_lights=frozenset(nested),
+            nested_entry_ids=nested_entry_ids,
+            light_calibration={
+                **light_calibration,
+                **{
+                    entity_id: table
+                    for entity_id, table in calibration.items()
+                    if entity_id not in nested
+                },
+            },
+        )
+
+    def light_targets(self, brightness: int) -> dict[str, int]:
+        """Return the brightness (0 = off) of every child light.
+
+        A light listed in several zones gets the value of the last one.
+        Calibration is already folded into the tables.
+        """
+        light_targets: dict[str, int] = {}
+        for lights, table in self.output_groups:
+            value = table[brightness]
+            for entity_id in lights:
+                light_targets[entity_id] = value
+        return light_targets
+
+    def estimate_brightness(
+        self,
+        zone_values: Sequence[int | None],
+        current: int | None = None,
+        tolerance: int = 0,
+    ) -> int | None:
+        """Estimate the overall brightness from observed zone brightness.
+
+        zone_values holds the observed brightness (0-255, None or 0 = off) of
+        every zone. If the current overall brightness already explains the
+        observation within tolerance it is kept, so feedback from the lights
+        never moves the slider.
+        """
+        mask = self._on_mask(zone_values)
+        if not mask:
+            return None
+
+        if current is not None and self._explains(current, zone_values, tolerance):
+            return current
+
+        entry = self.inverse_index.get(mask)
+        if entry is not None:
+            lead_zone, inverse = entry
+            return inverse[zone_values[lead_zone] or 0]
+
+        # No slider position turns on exactly these zones (e.g. a light was
+        # switched on or off by hand); fall back to the position closest to
+        # the zones that are on.
+        on_zones = [zone for zone in self.populated_zones if zone_values[zone]]
+        return min(
+            range(1, 256),
+            key=lambda brightness: sum(
+                abs(self.zone_tables[zone][brightness] - zone_values[zone])
+                if self.zone_tables[zone][brightness]
+                else 255
+                for zone in on_zones
+            ),
+        )
+
+    def _explains(
+        self, brightness: int, zone_values: Sequence[int | None], tolerance: int
+    ) -> bool:
+        """Return True if a brightness reproduces the observed zone values."""
+        for zone in self.populated_zones:
+            expected = self.zone_tables[zone][brightness]
+            observed = zone_values[zone] or 0
+            if (expected == 0) != (observed == 0):
+                return False
+            if abs(expected - observed) > tolerance:
+                return False
+        return True
+
+
+def compile_zone_plan(data: Mapping[str, Any]) -> ZonePlan:
+    """Compile config entry data into a zone plan.
+
+    Raises ValueError if the breakpoints are not ascending slider positions,
+    if the brightness ranges do not match the zones and the stages defined
+    by the breakpoints or are not valid percentages, if the curve is
+    unknown, or if a light calibration is invalid or names a light that is
+    in no zone.
+    """
+    zone_lights = tuple(tuple(lights) for lights in data.get(CONF_ZONE_LIGHTS, []))
+    breakpoints = tuple(
+        data.get(CONF_BREAKPOINTS, default_breakpoints(len(zone_lights)))
+    )
+    if list(breakpoints) != sorted(breakpoints):
+        raise ValueError(f"Breakpoints must be in ascending order: {list(breakpoints)}")
+    if breakpoints and not 0 < breakpoints[0] <= breakpoints[-1] < 100:
+        raise ValueError(f"Breakpoints must lie between 1 and 99: {list(breakpoints)}")
+
+    zone_ranges = tuple(
+        tuple((int(range_pair[0]), int(range_pair[1])) for range_pair in ranges)
+        for ranges in data.get(
+            CONF_ZONE_BRIGHTNESS_RANGES, default_zone_ranges(len(zone_lights))
+        )
+    )
+    if len(zone_ranges) != len(zone_lights):
+        raise ValueError(
+            f"Expected brightness ranges for {len(zone_lights)} zones, "
+            f"got {len(zone_ranges)}"
+        )
+    for zone, ranges in enumerate(zone_ranges, start=1):
+        if len(ranges) != len(breakpoints) + 1:
+            raise ValueError(
+                f"Zone {zone} needs {len(breakpoints) + 1} brightness ranges "
+                f"(one per stage), got {len(ranges)}"
+            )
+        for stage, (min_pct, max_pct) in enumerate(ranges, start=1):
+            if not 0 <= min_pct <= max_pct <= 100:
+                raise ValueError(
+                    f"Zone {zone}, stage {stage}: brightness range "
+                    f"'{min_pct}, {max_pct}' must satisfy 0 <= min <= max <= 100"
+                )
+
+    curve_name = data.get(CONF_BRIGHTNESS_CURVE, DEFAULT_BRIGHTNESS_CURVE)
+    if curve_name not in BRIGHTNESS_CURVES:
+        raise ValueError(
+            f"Unknown brightness curve '{curve_name}', "
+            f"expected one of {', '.join(BRIGHTNESS_CURVES)}"
+        )
+
+    calibrations = data.get(CONF_LIGHT_CALIBRATION, DEFAULT_LIGHT_CALIBRATION)
+    if not isinstance(calibrations, Mapping):
+        raise ValueError("Light calibration must map entity ids to settings")  # noqa: TRY004
+    all_lights = {light for lights in zone_lights for light in lights}
+    light_calibration: dict[str, array[int]] = {}
+    # Lights calibrated alike share one table
+    tables: dict[tuple[float, float, float, float], array[int]] = {}
+    for entity_id, settings in calibrations.items():
+        if entity_id not in all_lights:
+            raise ValueError(f"Calibrated light {entity_id} is in no zone")
+        if not isinstance(settings, Mapping):
+            raise ValueError(f"Calibration of {entity_id} must be a mapping")  # noqa: TRY004
+        if unknown := set(settings) - set(DEFAULT_CALIBRATION):
+            raise ValueError(
+                f"Unknown calibration settings of {entity_id}: "
+                f"{', '.join(sorted(unknown))}"
+            )
+        values = {**DEFAULT_CALIBRATION, **settings}
+        min_pct = float(values[CALIBRATION_MIN])
+        max_pct = float(values[CALIBRATION_MAX])
+        gamma = float(values[CALIBRATION_GAMMA])
+        off_threshold = float(values[CALIBRATION_OFF_THRESHOLD])
+        if not (0 <= min_pct <= max_pct <= 100 and max_pct > 0):
+            raise ValueError(
+                f"Calibration of {entity_id}: '{min_pct:g}, {max_pct:g}' must "
+                "satisfy 0 <= min <= max <= 100 and max > 0"
+            )
+        if gamma <= 0:
+            raise ValueError(f"Calibration of {entity_id}: gamma must be positive")
+        if not 0 <= off_threshold <= 100:
+            raise ValueError(
+                f"Calibration of {entity_id}: off threshold must lie between 0 and 100"
+            )
+        key = (min_pct, max_pct, gamma, off_threshold)
+        if (table := tables.get(key)) is None:
+            table = tables[key] = calibration_table(*key)
+        light_calibration[entity_id] = table
+
+    return ZonePlan(
+        zone_names=tuple(f"zone_{zone}" for zone in range(1, len(zone_lights) + 1)),
+        zone_lights=zone_lights,
+        zone_ranges=zone_ranges,
+        breakpoints=breakpoints,
+        curve=BRIGHTNESS_CURVES[curve_name],
+        light_calibration=light_calibration,
+    )
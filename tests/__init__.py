@@ -0,0 +1 @@
+"""Tests for the Combined Lights integration."""
@@ -0,0 +1,148 @@
+"""Helpers for Combined Lights tests."""
+
+from __future__ import annotations
+
+import importlib
+from types import ModuleType
+from typing import Any
+
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    MockEntityPlatform,
+)
+
+from homeassistant.components.light import ATTR_BRIGHTNESS, LightEntityFeature
+from homeassistant.const import ATTR_SUPPORTED_FEATURES, STATE_OFF, STATE_ON
+from homeassistant.core import HomeAssistant, ServiceCall
+from homeassistant.helpers import entity_registry as er
+
+PACKAGE = "custom_components.combined-lights"
+
+
+def import_integration(module: str) -> ModuleType:
+    """Import a module of the integration."""
+    return importlib.import_module(f"{PACKAGE}.{module}")
+
+
+integration = importlib.import_module(PACKAGE)
+const = import_integration("const")
+config_flow = import_integration("config_flow")
+coordinator = import_integration("coordinator")
+diagnostics = import_integration("diagnostics")
+feedback = import_integration("feedback")
+instrumentation = import_integration("instrumentation")
+light = import_integration("light")
+nesting = import_integration("nesting")
+sensor = import_integration("sensor")
+zone_plan = import_integration("zone_plan")
+
+
+class LightFleet:
+    """Child lights kept in the state machine that answer light services."""
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        count: int,
+        supported_features: int = LightEntityFeature.TRANSITION,
+    ) -> None:
+        """Initialize the fleet."""
+        self.hass = hass
+        self.entity_ids = [f"light.fleet_{index}" for index in range(count)]
+        self.supported_features = supported_features
+        self.service_calls = 0
+        # (service, data) of every call, in order
+        self.calls: list[tuple[str, dict[str, Any]]] = []
+
+    def setup(self) -> None:
+        """Add the lights, all off, and register the light services."""
+        for entity_id in self.entity_ids:
+            self.hass.states.async_set(
+                entity_id,
+                STATE_OFF,
+                {ATTR_SUPPORTED_FEATURES: self.supported_features},
+            )
+        self.hass.services.async_register("light", "turn_on", self._async_turn_on)
+        self.hass.services.async_register("light", "turn_off", self._async_turn_off)
+
+    async def _async_turn_on(self, call: ServiceCall) -> None:
+        """Turn lights on at the requested brightness."""
+        self.service_calls += 1
+        self.calls.append((call.service, dict(call.data)))
+        brightness = call.data.get(ATTR_BRIGHTNESS, 255)
+        for entity_id in _entity_ids(call):
+            self.hass.states.async_set(
+                entity_id,
+                STATE_ON,
+                {
+                    ATTR_BRIGHTNESS: brightness,
+                    ATTR_SUPPORTED_FEATURES: self.supported_features,
+                },
+                context=call.context,
+            )
+
+    async def _async_turn_off(self, call: ServiceCall) -> None:
+        """Turn lights off."""
+        self.service_calls += 1
+        self.calls.append((call.service, dict(call.data)))
+        for entity_id in _entity_ids(call):
+            self.hass.states.async_set(
+                entity_id,
+                STATE_OFF,
+                {ATTR_SUPPORTED_FEATURES: self.supported_features},
+                context=call.context,
+            )
+
+
+def _entity_ids(call: ServiceCall) -> list[str]:
+    """Return the entity ids a service call targets."""
+    entity_ids = call.data["entity_id"]
+    return [entity_ids] if isinstance(entity_ids, str) else list(entity_ids)
+
+
+def split_into_zones(entity_ids: list[str], zone_count: int = 4) -> list[list[str]]:
+    """Spread lights over zones in turn."""
+    return [entity_ids[zone::zone_count] for zone in range(zone_count)]
+
+
+def create_config_entry(
+    hass: HomeAssistant, zone_lights: list[list[str]], **options: Any
+) -> MockConfigEntry:
+    """Add a config entry for the zones with its zone plan compiled."""
+    entry = MockConfigEntry(
+        domain=const.DOMAIN,
+        version=2,
+        title="Combined",
+        data={
+            const.CONF_NAME: "Combined",
+            const.CONF_ZONE_LIGHTS: zone_lights,
+            **options,
+        },
+    )
+    entry.add_to_hass(hass)
+    entry.runtime_data = zone_plan.compile_zone_plan(entry.data)
+    return entry
+
+
+def register_combined_light(hass: HomeAssistant, entry: MockConfigEntry) -> str:
+    """Register the combined light of an entry and return its entity id."""
+    return (
+        er.async_get(hass)
+        .async_get_or_create(
+            "light",
+            const.DOMAIN,
+            f"{entry.entry_id}_combined_light",
+            config_entry=entry,
+        )
+        .entity_id
+    )
+
+
+async def async_add_combined_light(
+    hass: HomeAssistant, entry: MockConfigEntry
+) -> tuple[Any, MockEntityPlatform]:
+    """Add the combined light of an entry to a light platform."""
+    platform = MockEntityPlatform(hass, domain="light", platform_name=const.DOMAIN)
+    combined_light = light.CombinedLight(entry)
+    await platform.async_add_entities([combined_light])
+    return combined_light, platform
@@ -0,0 +1,11 @@
+"""Fixtures for Combined Lights tests."""
+
+from __future__ import annotations
+
+from pathlib import Path
+import sys
+
+# The integration lives in custom_components/combined-lights, which is not a
+# valid module name; make the repository root importable so it can be loaded
+# by its dotted path with importlib.
+sys.path.insert(0, str(Path(__file__).parents[1]))
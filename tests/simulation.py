@@ -0,0 +1,359 @@
+"""Simulated light fleet and workloads for load testing Combined Lights.
+
+The fleet answers light services like a real integration: the service call
+returns right away and each light reports its new state later, after a
+latency with random jitter. Reported brightness can be rounded to the
+device's step size and reports can be dropped. Every report remembers
+whether it was caused by the combined light or by something else, so the
+feedback classification of the combined light can be checked against it.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass, field
+import random
+import time
+from typing import Any
+
+from homeassistant.components.light import ATTR_BRIGHTNESS, LightEntityFeature
+from homeassistant.const import ATTR_SUPPORTED_FEATURES, STATE_OFF, STATE_ON
+from homeassistant.core import Context, Event, HomeAssistant, ServiceCall, callback
+
+from .common import const
+
+
+@dataclass(frozen=True)
+class FleetProfile:
+    """How the simulated lights behave."""
+
+    name: str
+    # Seconds until a light reports its new state, plus up to jitter more
+    latency: float = 0.0
+    jitter: float = 0.0
+    # Reported brightness is rounded to multiples of this step (1 = exact)
+    brightness_step: int = 1
+    # Share of state reports that never arrive
+    drop_rate: float = 0.0
+
+    @property
+    def max_delay(self) -> float:
+        """Return the longest time a report can take."""
+        return self.latency + self.jitter
+
+
+IDEAL = FleetProfile("ideal")
+# Reports arrive only after the service call returned, but all of them
+SLOW = FleetProfile("slow", latency=0.02)
+LOSSY = FleetProfile(
+    "lossy", latency=0.005, jitter=0.01, brightness_step=3, drop_rate=0.05
+)
+
+
+class SimulatedLightFleet:
+    """Lights that report state changes late, rounded, or not at all."""
+
+    def __init__(
+        self, hass: HomeAssistant, count: int, profile: FleetProfile, seed: int = 0
+    ) -> None:
+        """Initialize the fleet."""
+        self.hass = hass
+        self.profile = profile
+        self.entity_ids = [f"light.sim_{index}" for index in range(count)]
+        self._random = random.Random(seed)
+        self._pending_reports = 0
+
+        self.service_calls = 0
+        self.commands = 0
+        self.reports = 0
+        self.dropped = 0
+        # Context ids of reports caused by the combined light, and by others
+        self.own_contexts: set[str] = set()
+        self.external_contexts: set[str] = set()
+
+    def setup(self) -> None:
+        """Add the lights, all off, and register the light services."""
+        for entity_id in self.entity_ids:
+            self._write(entity_id, 0, None)
+        self.hass.services.async_register("light", "turn_on", self._async_turn_on)
+        self.hass.services.async_register("light", "turn_off", self._async_turn_off)
+
+    async def _async_turn_on(self, call: ServiceCall) -> None:
+        """Accept a turn on command; the lights report later."""
+        self._accept(call, call.data.get(ATTR_BRIGHTNESS, 255))
+
+    async def _async_turn_off(self, call: ServiceCall) -> None:
+        """Accept a turn off command; the lights report later."""
+        self._accept(call, 0)
+
+    def _accept(self, call: ServiceCall, brightness: int) -> None:
+        """Schedule the state reports of the lights a call targets."""
+        entity_ids = call.data["entity_id"]
+        if isinstance(entity_ids, str):
+            entity_ids = [entity_ids]
+        self.service_calls += 1
+        self.commands += len(entity_ids)
+        for entity_id in entity_ids:
+            self._schedule_report(entity_id, brightness, call.context)
+
+    def _schedule_report(
+        self, entity_id: str, brightness: int, context: Context
+    ) -> None:
+        """Report a new state after the simulated latency, unless dropped."""
+        if self._random.random() < self.profile.drop_rate:
+            self.dropped += 1
+            return
+        delay = self.profile.latency + self._random.random() * self.profile.jitter
+        if delay <= 0:
+            self._report(entity_id, brightness, context)
+            return
+        self._pending_reports += 1
+        self.hass.loop.call_later(
+            delay, self._report_later, entity_id, brightness, context
+        )
+
+    @callback
+    def _report_later(self, entity_id: str, brightness: int, context: Context) -> None:
+        """Deliver a delayed report."""
+        self._pending_reports -= 1
+        self._report(entity_id, brightness, context)
+
+    def _report(self, entity_id: str, brightness: int, context: Context) -> None:
+        """Write the state a light reports for a command."""
+        self.reports += 1
+        self.own_contexts.add(context.id)
+        self._write(entity_id, brightness, context)
+
+    def _write(self, entity_id: str, brightness: int, context: Context | None) -> bool:
+        """Write a light state, rounding the brightness to the device step.
+
+        Return False if the light already was in that state, as then no
+        state change happens for anyone to classify.
+        """
+        attributes: dict[str, Any] = {
+            ATTR_SUPPORTED_FEATURES: LightEntityFeature.TRANSITION
+        }
+        if brightness:
+            step = self.profile.brightness_step
+            attributes[ATTR_BRIGHTNESS] = max(
+                1, min(255, round(brightness / step) * step)
+            )
+        self.hass.states.async_set(
+            entity_id,
+            STATE_ON if brightness else STATE_OFF,
+            attributes,
+            context=context,
+        )
+        return self.hass.states.get(entity_id).context is context
+
+    def change_externally(self, brightness_values: dict[str, int]) -> None:
+        """Change lights the way a scene or a wall switch would."""
+        for entity_id, brightness in brightness_values.items():
+            # Half carry a user context, half are anonymous device reports
+            if self._random.random() < 0.5:
+                context = Context(user_id="simulated_user")
+            else:
+                context = Context()
+            if self._write(entity_id, brightness, context):
+                self.external_contexts.add(context.id)
+
+    def brightness(self, entity_id: str) -> int:
+        """Return the reported brightness of a light (0 = off)."""
+        state = self.hass.states.get(entity_id)
+        if state is None or state.state != STATE_ON:
+            return 0
+        return state.attributes.get(ATTR_BRIGHTNESS, 255)
+
+    async def async_settle(self) -> None:
+        """Wait until every scheduled report was delivered."""
+        while self._pending_reports:
+            await asyncio.sleep(self.profile.max_delay or 0.001)
+        await self.hass.async_block_till_done()
+
+
+@dataclass
+class LoadReport:
+    """Measurements of one workload."""
+
+    workload: str
+    profile: str
+    children: int
+    operations: int = 0
+    duration: float = 0.0
+    latencies: list[float] = field(default_factory=list)
+    service_calls: int = 0
+    commands: int = 0
+    reports: int = 0
+    dropped: int = 0
+    # Our own changes reported as external, and external ones taken as ours
+    false_external: int = 0
+    missed_external: int = 0
+
+    @property
+    def throughput(self) -> float:
+        """Return operations per second."""
+        return self.operations / self.duration if self.duration else 0.0
+
+    @property
+    def misclassified(self) -> int:
+        """Return the number of misclassified feedback events."""
+        return self.false_external + self.missed_external
+
+    def percentile(self, percent: float) -> float:
+        """Return a latency percentile in seconds (nearest rank)."""
+        if not self.latencies:
+            return 0.0
+        ordered = sorted(self.latencies)
+        rank = max(0, min(len(ordered) - 1, round(percent / 100 * len(ordered)) - 1))
+        return ordered[rank]
+
+    def format(self) -> str:
+        """Return a one-line summary."""
+        return (
+            f"{self.workload} [{self.profile}, {self.children} children]: "
+            f"{self.operations} ops in {self.duration * 1000:.1f} ms "
+            f"({self.throughput:.0f}/s), latency p50/p95/p99 "
+            f"{self.percentile(50) * 1000:.2f}/{self.percentile(95) * 1000:.2f}/"
+            f"{self.percentile(99) * 1000:.2f} ms, "
+            f"{self.service_calls} service calls, {self.commands} commands, "
+            f"{self.reports} reports ({self.dropped} dropped), "
+            f"{self.misclassified} misclassified "
+            f"({self.false_external} false external, "
+            f"{self.missed_external} missed)"
+        )
+
+
+class FeedbackAudit:
+    """Compare external change events with what really caused each change."""
+
+    def __init__(self, hass: HomeAssistant, fleet: SimulatedLightFleet) -> None:
+        """Start listening for external change events."""
+        self._fleet = fleet
+        self._reported: set[str] = set()
+        self._remove = hass.bus.async_listen(
+            const.EVENT_EXTERNAL_CHANGE, self._async_external_change
+        )
+
+    @callback
+    def _async_external_change(self, event: Event) -> None:
+        """Remember the context of a change classified as external."""
+        self._reported.add(event.data["context_id"])
+
+    def finish(self, report: LoadReport) -> None:
+        """Stop listening and count the misclassified changes."""
+        self._remove()
+        report.false_external = len(self._reported & self._fleet.own_contexts)
+        report.missed_external = len(self._fleet.external_contexts - self._reported)
+
+
+def _count_fleet(report: LoadReport, fleet: SimulatedLightFleet) -> None:
+    """Copy the fleet counters into a report."""
+    report.service_calls = fleet.service_calls
+    report.commands = fleet.commands
+    report.reports = fleet.reports
+    report.dropped = fleet.dropped
+
+
+async def async_slider_drag(
+    hass: HomeAssistant,
+    combined_light: Any,
+    fleet: SimulatedLightFleet,
+    steps: int = 50,
+    interval: float = 0.01,
+) -> LoadReport:
+    """Drag the slider from bottom to top, one service call per interval.
+
+    Calls are not awaited one after another, just like a UI sending updates
+    while the previous ones are still being handled. Latency is the time
+    until each call returns.
+    """
+    report = LoadReport("slider_drag", fleet.profile.name, len(fleet.entity_ids))
+    audit = FeedbackAudit(hass, fleet)
+
+    async def turn_on(brightness: int) -> None:
+        start = time.perf_counter()
+        await combined_light.async_turn_on(brightness=brightness)
+        report.latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    tasks = []
+    for step in range(1, steps + 1):
+        tasks.append(hass.async_create_task(turn_on(step * 255 // steps)))
+        await asyncio.sleep(interval)
+    await asyncio.gather(*tasks)
+    await fleet.async_settle()
+    report.duration = time.perf_counter() - start
+    report.operations = steps
+
+    audit.finish(report)
+    _count_fleet(report, fleet)
+    return report
+
+
+async def async_scene_storm(
+    hass: HomeAssistant,
+    combined_light: Any,
+    fleet: SimulatedLightFleet,
+    scenes: int = 20,
+    interval: float = 0.02,
+    seed: int = 0,
+) -> LoadReport:
+    """Let scenes change every child at once, one scene per interval.
+
+    Latency is the time from a scene until the combined light writes its
+    state for it.
+    """
+    report = LoadReport("scene_storm", fleet.profile.name, len(fleet.entity_ids))
+    audit = FeedbackAudit(hass, fleet)
+    rng = random.Random(seed)
+    scene_started: list[float] = []
+
+    @callback
+    def _async_state_written(event: Event) -> None:
+        if event.data["entity_id"] == combined_light.entity_id and scene_started:
+            report.latencies.append(time.perf_counter() - scene_started.pop())
+            scene_started.clear()
+
+    remove = hass.bus.async_listen("state_changed", _async_state_written)
+    start = time.perf_counter()
+    for _ in range(scenes):
+        scene_started[:] = [time.perf_counter()]
+        fleet.change_externally(
+            {entity_id: rng.randint(0, 255) for entity_id in fleet.entity_ids}
+        )
+        await asyncio.sleep(interval)
+    await fleet.async_settle()
+    report.duration = time.perf_counter() - start
+    report.operations = scenes * len(fleet.entity_ids)
+    remove()
+
+    audit.finish(report)
+    _count_fleet(report, fleet)
+    return report
+
+
+async def async_unrelated_flood(
+    hass: HomeAssistant,
+    combined_light: Any,
+    fleet: SimulatedLightFleet,
+    events: int = 5000,
+) -> LoadReport:
+    """Flood the state machine with changes of entities we do not control.
+
+    Latency is the time of each state write, including every listener.
+    """
+    report = LoadReport("unrelated_flood", fleet.profile.name, len(fleet.entity_ids))
+    audit = FeedbackAudit(hass, fleet)
+
+    start = time.perf_counter()
+    for index in range(events):
+        write_start = time.perf_counter()
+        hass.states.async_set(f"sensor.noise_{index % 100}", str(index))
+        report.latencies.append(time.perf_counter() - write_start)
+    await hass.async_block_till_done()
+    report.duration = time.perf_counter() - start
+    report.operations = events
+
+    audit.finish(report)
+    _count_fleet(report, fleet)
+    return report
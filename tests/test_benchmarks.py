@@ -0,0 +1,196 @@
+"""Benchmarks of the Combined Lights hot paths.
+
+Every benchmark runs with 1, 10, 100 and 1000 child lights. Record a
+baseline with
+
+    pytest tests/test_benchmarks.py --benchmark-save=baseline
+
+and fail later runs that got slower than it with
+
+    pytest tests/test_benchmarks.py --benchmark-compare \
+        --benchmark-compare-fail=mean:25%
+
+The benchmarks are synchronous tests that drive the Home Assistant event
+loop themselves, since pytest-benchmark cannot time coroutines.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Generator
+from itertools import cycle
+import random
+import tracemalloc
+from typing import Any
+
+import pytest
+from pytest_benchmark.fixture import BenchmarkFixture
+
+from homeassistant.components.light import ATTR_BRIGHTNESS
+from homeassistant.const import EVENT_STATE_CHANGED, STATE_ON
+from homeassistant.core import Context, Event, HomeAssistant, State
+
+from .common import (
+    LightFleet,
+    async_add_combined_light,
+    const,
+    create_config_entry,
+    light,
+    split_into_zones,
+    zone_plan,
+)
+
+CHILD_COUNTS = (1, 10, 100, 1000)
+
+# Upper bound of the memory a combined light may hold
+MEMORY_BUDGET_BASE = 256 * 1024
+MEMORY_BUDGET_PER_CHILD = 2 * 1024
+
+# Send every change right away so only the work itself is timed
+BENCHMARK_OPTIONS = {const.CONF_MIN_DISPATCH_INTERVAL_MS: 0}
+
+
+@pytest.fixture(params=CHILD_COUNTS, ids=lambda count: f"{count}_children")
+def fleet(hass: HomeAssistant, request: pytest.FixtureRequest) -> LightFleet:
+    """Return a fleet of child lights."""
+    fleet = LightFleet(hass, request.param)
+    fleet.setup()
+    return fleet
+
+
+@pytest.fixture
+def combined_light(hass: HomeAssistant, fleet: LightFleet) -> Generator[Any]:
+    """Return a combined light controlling the fleet in four zones."""
+    entry = create_config_entry(
+        hass, split_into_zones(fleet.entity_ids), **BENCHMARK_OPTIONS
+    )
+    combined_light, platform = hass.loop.run_until_complete(
+        async_add_combined_light(hass, entry)
+    )
+    yield combined_light
+    hass.loop.run_until_complete(platform.async_reset())
+    hass.loop.run_until_complete(hass.async_block_till_done())
+
+
+def test_turn_on_latency(
+    benchmark: BenchmarkFixture,
+    hass: HomeAssistant,
+    fleet: LightFleet,
+    combined_light: Any,
+) -> None:
+    """Time turning on, including the child calls and their state changes."""
+    # Alternate between stages so every call changes the children
+    brightness_values = cycle((64, 224))
+
+    def turn_on() -> None:
+        hass.loop.run_until_complete(
+            combined_light.async_turn_on(brightness=next(brightness_values))
+        )
+
+    benchmark(turn_on)
+
+    assert fleet.service_calls > 0
+    assert combined_light.is_on
+
+
+def test_light_state_changed(
+    benchmark: BenchmarkFixture,
+    hass: HomeAssistant,
+    fleet: LightFleet,
+    combined_light: Any,
+) -> None:
+    """Time handling one external child state change."""
+    rng = random.Random(0)
+    events = cycle(
+        [
+            Event(
+                EVENT_STATE_CHANGED,
+                {
+                    "entity_id": entity_id,
+                    "old_state": hass.states.get(entity_id),
+                    "new_state": State(
+                        entity_id, STATE_ON, {ATTR_BRIGHTNESS: rng.randint(1, 255)}
+                    ),
+                },
+                context=Context(),
+            )
+            for entity_id in fleet.entity_ids * max(1, 256 // len(fleet.entity_ids))
+        ]
+    )
+    handle = combined_light._async_light_state_changed
+
+    benchmark(lambda: handle(next(events)))
+
+
+def test_state_read(
+    benchmark: BenchmarkFixture,
+    hass: HomeAssistant,
+    fleet: LightFleet,
+    combined_light: Any,
+) -> None:
+    """Time reading is_on and brightness."""
+    hass.loop.run_until_complete(combined_light.async_turn_on(brightness=128))
+
+    def read() -> tuple[bool, int | None]:
+        return combined_light.is_on, combined_light.brightness
+
+    assert benchmark(read) == (True, 128)
+
+
+@pytest.mark.parametrize("calibrated", [False, True], ids=["plain", "calibrated"])
+def test_light_targets(
+    benchmark: BenchmarkFixture,
+    hass: HomeAssistant,
+    fleet: LightFleet,
+    calibrated: bool,
+) -> None:
+    """Time looking up the child targets, with and without calibration.
+
+    Calibration is folded into the tables, so with every child calibrated
+    the same way both take the same time.
+    """
+    calibration = (
+        {
+            entity_id: {"min": 3, "max": 90, "gamma": 2.2, "off_threshold": 1}
+            for entity_id in fleet.entity_ids
+        }
+        if calibrated
+        else {}
+    )
+    entry = create_config_entry(
+        hass,
+        split_into_zones(fleet.entity_ids),
+        **{const.CONF_LIGHT_CALIBRATION: calibration},
+    )
+    plan = entry.runtime_data
+    brightness_values = cycle(range(256))
+
+    targets = benchmark(lambda: plan.light_targets(next(brightness_values)))
+
+    assert len(targets) == len(fleet.entity_ids)
+
+
+def test_memory(
+    benchmark: BenchmarkFixture, hass: HomeAssistant, fleet: LightFleet
+) -> None:
+    """Time building a combined light and check the memory it holds."""
+    entry = create_config_entry(hass, split_into_zones(fleet.entity_ids))
+
+    def build() -> Any:
+        entry.runtime_data = zone_plan.compile_zone_plan(entry.data)
+        combined_light = light.CombinedLight(entry)
+        combined_light.hass = hass
+        combined_light._rebuild_aggregate()
+        return combined_light
+
+    benchmark(build)
+
+    tracemalloc.start()
+    try:
+        combined_light = build()
+        memory, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del combined_light
+
+    benchmark.extra_info["memory_bytes"] = memory
+    assert memory < MEMORY_BUDGET_BASE + MEMORY_BUDGET_PER_CHILD * len(fleet.entity_ids)
@@ -0,0 +1,118 @@
+"""Tests of update coalescing and dispatch scheduling of a combined light."""
+
+from __future__ import annotations
+
+import asyncio
+
+from homeassistant.components.light import ATTR_BRIGHTNESS
+from homeassistant.const import STATE_ON
+from homeassistant.core import Event, HomeAssistant, ServiceCall, callback
+
+from .common import LightFleet, async_add_combined_light, const, create_config_entry
+
+ENTITY_ID = "light.combined"
+COALESCE_MS = 50
+MAX_LATENCY_MS = 200
+
+
+async def _async_setup(hass: HomeAssistant) -> tuple[LightFleet, list[float]]:
+    """Add a combined light that is on; return the times of its state writes."""
+    fleet = LightFleet(hass, 1)
+    fleet.setup()
+    entry = create_config_entry(
+        hass,
+        [fleet.entity_ids],
+        **{
+            const.CONF_UPDATE_COALESCE_MS: COALESCE_MS,
+            const.CONF_UPDATE_MAX_LATENCY_MS: MAX_LATENCY_MS,
+        },
+    )
+    combined_light, _ = await async_add_combined_light(hass, entry)
+    await combined_light.async_turn_on(brightness=255)
+    await hass.async_block_till_done()
+    writes: list[float] = []
+
+    @callback
+    def _async_state_changed(event: Event) -> None:
+        if event.data["entity_id"] == ENTITY_ID:
+            writes.append(hass.loop.time())
+
+    hass.bus.async_listen("state_changed", _async_state_changed)
+    return fleet, writes
+
+
+def _change(hass: HomeAssistant, entity_id: str, brightness: int) -> None:
+    """Change the child the way a wall dimmer would."""
+    hass.states.async_set(entity_id, STATE_ON, {ATTR_BRIGHTNESS: brightness})
+
+
+async def test_burst_gives_one_write(hass: HomeAssistant) -> None:
+    """Child changes within the window are written once, after it."""
+    fleet, writes = await _async_setup(hass)
+    (child,) = fleet.entity_ids
+
+    for brightness in range(100, 60, -10):
+        _change(hass, child, brightness)
+        await hass.async_block_till_done()
+    assert not writes
+
+    await asyncio.sleep(COALESCE_MS / 1000 * 2)
+    await hass.async_block_till_done()
+
+    assert len(writes) == 1
+    assert hass.states.get(ENTITY_ID).attributes[ATTR_BRIGHTNESS] < 255
+
+
+async def test_sustained_burst_is_written_by_the_latency_cap(
+    hass: HomeAssistant,
+) -> None:
+    """A burst that never goes quiet is still written in time."""
+    fleet, writes = await _async_setup(hass)
+    (child,) = fleet.entity_ids
+    start = hass.loop.time()
+
+    # A change every half window for three times the latency cap
+    brightness = 200
+    while hass.loop.time() - start < MAX_LATENCY_MS / 1000 * 3:
+        brightness = 200 if brightness != 200 else 150
+        _change(hass, child, brightness)
+        await asyncio.sleep(COALESCE_MS / 1000 / 2)
+
+    assert writes
+    # Allow for the timer resolution of the event loop
+    assert writes[0] - start <= MAX_LATENCY_MS / 1000 + COALESCE_MS / 1000
+    # One write per latency cap, not one per change
+    assert len(writes) <= 3
+
+
+async def test_dispatch_keeps_only_the_latest_target(hass: HomeAssistant) -> None:
+    """Targets set while a call is in flight collapse to the last one."""
+    fleet = LightFleet(hass, 1)
+    fleet.setup()
+    answer = fleet._async_turn_on
+
+    async def _async_slow_turn_on(call: ServiceCall) -> None:
+        await asyncio.sleep(0.05)
+        await answer(call)
+
+    hass.services.async_register("light", "turn_on", _async_slow_turn_on)
+    entry = create_config_entry(
+        hass, [fleet.entity_ids], **{const.CONF_MIN_DISPATCH_INTERVAL_MS: 0}
+    )
+    combined_light, _ = await async_add_combined_light(hass, entry)
+    (child,) = fleet.entity_ids
+
+    first = hass.async_create_task(combined_light.async_turn_on(brightness=100))
+    await asyncio.sleep(0.01)
+    # While the first call is in flight
+    for brightness in (150, 200, 250):
+        await combined_light.async_turn_on(brightness=brightness)
+    await first
+    await hass.async_block_till_done()
+
+    targets = entry.runtime_data.light_targets
+    assert [data[ATTR_BRIGHTNESS] for _, data in fleet.calls] == [
+        targets(100)[child],
+        targets(250)[child],
+    ]
+    assert hass.states.get(child).attributes[ATTR_BRIGHTNESS] == targets(250)[child]
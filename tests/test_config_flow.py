@@ -0,0 +1,146 @@
+"""Tests of the Combined Lights config flow."""
+
+from __future__ import annotations
+
+from typing import Any
+
+import pytest
+
+from homeassistant.config_entries import SOURCE_RECONFIGURE, SOURCE_USER
+from homeassistant.core import HomeAssistant
+
+from .common import (
+    config_flow,
+    const,
+    create_config_entry,
+    register_combined_light,
+)
+
+
+def _flow(
+    hass: HomeAssistant,
+    zone_lights: list[list[str]] | None = None,
+    entry_id: str | None = None,
+) -> Any:
+    """Return a flow at the advanced step, adding or reconfiguring an entry."""
+    flow = config_flow.CombinedLightsConfigFlow()
+    flow.hass = hass
+    flow.context = (
+        {"source": SOURCE_USER}
+        if entry_id is None
+        else {"source": SOURCE_RECONFIGURE, "entry_id": entry_id}
+    )
+    flow._config_data = {
+        const.CONF_NAME: "Living room",
+        const.CONF_ZONE_LIGHTS: zone_lights
+        or [[f"light.zone_{zone}"] for zone in range(1, 5)],
+    }
+    return flow
+
+
+def _validate(
+    hass: HomeAssistant, advanced_config: Any
+) -> tuple[dict[str, str], dict[str, str]]:
+    """Check an advanced configuration of four single light zones."""
+    errors: dict[str, str] = {}
+    placeholders = _flow(hass)._validate_advanced(
+        {"advanced_config": advanced_config}, errors
+    )
+    return errors, placeholders
+
+
+def test_defaults_are_accepted(hass: HomeAssistant) -> None:
+    """An empty advanced configuration falls back to the defaults."""
+    errors, placeholders = _validate(hass, {})
+
+    assert not errors
+    assert not placeholders
+
+
+@pytest.mark.parametrize("advanced_config", [None, "breakpoints: [30]", [30, 60]])
+def test_advanced_config_must_be_a_mapping(
+    hass: HomeAssistant, advanced_config: Any
+) -> None:
+    """Anything but a mapping of options is reported, not raised."""
+    errors, placeholders = _validate(hass, advanced_config)
+
+    assert errors == {"base": "invalid_zone_config"}
+    assert "mapping" in placeholders["error"]
+
+
+@pytest.mark.parametrize(
+    ("option", "value"),
+    [
+        (const.CONF_MAX_CONCURRENT_COMMANDS, 0),
+        (const.CONF_COMMAND_TOLERANCE, -1),
+        (const.CONF_UPDATE_COALESCE_MS, -50),
+        (const.CONF_UPDATE_MAX_LATENCY_MS, -1),
+        (const.CONF_MIN_DISPATCH_INTERVAL_MS, -100),
+        (const.CONF_EXTERNAL_CHANGE_WINDOW_MS, -1000),
+        (const.CONF_TRANSITION_STEP_RATE, 0),
+        (const.CONF_EXTERNAL_CHANGE_EVENTS, "always"),
+        (const.CONF_MAX_CONCURRENT_COMMANDS, "many"),
+    ],
+)
+def test_invalid_runtime_options(hass: HomeAssistant, option: str, value: Any) -> None:
+    """Runtime options are checked along with the zones."""
+    errors, placeholders = _validate(hass, {option: value})
+
+    assert errors == {"base": "invalid_zone_config"}
+    assert placeholders["error"]
+
+
+@pytest.mark.parametrize(
+    "events",
+    [
+        const.EXTERNAL_CHANGE_EVENTS_PER_EVENT,
+        const.EXTERNAL_CHANGE_EVENTS_SUMMARY,
+        const.EXTERNAL_CHANGE_EVENTS_OFF,
+    ],
+)
+def test_external_change_events_choices(hass: HomeAssistant, events: str) -> None:
+    """Every documented choice of external change events is accepted."""
+    errors, _ = _validate(
+        hass,
+        {
+            const.CONF_EXTERNAL_CHANGE_EVENTS: events,
+            const.CONF_MIN_DISPATCH_INTERVAL_MS: 0,
+            const.CONF_UPDATE_COALESCE_MS: 0,
+        },
+    )
+
+    assert not errors
+
+
+def test_preview_flattens_nested_lights(hass: HomeAssistant) -> None:
+    """The preview shows the mapping with nested combined lights flattened."""
+    nested = create_config_entry(hass, [["light.c"], ["light.d"]])
+    flow = _flow(
+        hass, [["light.a"], ["light.b", register_combined_light(hass, nested)]]
+    )
+    errors: dict[str, str] = {}
+
+    flow._validate_advanced({"advanced_config": {}}, errors)
+
+    assert not errors
+    assert set(flow._plan.all_lights) == {"light.a", "light.b", "light.c", "light.d"}
+    assert "Zone 4" in config_flow.format_plan_preview(flow._plan)
+
+
+def test_advanced_step_rejects_a_cycle(hass: HomeAssistant) -> None:
+    """A cycle is reported as such when reconfiguring."""
+    inner = create_config_entry(hass, [["light.a"], ["light.b"]])
+    outer = create_config_entry(
+        hass, [["light.c"], [register_combined_light(hass, inner)]]
+    )
+    flow = _flow(
+        hass,
+        [["light.a"], ["light.b", register_combined_light(hass, outer)]],
+        inner.entry_id,
+    )
+    errors: dict[str, str] = {}
+
+    placeholders = flow._validate_advanced({"advanced_config": {}}, errors)
+
+    assert errors == {"base": "nested_cycle"}
+    assert "contain each other" in placeholders["error"]
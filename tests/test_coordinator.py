@@ -0,0 +1,156 @@
+"""Tests of the coordinator shared by all Combined Lights entries."""
+
+from __future__ import annotations
+
+import asyncio
+
+from homeassistant.const import STATE_ON
+from homeassistant.core import (
+    Context,
+    Event,
+    EventStateChangedData,
+    HomeAssistant,
+    ServiceCall,
+    callback,
+)
+
+from .common import (
+    LightFleet,
+    async_add_combined_light,
+    const,
+    coordinator,
+    create_config_entry,
+)
+
+
+def _recorder(seen: list[str]) -> coordinator.StateChangeAction:
+    """Return an action remembering the children it was called for."""
+
+    @callback
+    def _async_action(event: Event[EventStateChangedData]) -> None:
+        seen.append(event.data["entity_id"])
+
+    return _async_action
+
+
+async def _async_change(hass: HomeAssistant, *entity_ids: str) -> None:
+    """Change the state of some lights."""
+    for entity_id in entity_ids:
+        hass.states.async_set(entity_id, STATE_ON, {"changes": hass.loop.time()})
+    await hass.async_block_till_done()
+
+
+async def test_resubscribe_touches_only_changed_children(
+    hass: HomeAssistant,
+) -> None:
+    """Subscribing again keeps the subscriptions of unchanged children."""
+    shared = coordinator.CombinedLightsCoordinator(hass)
+    seen: list[str] = []
+    action = _recorder(seen)
+
+    shared.async_subscribe("entry", ["light.a", "light.b"], action)
+    kept = shared._remove_listeners["light.b"]
+    unsubscribe = shared.async_subscribe("entry", ["light.b", "light.c"], action)
+
+    assert shared._remove_listeners["light.b"] is kept
+    assert set(shared._remove_listeners) == {"light.b", "light.c"}
+    await _async_change(hass, "light.a", "light.b", "light.c")
+    assert seen == ["light.b", "light.c"]
+
+    unsubscribe()
+
+    assert not shared._remove_listeners
+    await _async_change(hass, "light.b", "light.c")
+    assert seen == ["light.b", "light.c"]
+
+
+async def test_changes_reach_only_the_owning_entries(hass: HomeAssistant) -> None:
+    """A child shared by two entries is routed to both, others to one."""
+    shared = coordinator.CombinedLightsCoordinator(hass)
+    first: list[str] = []
+    second: list[str] = []
+    unsubscribe_first = shared.async_subscribe(
+        "first", ["light.a", "light.shared"], _recorder(first)
+    )
+    shared.async_subscribe("second", ["light.shared", "light.b"], _recorder(second))
+
+    await _async_change(hass, "light.a", "light.shared", "light.b", "light.other")
+
+    assert first == ["light.a", "light.shared"]
+    assert second == ["light.shared", "light.b"]
+    assert shared.as_dict()["children"] == 3
+    assert shared.as_dict()["entries"] == 2
+
+    # The shared child stays subscribed while an entry still owns it
+    unsubscribe_first()
+    await _async_change(hass, "light.a", "light.shared")
+
+    assert first == ["light.a", "light.shared"]
+    assert second == ["light.shared", "light.b", "light.shared"]
+    assert set(shared._remove_listeners) == {"light.shared", "light.b"}
+
+
+async def test_commands_in_flight_are_shared(hass: HomeAssistant) -> None:
+    """An entry can join a call already sending a child its brightness."""
+    shared = coordinator.CombinedLightsCoordinator(hass)
+    context = Context()
+
+    shared.begin(["light.a", "light.b"], 128, context)
+
+    assert shared.in_flight("light.a", 128) is context
+    assert shared.in_flight("light.a", 64) is None
+    assert shared.in_flight("light.c", 128) is None
+    # Looking a call up is not skipping one
+    assert shared.duplicates_skipped == 0
+    # Every call is known to all entries, e.g. nested combined lights
+    assert context in shared.issued_contexts
+
+    shared.end(["light.a", "light.b"], context)
+
+    assert shared.in_flight("light.a", 128) is None
+    assert shared.as_dict()["commands_in_flight"] == 0
+
+
+async def test_latest_command_wins(hass: HomeAssistant) -> None:
+    """Conflicting calls are counted and the newest one is kept."""
+    shared = coordinator.CombinedLightsCoordinator(hass)
+    older = Context()
+    newer = Context()
+
+    shared.begin(["light.a"], 128, older)
+    shared.begin(["light.a"], 255, newer)
+    # The older call finishing does not clear the newer one
+    shared.end(["light.a"], older)
+
+    assert shared.conflicts == 1
+    assert shared.in_flight("light.a", 255) is newer
+    assert shared.in_flight("light.a", 128) is None
+
+
+async def test_entries_share_a_call_in_flight(hass: HomeAssistant) -> None:
+    """An entry skips sending what another one is already sending."""
+    fleet = LightFleet(hass, 1)
+    fleet.setup()
+    answer = fleet._async_turn_on
+
+    async def _async_slow_turn_on(call: ServiceCall) -> None:
+        await asyncio.sleep(0.05)
+        await answer(call)
+
+    hass.services.async_register("light", "turn_on", _async_slow_turn_on)
+    first, _ = await async_add_combined_light(
+        hass, create_config_entry(hass, [fleet.entity_ids])
+    )
+    second, _ = await async_add_combined_light(
+        hass, create_config_entry(hass, [fleet.entity_ids])
+    )
+
+    sending = hass.async_create_task(first.async_turn_on(brightness=200))
+    await asyncio.sleep(0.01)
+    await second.async_turn_on(brightness=200)
+    await sending
+    await hass.async_block_till_done()
+
+    assert fleet.service_calls == 1
+    assert coordinator.async_get_coordinator(hass).duplicates_skipped == 1
+    assert second.light_stats()[const.ATTR_COMMANDS_SUPPRESSED] == 1
@@ -0,0 +1,117 @@
+"""Tests of the Combined Lights instrumentation and diagnostics."""
+
+from __future__ import annotations
+
+from collections.abc import Iterable
+from typing import Any
+
+from homeassistant.components.light import ATTR_BRIGHTNESS
+from homeassistant.const import STATE_ON, STATE_UNAVAILABLE
+from homeassistant.core import CoreState, HomeAssistant
+
+from .common import (
+    LightFleet,
+    async_add_combined_light,
+    const,
+    coordinator,
+    create_config_entry,
+    diagnostics,
+    instrumentation,
+    sensor,
+)
+
+
+async def _async_add_instrumented(
+    hass: HomeAssistant, fleet: LightFleet
+) -> tuple[Any, Any, dict[str, Any]]:
+    """Add a combined light with instrumentation and its sensors."""
+    entry = create_config_entry(
+        hass,
+        [fleet.entity_ids],
+        **{const.CONF_INSTRUMENTATION: True, const.CONF_UPDATE_COALESCE_MS: 0},
+    )
+    coordinator.async_get_coordinator(hass).instrumentation[entry.entry_id] = (
+        instrumentation.Instrumentation()
+    )
+    combined_light, _ = await async_add_combined_light(hass, entry)
+
+    sensors: dict[str, Any] = {}
+
+    def _add_entities(entities: Iterable[Any]) -> None:
+        sensors.update((entity.entity_description.key, entity) for entity in entities)
+
+    await sensor.async_setup_entry(hass, entry, _add_entities)
+    return entry, combined_light, sensors
+
+
+async def test_diagnostics_and_sensors(hass: HomeAssistant) -> None:
+    """Own and external child changes are counted apart."""
+    fleet = LightFleet(hass, 1)
+    fleet.setup()
+    entry, combined_light, sensors = await _async_add_instrumented(hass, fleet)
+    (child,) = fleet.entity_ids
+
+    # One command, reported back as our own change
+    await combined_light.async_turn_on(brightness=200)
+    await hass.async_block_till_done()
+    # One change made by someone else
+    hass.states.async_set(child, STATE_ON, {ATTR_BRIGHTNESS: 20})
+    await hass.async_block_till_done()
+
+    data = await diagnostics.async_get_config_entry_diagnostics(hass, entry)
+
+    assert data["entry"]["title"] == entry.title
+    assert data["zone_plan"]["lights"] == 1
+    assert data["coordinator"]["children"] == 1
+    assert data["light"][const.ATTR_COMMANDS_SENT] == 1
+    assert data["light"][const.ATTR_FEEDBACK]["own_by_context"] == 1
+    assert data["light"][const.ATTR_FEEDBACK]["external"] == 1
+    stats = data["instrumentation"]
+    assert stats["events_filtered"] == 1
+    assert stats["events_processed"] == 1
+    assert stats["event_handler"]["count"] == 2
+    assert stats["dispatch"]["count"] == 1
+    assert stats["zone_brightness"]["count"] == 1
+    assert set(stats["child_dispatch_ms"]) == {child}
+
+    values = {key: entity.native_value for key, entity in sensors.items()}
+    assert values["events_filtered"] == 1
+    assert values["events_processed"] == 1
+    assert values["commands_sent"] == 1
+    assert values["commands_suppressed"] == 0
+    assert values["external_changes"] == 1
+    assert values["dispatch_latency"] is not None
+    assert values["zone_brightness_time"] is not None
+    assert values["event_handler_time"] is not None
+
+
+async def test_startup_reports_are_not_counted(hass: HomeAssistant) -> None:
+    """Children coming online while starting are neither filtered nor processed."""
+    hass.set_state(CoreState.not_running)
+    fleet = LightFleet(hass, 2)
+    fleet.setup()
+    for entity_id in fleet.entity_ids:
+        hass.states.async_set(entity_id, STATE_UNAVAILABLE)
+    entry, _, sensors = await _async_add_instrumented(hass, fleet)
+
+    for entity_id in fleet.entity_ids:
+        hass.states.async_set(entity_id, STATE_ON, {ATTR_BRIGHTNESS: 50})
+    await hass.async_block_till_done()
+
+    stats = coordinator.async_get_coordinator(hass).instrumentation[entry.entry_id]
+    assert stats.event_handler.count == 2
+    assert sensors["events_filtered"].native_value == 0
+    assert sensors["events_processed"].native_value == 0
+
+
+async def test_diagnostics_without_instrumentation(hass: HomeAssistant) -> None:
+    """Without instrumentation the diagnostics still show the light."""
+    fleet = LightFleet(hass, 1)
+    fleet.setup()
+    entry = create_config_entry(hass, [fleet.entity_ids])
+    await async_add_combined_light(hass, entry)
+
+    data = await diagnostics.async_get_config_entry_diagnostics(hass, entry)
+
+    assert data["instrumentation"] is None
+    assert data["light"][const.ATTR_COMMANDS_SENT] == 0
@@ -0,0 +1,118 @@
+"""Tests of the external change events of the Combined Lights light entity."""
+
+from __future__ import annotations
+
+from datetime import timedelta
+
+from pytest_homeassistant_custom_component.common import async_fire_time_changed
+
+from homeassistant.components.light import ATTR_BRIGHTNESS
+from homeassistant.const import STATE_ON
+from homeassistant.core import Context, Event, HomeAssistant, callback
+from homeassistant.util import dt as dt_util
+
+from .common import LightFleet, async_add_combined_light, const, create_config_entry
+
+WINDOW_MS = 1000
+
+
+async def _async_setup(
+    hass: HomeAssistant, mode: str
+) -> tuple[LightFleet, list[Event]]:
+    """Add a combined light reporting external changes in a mode."""
+    fleet = LightFleet(hass, 3)
+    fleet.setup()
+    entry = create_config_entry(
+        hass,
+        [fleet.entity_ids],
+        **{
+            const.CONF_EXTERNAL_CHANGE_EVENTS: mode,
+            const.CONF_EXTERNAL_CHANGE_WINDOW_MS: WINDOW_MS,
+        },
+    )
+    await async_add_combined_light(hass, entry)
+    events: list[Event] = []
+
+    @callback
+    def _async_event(event: Event) -> None:
+        events.append(event)
+
+    hass.bus.async_listen(const.EVENT_EXTERNAL_CHANGE, _async_event)
+    return fleet, events
+
+
+async def _async_change(
+    hass: HomeAssistant, entity_id: str, brightness: int
+) -> Context:
+    """Change a child the way a wall switch would."""
+    context = Context(user_id="user")
+    hass.states.async_set(
+        entity_id, STATE_ON, {ATTR_BRIGHTNESS: brightness}, context=context
+    )
+    await hass.async_block_till_done()
+    return context
+
+
+async def _async_end_window(hass: HomeAssistant) -> None:
+    """Let the summary window pass."""
+    async_fire_time_changed(
+        hass, dt_util.utcnow() + timedelta(milliseconds=WINDOW_MS + 100)
+    )
+    await hass.async_block_till_done()
+
+
+async def test_per_event(hass: HomeAssistant) -> None:
+    """Every external change fires an event of its own."""
+    fleet, events = await _async_setup(hass, const.EXTERNAL_CHANGE_EVENTS_PER_EVENT)
+    first, second = fleet.entity_ids[:2]
+
+    first_context = await _async_change(hass, first, 50)
+    second_context = await _async_change(hass, second, 60)
+
+    assert [event.data for event in events] == [
+        {"entity_id": first, "context_id": first_context.id},
+        {"entity_id": second, "context_id": second_context.id},
+    ]
+
+
+async def test_summary(hass: HomeAssistant) -> None:
+    """Changes within a window are summed up in one event."""
+    fleet, events = await _async_setup(hass, const.EXTERNAL_CHANGE_EVENTS_SUMMARY)
+    first, second, third = fleet.entity_ids
+
+    await _async_change(hass, first, 50)
+    second_context = await _async_change(hass, second, 60)
+    first_context = await _async_change(hass, first, 70)
+    assert not events
+
+    await _async_end_window(hass)
+
+    assert len(events) == 1
+    assert events[0].data == {
+        "entity_ids": [first, second],
+        "context_ids": [first_context.id, second_context.id],
+        "changes": 3,
+    }
+
+    # The next change opens a new window
+    third_context = await _async_change(hass, third, 80)
+    assert len(events) == 1
+    await _async_end_window(hass)
+
+    assert len(events) == 2
+    assert events[1].data == {
+        "entity_ids": [third],
+        "context_ids": [third_context.id],
+        "changes": 1,
+    }
+
+
+async def test_off(hass: HomeAssistant) -> None:
+    """With events off, external changes fire nothing."""
+    fleet, events = await _async_setup(hass, const.EXTERNAL_CHANGE_EVENTS_OFF)
+
+    for brightness, entity_id in enumerate(fleet.entity_ids, start=50):
+        await _async_change(hass, entity_id, brightness)
+    await _async_end_window(hass)
+
+    assert not events
@@ -0,0 +1,213 @@
+"""Tests of the feedback loop detection."""
+
+from __future__ import annotations
+
+from datetime import timedelta
+from types import SimpleNamespace
+
+import pytest
+from pytest_homeassistant_custom_component.common import async_fire_time_changed
+
+from homeassistant.components.light import ATTR_BRIGHTNESS
+from homeassistant.const import STATE_OFF, STATE_ON
+from homeassistant.core import Context, HomeAssistant, State
+from homeassistant.util import dt as dt_util
+
+from .common import feedback
+
+TTL = 30
+
+
+class Clock:
+    """A monotonic clock moved by hand."""
+
+    def __init__(self) -> None:
+        """Initialize the clock."""
+        self.now = 1000.0
+
+    def monotonic(self) -> float:
+        """Return the current time."""
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch: pytest.MonkeyPatch) -> Clock:
+    """Drive the feedback module by a hand-moved clock."""
+    clock = Clock()
+    monkeypatch.setattr(feedback, "time", SimpleNamespace(monotonic=clock.monotonic))
+    return clock
+
+
+def test_expected_state_lookups_are_counted(clock: Clock) -> None:
+    """Valid, missing and expired expectations are counted apart."""
+    store = feedback.ExpectedStateStore(ttl=TTL)
+    store.set("light.a", 128)
+    store.set("light.b", 0)
+
+    assert store.get("light.a") == 128
+    assert store.pop("light.a") == 128
+    assert store.pop("light.a") is None
+    assert store.pop("light.b") == 0
+
+    store.set("light.c", 64)
+    clock.now += TTL + 1
+    assert store.get("light.c") is None
+    assert store.pop("light.c") is None
+
+    assert store.as_dict() == {
+        "size": 0,
+        "hits": 2,
+        "misses": 1,
+        "expired": 1,
+        "evicted": 0,
+    }
+
+
+def test_recent_expectations(clock: Clock) -> None:
+    """An expectation can be looked up only while it is recent."""
+    store = feedback.ExpectedStateStore(ttl=TTL)
+    store.set("light.a", 128)
+
+    clock.now += 1
+    assert store.get("light.a", max_age=2) == 128
+    clock.now += 2
+    assert store.get("light.a", max_age=2) is None
+    # It is still kept for classifying a late report
+    assert store.get("light.a") == 128
+
+
+def test_expected_state_store_is_bounded(clock: Clock) -> None:
+    """The oldest expectations make way once the store is full."""
+    store = feedback.ExpectedStateStore(ttl=TTL, max_size=3)
+    for value, entity_id in enumerate(("light.a", "light.b", "light.c"), start=1):
+        store.set(entity_id, value)
+    # Setting a light again makes it the newest
+    store.set("light.a", 10)
+    store.set("light.d", 4)
+
+    assert len(store) == 3
+    assert store.evicted == 1
+    assert store.get("light.b") is None
+    assert store.get("light.a") == 10
+
+
+async def test_expected_states_are_swept(hass: HomeAssistant, clock: Clock) -> None:
+    """Expectations of children that never report back are dropped."""
+    store = feedback.ExpectedStateStore(ttl=TTL)
+    store.async_start(hass)
+    store.set("light.a", 128)
+    clock.now += TTL / 2
+    store.set("light.b", 64)
+
+    clock.now += TTL / 2 + 1
+    async_fire_time_changed(hass, dt_util.utcnow() + timedelta(seconds=TTL + 1))
+    await hass.async_block_till_done()
+
+    assert len(store) == 1
+    assert store.expired == 1
+
+    clock.now += TTL
+    async_fire_time_changed(hass, dt_util.utcnow() + timedelta(seconds=2 * TTL))
+    await hass.async_block_till_done()
+
+    assert len(store) == 0
+    assert store.expired == 2
+    store.async_stop()
+
+
+def _on(brightness: int) -> State:
+    """Return the state of a child on at a brightness."""
+    return State("light.a", STATE_ON, {ATTR_BRIGHTNESS: brightness})
+
+
+def test_own_contexts_are_recognized(clock: Clock) -> None:
+    """Changes carrying our context, or one derived from it, are ours."""
+    tracker = feedback.FeedbackTracker()
+    context = tracker.new_context(Context(user_id="user"))
+    tracker.expect("light.a", 128)
+
+    assert tracker.is_own_change("light.a", _on(128), context)
+    assert tracker.is_own_change("light.a", _on(90), Context(parent_id=context.id))
+    assert tracker.own_by_context == 2
+    assert tracker.false_negatives == 0
+
+    # Once forgotten, a context that clearly belongs to someone is external
+    clock.now += feedback.FEEDBACK_CONTEXT_TTL + 1
+    assert not tracker.is_own_change("light.a", _on(128), context)
+    assert tracker.external == 1
+
+
+def test_anonymous_changes_fall_back_to_the_brightness(clock: Clock) -> None:
+    """Without a telling context, the expected brightness decides."""
+    tracker = feedback.FeedbackTracker(tolerance=5)
+    tracker.expect("light.a", 128)
+    tracker.expect("light.b", 0)
+
+    assert tracker.is_own_change("light.a", _on(124), Context())
+    assert tracker.is_own_change("light.b", State("light.b", STATE_OFF), Context())
+    # The expectation was used up by the first report
+    assert not tracker.is_own_change("light.a", _on(124), Context())
+    tracker.expect("light.a", 128)
+    assert not tracker.is_own_change("light.a", _on(100), Context())
+
+    assert tracker.own_by_state == 2
+    assert tracker.external == 2
+
+
+def test_disagreements_are_measured(clock: Clock) -> None:
+    """The brightness match is checked against the context when both tell."""
+    tracker = feedback.FeedbackTracker()
+    context = tracker.new_context(None)
+
+    # Ours, but the child did not reach the brightness
+    tracker.expect("light.a", 128)
+    assert tracker.is_own_change("light.a", _on(30), context)
+    # A user happened to pick the brightness we asked for
+    tracker.expect("light.a", 128)
+    assert not tracker.is_own_change("light.a", _on(128), Context(user_id="user"))
+
+    assert tracker.as_dict() == {
+        "other_lights": 0,
+        "own_by_context": 1,
+        "own_by_state": 0,
+        "external": 1,
+        "false_positives": 1,
+        "false_negatives": 1,
+        "tracked_contexts": 1,
+        "expected_states": {
+            "size": 0,
+            "hits": 2,
+            "misses": 0,
+            "expired": 0,
+            "evicted": 0,
+        },
+    }
+
+
+def test_contexts_are_bounded(clock: Clock) -> None:
+    """Only the most recent contexts are remembered."""
+    tracker = feedback.FeedbackTracker(max_contexts=2)
+    first, second, third = (tracker.new_context(None) for _ in range(3))
+
+    assert tracker.as_dict()["tracked_contexts"] == 2
+    assert not tracker.is_own_change("light.a", _on(1), Context(parent_id=first.id))
+    assert tracker.is_own_change("light.a", _on(1), second)
+    assert tracker.is_own_change("light.a", _on(1), third)
+
+
+def test_other_light_changes(clock: Clock) -> None:
+    """Commands of other combined lights are told apart from ours."""
+    shared = feedback.IssuedContexts()
+    tracker = feedback.FeedbackTracker()
+    own = tracker.new_context(None)
+    shared.add(own)
+    other = Context()
+    shared.add(other)
+    tracker.expect("light.a", 128)
+
+    assert not tracker.is_other_light_change("light.a", own, shared)
+    assert not tracker.is_other_light_change("light.a", Context(), shared)
+    assert tracker.is_other_light_change("light.a", Context(parent_id=other.id), shared)
+    # Our expectation was replaced by the other light's command
+    assert tracker.expected.get("light.a") is None
+    assert tracker.other_lights == 1
@@ -0,0 +1,89 @@
+"""Tests of the Combined Lights setup."""
+
+from __future__ import annotations
+
+from unittest.mock import AsyncMock
+
+import pytest
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from homeassistant.config_entries import ConfigEntryState
+from homeassistant.core import HomeAssistant
+
+from .common import const, coordinator, create_config_entry, integration, zone_plan
+
+
+async def test_migrate_fixed_zones(hass: HomeAssistant) -> None:
+    """The four fixed zones of version 1 become per-zone lists."""
+    entry = MockConfigEntry(
+        domain=const.DOMAIN,
+        version=1,
+        title="Living room",
+        data={
+            const.CONF_NAME: "Living room",
+            const.CONF_STAGE_1_LIGHTS: ["light.a"],
+            const.CONF_STAGE_2_LIGHTS: ["light.b", "light.c"],
+            const.CONF_STAGE_3_LIGHTS: [],
+            const.CONF_STAGE_4_LIGHTS: ["light.d"],
+            const.CONF_STAGE_2_BRIGHTNESS_RANGES: [
+                [0, 0],
+                [1, 40],
+                [40, 80],
+                [80, 100],
+            ],
+            const.CONF_BREAKPOINTS: [30, 60, 90],
+        },
+    )
+    entry.add_to_hass(hass)
+
+    assert await integration.async_migrate_entry(hass, entry)
+
+    assert entry.version == 2
+    assert entry.data[const.CONF_ZONE_LIGHTS] == [
+        ["light.a"],
+        ["light.b", "light.c"],
+        [],
+        ["light.d"],
+    ]
+    assert entry.data[const.CONF_ZONE_BRIGHTNESS_RANGES] == [
+        const.DEFAULT_STAGE_1_BRIGHTNESS_RANGES,
+        [[0, 0], [1, 40], [40, 80], [80, 100]],
+        const.DEFAULT_STAGE_3_BRIGHTNESS_RANGES,
+        const.DEFAULT_STAGE_4_BRIGHTNESS_RANGES,
+    ]
+    assert not any(key.startswith("stage_") for key in entry.data)
+    assert entry.data[const.CONF_BREAKPOINTS] == [30, 60, 90]
+    # The migrated data compiles as it is
+    zone_plan.compile_zone_plan(entry.data)
+
+
+async def test_migrate_from_future_version(hass: HomeAssistant) -> None:
+    """Entries of a newer version are left alone."""
+    entry = MockConfigEntry(domain=const.DOMAIN, version=3, data={})
+    entry.add_to_hass(hass)
+
+    assert not await integration.async_migrate_entry(hass, entry)
+    assert entry.version == 3
+
+
+async def test_coordinator_goes_with_the_last_entry(
+    hass: HomeAssistant, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """The shared coordinator is dropped once no entry is loaded."""
+    monkeypatch.setattr(
+        hass.config_entries,
+        "async_unload_platforms",
+        AsyncMock(return_value=True),
+    )
+    first = create_config_entry(hass, [["light.a"]])
+    second = create_config_entry(hass, [["light.b"]])
+    for entry in (first, second):
+        entry.mock_state(hass, ConfigEntryState.LOADED)
+    shared = coordinator.async_get_coordinator(hass)
+
+    assert await integration.async_unload_entry(hass, first)
+    first.mock_state(hass, ConfigEntryState.NOT_LOADED)
+    assert coordinator.async_get_coordinator(hass) is shared
+
+    assert await integration.async_unload_entry(hass, second)
+    assert const.DOMAIN not in hass.data
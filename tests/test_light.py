@@ -0,0 +1,313 @@
+"""Tests of the Combined Lights light entity."""
+
+from __future__ import annotations
+
+import asyncio
+from typing import Any
+
+import pytest
+from pytest_homeassistant_custom_component.common import (
+    mock_restore_cache_with_extra_data,
+)
+
+from homeassistant.components.light import ATTR_BRIGHTNESS
+from homeassistant.const import (
+    EVENT_HOMEASSISTANT_STARTED,
+    STATE_OFF,
+    STATE_ON,
+    STATE_UNAVAILABLE,
+)
+from homeassistant.core import (
+    CoreState,
+    Event,
+    HomeAssistant,
+    ServiceCall,
+    State,
+    callback,
+)
+from homeassistant.helpers.dispatcher import async_dispatcher_send
+
+from .common import (
+    LightFleet,
+    async_add_combined_light,
+    const,
+    create_config_entry,
+    light,
+    split_into_zones,
+    zone_plan,
+)
+from .simulation import FleetProfile, SimulatedLightFleet
+
+ENTITY_ID = "light.combined"
+
+
+def _external_changes(hass: HomeAssistant) -> list[Event]:
+    """Collect the external change events fired from now on."""
+    events: list[Event] = []
+
+    @callback
+    def _async_event(event: Event) -> None:
+        events.append(event)
+
+    hass.bus.async_listen(const.EVENT_EXTERNAL_CHANGE, _async_event)
+    return events
+
+
+async def _async_start_with_unavailable_children(
+    hass: HomeAssistant, restored_brightness: int | None
+) -> tuple[Any, LightFleet]:
+    """Add a combined light while starting, with every child unavailable."""
+    hass.set_state(CoreState.not_running)
+    fleet = LightFleet(hass, 4)
+    fleet.setup()
+    for entity_id in fleet.entity_ids:
+        hass.states.async_set(entity_id, STATE_UNAVAILABLE)
+    entry = create_config_entry(hass, split_into_zones(fleet.entity_ids))
+    if restored_brightness is not None:
+        plan = entry.runtime_data
+        mock_restore_cache_with_extra_data(
+            hass,
+            (
+                (
+                    State(ENTITY_ID, STATE_ON),
+                    {
+                        "target_brightness": restored_brightness,
+                        "stage": plan.stage_table[restored_brightness],
+                        "plan_fingerprint": plan.fingerprint,
+                    },
+                ),
+            ),
+        )
+    combined_light, _ = await async_add_combined_light(hass, entry)
+    return combined_light, fleet
+
+
+def _report(hass: HomeAssistant, entity_id: str, brightness: int) -> None:
+    """Let a child report itself on, as a device coming online does."""
+    hass.states.async_set(entity_id, STATE_ON, {ATTR_BRIGHTNESS: brightness})
+
+
+async def test_children_coming_online_keep_restored_target(
+    hass: HomeAssistant,
+) -> None:
+    """Children coming online while starting are not external changes."""
+    combined_light, fleet = await _async_start_with_unavailable_children(hass, 200)
+    events = _external_changes(hass)
+
+    _report(hass, fleet.entity_ids[0], 50)
+    await hass.async_block_till_done()
+
+    assert combined_light.brightness == 200
+    assert not events
+
+    for entity_id in fleet.entity_ids[1:]:
+        _report(hass, entity_id, 50)
+    await hass.async_block_till_done()
+
+    assert hass.states.get(ENTITY_ID).attributes[ATTR_BRIGHTNESS] == 200
+    assert not events
+
+
+async def test_reconcile_at_startup_without_every_child(hass: HomeAssistant) -> None:
+    """A child that never comes back does not block deriving the target."""
+    combined_light, fleet = await _async_start_with_unavailable_children(hass, None)
+    events = _external_changes(hass)
+
+    # All but one child come online at a low brightness of their zones
+    for entity_id in fleet.entity_ids[:-1]:
+        _report(hass, entity_id, 20)
+    await hass.async_block_till_done()
+    hass.bus.async_fire(EVENT_HOMEASSISTANT_STARTED)
+    await hass.async_block_till_done()
+
+    state = hass.states.get(ENTITY_ID)
+    assert state.state == STATE_ON
+    assert state.attributes[ATTR_BRIGHTNESS] < 255
+    assert not events
+
+    # Once reconciled, changes of the remaining child count again
+    _report(hass, fleet.entity_ids[-1], 20)
+    await hass.async_block_till_done()
+
+    assert len(events) == 1
+    assert combined_light.brightness < 255
+
+
+async def test_return_to_reported_brightness_while_command_pending(
+    hass: HomeAssistant,
+) -> None:
+    """A command not reported back yet is not mistaken for the child state."""
+    fleet = SimulatedLightFleet(hass, 1, FleetProfile("slow", latency=0.02))
+    fleet.setup()
+    entry = create_config_entry(
+        hass,
+        [fleet.entity_ids],
+        **{const.CONF_MIN_DISPATCH_INTERVAL_MS: 0},
+    )
+    combined_light, _ = await async_add_combined_light(hass, entry)
+    (child,) = fleet.entity_ids
+    low = entry.runtime_data.light_targets(100)[child]
+
+    await combined_light.async_turn_on(brightness=100)
+    await fleet.async_settle()
+    assert fleet.brightness(child) == low
+
+    # The child still reports the low brightness while the next two commands
+    # are on their way
+    await combined_light.async_turn_on(brightness=255)
+    await combined_light.async_turn_on(brightness=100)
+    await fleet.async_settle()
+
+    assert fleet.brightness(child) == low
+    assert fleet.commands == 3
+
+
+async def test_unchanged_child_reports_write_no_new_state(
+    hass: HomeAssistant,
+) -> None:
+    """Statistics are not state attributes, so unchanged states are deduped."""
+    fleet = LightFleet(hass, 4)
+    fleet.setup()
+    entry = create_config_entry(
+        hass,
+        split_into_zones(fleet.entity_ids),
+        **{const.CONF_UPDATE_COALESCE_MS: 0},
+    )
+    combined_light, _ = await async_add_combined_light(hass, entry)
+    await combined_light.async_turn_on(brightness=128)
+    await hass.async_block_till_done()
+
+    changes: list[Event] = []
+
+    @callback
+    def _async_state_changed(event: Event) -> None:
+        if event.data["entity_id"] == ENTITY_ID:
+            changes.append(event)
+
+    hass.bus.async_listen("state_changed", _async_state_changed)
+    child = fleet.entity_ids[0]
+    state = hass.states.get(child)
+    for report in range(5):
+        hass.states.async_set(
+            child, state.state, {**state.attributes, "linkquality": report}
+        )
+        await hass.async_block_till_done()
+
+    assert not changes
+    assert hass.states.get(ENTITY_ID).attributes[ATTR_BRIGHTNESS] == 128
+
+
+async def test_late_child_reports_are_written(hass: HomeAssistant) -> None:
+    """Children reporting after the call returned still turn the state on."""
+    fleet = SimulatedLightFleet(hass, 4, FleetProfile("slow", latency=0.02))
+    fleet.setup()
+    entry = create_config_entry(hass, split_into_zones(fleet.entity_ids))
+    combined_light, _ = await async_add_combined_light(hass, entry)
+
+    await combined_light.async_turn_on(brightness=200)
+    await fleet.async_settle()
+    await asyncio.sleep(const.DEFAULT_UPDATE_MAX_LATENCY_MS / 1000)
+    await hass.async_block_till_done()
+
+    state = hass.states.get(ENTITY_ID)
+    assert state.state == STATE_ON
+    assert state.attributes[ATTR_BRIGHTNESS] == 200
+
+    await combined_light.async_turn_off()
+    await fleet.async_settle()
+    await asyncio.sleep(const.DEFAULT_UPDATE_MAX_LATENCY_MS / 1000)
+    await hass.async_block_till_done()
+
+    assert hass.states.get(ENTITY_ID).state == STATE_OFF
+
+
+async def test_plan_update_follows_the_children(hass: HomeAssistant) -> None:
+    """After the stages change, the target is where the children now are."""
+    fleet = LightFleet(hass, 4)
+    fleet.setup()
+    entry = create_config_entry(hass, split_into_zones(fleet.entity_ids))
+    combined_light, _ = await async_add_combined_light(hass, entry)
+    await combined_light.async_turn_on(brightness=128)
+    await hass.async_block_till_done()
+    children = {
+        entity_id: hass.states.get(entity_id).attributes.get(ATTR_BRIGHTNESS, 0)
+        for entity_id in fleet.entity_ids
+    }
+    service_calls = fleet.service_calls
+
+    hass.config_entries.async_update_entry(
+        entry, data={**entry.data, const.CONF_BREAKPOINTS: [10, 20, 30]}
+    )
+    entry.runtime_data = zone_plan.compile_zone_plan(entry.data)
+    async_dispatcher_send(hass, const.SIGNAL_PLAN_UPDATED.format(entry.entry_id))
+    await hass.async_block_till_done()
+
+    brightness = hass.states.get(ENTITY_ID).attributes[ATTR_BRIGHTNESS]
+    assert brightness != 128
+    targets = entry.runtime_data.light_targets(brightness)
+    for entity_id, value in children.items():
+        assert (targets[entity_id] == 0) == (value == 0)
+    # Nothing was sent to the children
+    assert fleet.service_calls == service_calls
+
+
+async def test_queued_commands_do_not_time_out(
+    hass: HomeAssistant,
+    monkeypatch: pytest.MonkeyPatch,
+    caplog: pytest.LogCaptureFixture,
+) -> None:
+    """The command timeout starts when a command is sent, not when queued."""
+    monkeypatch.setattr(light, "CHILD_COMMAND_TIMEOUT", 0.05)
+    fleet = LightFleet(hass, 4)
+    fleet.setup()
+    answer = fleet._async_turn_on
+
+    async def _async_slow_turn_on(call: ServiceCall) -> None:
+        await asyncio.sleep(0.03)
+        await answer(call)
+
+    hass.services.async_register("light", "turn_on", _async_slow_turn_on)
+    entry = create_config_entry(
+        hass,
+        split_into_zones(fleet.entity_ids),
+        **{const.CONF_MAX_CONCURRENT_COMMANDS: 1},
+    )
+    combined_light, _ = await async_add_combined_light(hass, entry)
+    targets = entry.runtime_data.light_targets(230)
+    # One call per zone, so they have to wait for each other
+    assert len(set(targets.values())) == 4
+
+    await combined_light.async_turn_on(brightness=230)
+    await hass.async_block_till_done()
+
+    assert fleet.service_calls == 4
+    assert "Failed to control lights" not in caplog.text
+
+
+async def test_command_missed_by_a_child_is_sent_again(
+    hass: HomeAssistant, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Once a command is no longer pending, the reported state counts."""
+    monkeypatch.setattr(light, "COMMAND_PENDING_WINDOW", 0.05)
+    # The child never reports back
+    fleet = SimulatedLightFleet(hass, 1, FleetProfile("deaf", drop_rate=1.0))
+    fleet.setup()
+    entry = create_config_entry(
+        hass,
+        [fleet.entity_ids],
+        **{const.CONF_MIN_DISPATCH_INTERVAL_MS: 0},
+    )
+    combined_light, _ = await async_add_combined_light(hass, entry)
+
+    await combined_light.async_turn_on(brightness=200)
+    # Repeating the command right away is still skipped
+    await combined_light.async_turn_on(brightness=200)
+    await hass.async_block_till_done()
+    assert fleet.service_calls == 1
+
+    await asyncio.sleep(0.06)
+    await combined_light.async_turn_on(brightness=200)
+    await hass.async_block_till_done()
+
+    assert fleet.service_calls == 2
+    assert fleet.dropped == 2
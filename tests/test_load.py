@@ -0,0 +1,140 @@
+"""Load tests of Combined Lights against a simulated light fleet.
+
+Each workload prints a report with its throughput, latency percentiles,
+command counts and misclassified feedback events. See them with
+
+    pytest tests/test_load.py -s
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import AsyncGenerator
+from typing import Any
+
+import pytest
+
+from homeassistant.components.light import ATTR_BRIGHTNESS
+from homeassistant.const import STATE_OFF, STATE_ON
+from homeassistant.core import HomeAssistant, State
+
+from .common import (
+    async_add_combined_light,
+    const,
+    create_config_entry,
+    split_into_zones,
+)
+from .simulation import (
+    IDEAL,
+    LOSSY,
+    SLOW,
+    FleetProfile,
+    LoadReport,
+    SimulatedLightFleet,
+    async_scene_storm,
+    async_slider_drag,
+    async_unrelated_flood,
+)
+
+CHILD_COUNTS = (10, 100)
+PROFILES = (IDEAL, SLOW, LOSSY)
+
+
+@pytest.fixture(params=CHILD_COUNTS, ids=lambda count: f"{count}_children")
+def child_count(request: pytest.FixtureRequest) -> int:
+    """Return the number of simulated lights."""
+    return request.param
+
+
+@pytest.fixture(params=PROFILES, ids=lambda profile: profile.name)
+def profile(request: pytest.FixtureRequest) -> FleetProfile:
+    """Return how the simulated lights behave."""
+    return request.param
+
+
+@pytest.fixture
+def fleet(
+    hass: HomeAssistant, child_count: int, profile: FleetProfile
+) -> SimulatedLightFleet:
+    """Return a simulated light fleet."""
+    fleet = SimulatedLightFleet(hass, child_count, profile)
+    fleet.setup()
+    return fleet
+
+
+@pytest.fixture
+async def combined_light(
+    hass: HomeAssistant, fleet: SimulatedLightFleet
+) -> AsyncGenerator[Any]:
+    """Return a combined light controlling the fleet in four zones."""
+    entry = create_config_entry(hass, split_into_zones(fleet.entity_ids))
+    combined_light, platform = await async_add_combined_light(hass, entry)
+    yield combined_light
+    await platform.async_reset()
+    await hass.async_block_till_done()
+
+
+def _print_report(report: LoadReport) -> None:
+    """Show a report in the test output."""
+    print(report.format())
+
+
+async def _async_written_state(hass: HomeAssistant, combined_light: Any) -> State:
+    """Return the state users see once coalesced state writes are done."""
+    await asyncio.sleep(const.DEFAULT_UPDATE_MAX_LATENCY_MS / 1000)
+    await hass.async_block_till_done()
+    return hass.states.get(combined_light.entity_id)
+
+
+async def test_slider_drag(
+    hass: HomeAssistant, fleet: SimulatedLightFleet, combined_light: Any
+) -> None:
+    """Dragging the slider sends few commands and reaches the final value."""
+    report = await async_slider_drag(hass, combined_light, fleet)
+    _print_report(report)
+
+    assert report.misclassified == 0
+    assert len(report.latencies) == report.operations
+    # Children only hear about changes of their own brightness
+    assert report.commands <= report.operations * report.children
+    state = await _async_written_state(hass, combined_light)
+    assert state.state == STATE_ON
+    assert state.attributes[ATTR_BRIGHTNESS] == 255
+    if not fleet.profile.drop_rate:
+        assert all(fleet.brightness(entity_id) for entity_id in fleet.entity_ids)
+
+    # Turning off is shown once the children report it, however late
+    await combined_light.async_turn_off()
+    await fleet.async_settle()
+    state = await _async_written_state(hass, combined_light)
+    if not fleet.profile.drop_rate:
+        assert state.state == STATE_OFF
+
+
+async def test_scene_storm(
+    hass: HomeAssistant, fleet: SimulatedLightFleet, combined_light: Any
+) -> None:
+    """Scenes are reported as external changes and never cause commands."""
+    report = await async_scene_storm(hass, combined_light, fleet)
+    _print_report(report)
+
+    assert report.misclassified == 0
+    assert report.service_calls == 0
+    assert report.latencies
+    state = await _async_written_state(hass, combined_light)
+    assert (state.state == STATE_ON) == any(
+        fleet.brightness(entity_id) for entity_id in fleet.entity_ids
+    )
+
+
+async def test_unrelated_flood(
+    hass: HomeAssistant, fleet: SimulatedLightFleet, combined_light: Any
+) -> None:
+    """Changes of other entities leave the combined light alone."""
+    state = hass.states.get(combined_light.entity_id)
+    report = await async_unrelated_flood(hass, combined_light, fleet)
+    _print_report(report)
+
+    assert report.misclassified == 0
+    assert report.service_calls == 0
+    assert hass.states.get(combined_light.entity_id) == state
@@ -0,0 +1,141 @@
+"""Tests of nested Combined Lights."""
+
+from __future__ import annotations
+
+import pytest
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from homeassistant.components.light import ATTR_BRIGHTNESS
+from homeassistant.config_entries import SOURCE_RECONFIGURE
+from homeassistant.const import STATE_ON
+from homeassistant.core import Event, HomeAssistant, callback
+from homeassistant.exceptions import ConfigEntryError
+
+from .common import (
+    LightFleet,
+    async_add_combined_light,
+    config_flow,
+    const,
+    create_config_entry,
+    integration,
+    nesting,
+    register_combined_light,
+)
+
+
+def test_nested_lights_are_flattened(hass: HomeAssistant) -> None:
+    """The zones of a nested combined light take its place."""
+    child = create_config_entry(hass, [["light.c"], ["light.d"]])
+    nested_light = register_combined_light(hass, child)
+    parent = create_config_entry(hass, [["light.a"], ["light.b", nested_light]])
+
+    plan = nesting.compile_flat_zone_plan(hass, parent.entry_id, parent.data)
+
+    assert set(plan.all_lights) == {"light.a", "light.b", "light.c", "light.d"}
+    assert plan.nested_entry_ids == {child.entry_id}
+
+
+def test_invalid_nested_light_is_a_plain_light(hass: HomeAssistant) -> None:
+    """A nested combined light with invalid zones does not fail its parent."""
+    child = create_config_entry(hass, [["light.c"], ["light.d"]])
+    hass.config_entries.async_update_entry(
+        child, data={**child.data, const.CONF_BREAKPOINTS: [80, 20]}
+    )
+    nested_light = register_combined_light(hass, child)
+    parent = create_config_entry(hass, [["light.a"], ["light.b", nested_light]])
+
+    plan = nesting.compile_flat_zone_plan(hass, parent.entry_id, parent.data)
+
+    assert set(plan.all_lights) == {"light.a", "light.b", nested_light}
+    # Fixing the nested entry still recompiles the parent
+    assert plan.nested_entry_ids == {child.entry_id}
+
+
+def _add_cycle(hass: HomeAssistant) -> tuple[MockConfigEntry, MockConfigEntry]:
+    """Add two combined lights that contain each other."""
+    first = create_config_entry(hass, [["light.a"], ["light.b"]])
+    second = create_config_entry(
+        hass, [["light.c"], [register_combined_light(hass, first)]]
+    )
+    hass.config_entries.async_update_entry(
+        first,
+        data={
+            **first.data,
+            const.CONF_ZONE_LIGHTS: [
+                ["light.a"],
+                ["light.b", register_combined_light(hass, second)],
+            ],
+        },
+    )
+    return first, second
+
+
+def test_cycle_is_rejected(hass: HomeAssistant) -> None:
+    """Combined lights containing each other cannot be compiled."""
+    first, second = _add_cycle(hass)
+
+    for entry in (first, second):
+        with pytest.raises(nesting.NestingCycleError):
+            nesting.compile_flat_zone_plan(hass, entry.entry_id, entry.data)
+
+
+async def test_cycle_fails_setup(hass: HomeAssistant) -> None:
+    """An entry caught in a cycle fails to set up instead of looping."""
+    first, _ = _add_cycle(hass)
+
+    with pytest.raises(ConfigEntryError, match="contain each other"):
+        await integration.async_setup_entry(hass, first)
+
+
+async def test_reconfigure_rejects_a_cycle(hass: HomeAssistant) -> None:
+    """Picking a combined light that contains this one is an error."""
+    inner = create_config_entry(hass, [["light.a"], ["light.b"]])
+    outer = create_config_entry(
+        hass, [["light.c"], [register_combined_light(hass, inner)]]
+    )
+    flow = config_flow.CombinedLightsConfigFlow()
+    flow.hass = hass
+    flow.context = {"source": SOURCE_RECONFIGURE, "entry_id": inner.entry_id}
+    flow._config_data = dict(inner.data)
+    flow._zone_count = 2
+
+    result = await flow.async_step_reconfigure_zones(
+        {
+            "zone_1_lights": ["light.a"],
+            "zone_2_lights": ["light.b", register_combined_light(hass, outer)],
+        }
+    )
+
+    assert result["step_id"] == "reconfigure_zones"
+    assert result["errors"] == {"base": "nested_cycle"}
+
+
+async def test_commands_of_a_parent_are_not_external(hass: HomeAssistant) -> None:
+    """A nested light follows its parent driving the shared children."""
+    fleet = LightFleet(hass, 2)
+    fleet.setup()
+    zones = [[entity_id] for entity_id in fleet.entity_ids]
+    # The parent drives the leaf lights of the nested light directly
+    parent_light, _ = await async_add_combined_light(
+        hass, create_config_entry(hass, zones)
+    )
+    nested_light, _ = await async_add_combined_light(
+        hass,
+        create_config_entry(hass, zones, **{const.CONF_UPDATE_COALESCE_MS: 0}),
+    )
+    events: list[Event] = []
+
+    @callback
+    def _async_external_change(event: Event) -> None:
+        events.append(event)
+
+    hass.bus.async_listen(const.EVENT_EXTERNAL_CHANGE, _async_external_change)
+
+    await parent_light.async_turn_on(brightness=200)
+    await hass.async_block_till_done()
+
+    assert not events
+    state = hass.states.get(nested_light.entity_id)
+    assert state.state == STATE_ON
+    assert state.attributes[ATTR_BRIGHTNESS] == 200
+    assert nested_light.light_stats()[const.ATTR_FEEDBACK]["other_lights"] == 2
@@ -0,0 +1,99 @@
+"""Tests of transitions of the Combined Lights light entity."""
+
+from __future__ import annotations
+
+import asyncio
+from typing import Any
+
+from homeassistant.components.light import (
+    ATTR_BRIGHTNESS,
+    ATTR_TRANSITION,
+    LightEntityFeature,
+)
+from homeassistant.const import STATE_OFF
+from homeassistant.core import HomeAssistant
+
+from .common import LightFleet, async_add_combined_light, const, create_config_entry
+
+CHILD = "light.fleet_0"
+
+
+async def _async_add(
+    hass: HomeAssistant, supported_features: int, step_rate: float = 2
+) -> tuple[Any, LightFleet]:
+    """Add a combined light with a single child."""
+    fleet = LightFleet(hass, 1, supported_features)
+    fleet.setup()
+    entry = create_config_entry(
+        hass,
+        [fleet.entity_ids],
+        **{
+            const.CONF_MIN_DISPATCH_INTERVAL_MS: 0,
+            const.CONF_TRANSITION_STEP_RATE: step_rate,
+        },
+    )
+    combined_light, _ = await async_add_combined_light(hass, entry)
+    return combined_light, fleet
+
+
+async def test_transition_is_passed_to_capable_children(hass: HomeAssistant) -> None:
+    """Children that can fade by themselves get the transition."""
+    combined_light, fleet = await _async_add(hass, LightEntityFeature.TRANSITION)
+
+    await combined_light.async_turn_on(brightness=255, transition=3)
+    await combined_light.async_turn_off(transition=2)
+    await hass.async_block_till_done()
+
+    assert fleet.calls == [
+        ("turn_on", {"entity_id": [CHILD], ATTR_BRIGHTNESS: 255, ATTR_TRANSITION: 3}),
+        ("turn_off", {"entity_id": [CHILD], ATTR_TRANSITION: 2}),
+    ]
+    assert combined_light._fade_task is None
+
+
+async def test_stepped_fade(hass: HomeAssistant) -> None:
+    """Children without transition support are faded in steps."""
+    combined_light, fleet = await _async_add(hass, 0, step_rate=20)
+
+    await combined_light.async_turn_on(brightness=255, transition=0.2)
+    # Nothing is sent right away; the first step follows after an interval
+    assert not fleet.calls
+    await combined_light._fade_task
+
+    # 0.2 s at 20 steps per second
+    assert [data[ATTR_BRIGHTNESS] for _, data in fleet.calls] == [63, 127, 191, 255]
+    assert all(ATTR_TRANSITION not in data for _, data in fleet.calls)
+    assert hass.states.get(CHILD).attributes[ATTR_BRIGHTNESS] == 255
+
+
+async def test_stepped_fade_to_off(hass: HomeAssistant) -> None:
+    """Turning off with a transition fades down and then turns the child off."""
+    combined_light, fleet = await _async_add(hass, 0, step_rate=10)
+    await combined_light.async_turn_on(brightness=255)
+    await hass.async_block_till_done()
+    fleet.calls.clear()
+
+    await combined_light.async_turn_off(transition=0.2)
+    await combined_light._fade_task
+
+    assert fleet.calls == [
+        ("turn_on", {"entity_id": [CHILD], ATTR_BRIGHTNESS: 127}),
+        ("turn_off", {"entity_id": [CHILD]}),
+    ]
+    assert hass.states.get(CHILD).state == STATE_OFF
+
+
+async def test_new_target_cancels_a_fade(hass: HomeAssistant) -> None:
+    """A new target replaces a fade still running."""
+    combined_light, fleet = await _async_add(hass, 0, step_rate=10)
+
+    await combined_light.async_turn_on(brightness=255, transition=0.2)
+    fade = combined_light._fade_task
+    await combined_light.async_turn_on(brightness=50)
+    await asyncio.sleep(0.25)
+    await hass.async_block_till_done()
+
+    assert fade.cancelled()
+    assert combined_light._fade_task is None
+    target = combined_light._plan.light_targets(50)[CHILD]
+    assert fleet.calls == [("turn_on", {"entity_id": [CHILD], ATTR_BRIGHTNESS: target})]
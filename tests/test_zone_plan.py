@@ -0,0 +1,227 @@
+"""Tests of the compiled zone plan."""
+
+from __future__ import annotations
+
+from array import array
+from typing import Any
+
+import pytest
+
+from .common import const, zone_plan
+
+
+def _zone_lights(zone_count: int) -> list[list[str]]:
+    """Return one light per zone."""
+    return [[f"light.zone_{zone}"] for zone in range(1, zone_count + 1)]
+
+
+def _resolution(table: array[int], brightness: int) -> int:
+    """Return the largest step of a zone table next to a brightness."""
+    neighbours = range(max(1, brightness - 1), min(255, brightness + 1) + 1)
+    return max(abs(table[value] - table[brightness]) for value in neighbours)
+
+
+PLANS = (
+    [
+        pytest.param(
+            {const.CONF_ZONE_LIGHTS: _zone_lights(zone_count)},
+            id=f"{zone_count}-zones",
+        )
+        for zone_count in range(1, const.MAX_ZONES + 1)
+    ]
+    + [
+        pytest.param(
+            {
+                const.CONF_ZONE_LIGHTS: _zone_lights(4),
+                const.CONF_BRIGHTNESS_CURVE: curve,
+            },
+            id=curve,
+        )
+        for curve in (const.CURVE_QUADRATIC, const.CURVE_CUBIC)
+    ]
+    + [
+        pytest.param(
+            {
+                const.CONF_ZONE_LIGHTS: _zone_lights(2),
+                const.CONF_BRIGHTNESS_CURVE: const.CURVE_QUADRATIC,
+                const.CONF_BREAKPOINTS: [10],
+            },
+            id="2-zones-early-breakpoint",
+        ),
+        pytest.param(
+            {
+                const.CONF_ZONE_LIGHTS: _zone_lights(3),
+                const.CONF_BREAKPOINTS: [5, 95],
+                const.CONF_ZONE_BRIGHTNESS_RANGES: [
+                    [[1, 100], [100, 100], [100, 100]],
+                    [[0, 0], [1, 100], [100, 100]],
+                    [[0, 0], [0, 0], [50, 100]],
+                ],
+            },
+            id="3-zones-narrow-stages",
+        ),
+        pytest.param(
+            {
+                const.CONF_ZONE_LIGHTS: _zone_lights(2),
+                const.CONF_BREAKPOINTS: [20, 40, 60, 80],
+                const.CONF_ZONE_BRIGHTNESS_RANGES: [
+                    [[1, 20], [20, 40], [40, 60], [60, 80], [80, 100]],
+                    [[0, 0], [0, 0], [1, 30], [30, 60], [60, 100]],
+                ],
+            },
+            id="5-stages",
+        ),
+    ]
+)
+
+
+@pytest.mark.parametrize("data", PLANS)
+def test_estimate_reproduces_zone_values(data: dict[str, Any]) -> None:
+    """The estimate of any slider position gives back its zone values."""
+    plan = zone_plan.compile_zone_plan(data)
+
+    for brightness in range(1, 256):
+        zone_values = [table[brightness] for table in plan.zone_tables]
+        estimate = plan.estimate_brightness(zone_values)
+        if not any(zone_values):
+            assert estimate is None
+            continue
+        assert estimate is not None
+        for table in plan.zone_tables:
+            assert abs(table[estimate] - table[brightness]) <= _resolution(
+                table, brightness
+            ), (brightness, estimate)
+
+
+@pytest.mark.parametrize(
+    ("options", "message"),
+    [
+        ({const.CONF_BREAKPOINTS: [50, 25, 75]}, "ascending"),
+        ({const.CONF_BREAKPOINTS: [0, 50, 75]}, "between 1 and 99"),
+        ({const.CONF_BREAKPOINTS: [25, 50, 100]}, "between 1 and 99"),
+        (
+            {const.CONF_ZONE_BRIGHTNESS_RANGES: [[[1, 100]] * 4] * 3},
+            "for 4 zones, got 3",
+        ),
+        ({const.CONF_BREAKPOINTS: [50]}, "Zone 1 needs 2 brightness ranges"),
+        (
+            {
+                const.CONF_ZONE_BRIGHTNESS_RANGES: [[[1, 100]] * 4] * 3
+                + [[[60, 40]] * 4]
+            },
+            "Zone 4, stage 1",
+        ),
+        (
+            {const.CONF_ZONE_BRIGHTNESS_RANGES: [[[0, 101]] * 4] * 4},
+            "0 <= min <= max <= 100",
+        ),
+        ({const.CONF_BRIGHTNESS_CURVE: "exponential"}, "Unknown brightness curve"),
+    ],
+)
+def test_invalid_zone_config(options: dict[str, Any], message: str) -> None:
+    """Invalid zones and stages are rejected with a message saying why."""
+    with pytest.raises(ValueError, match=message):
+        zone_plan.compile_zone_plan(
+            {const.CONF_ZONE_LIGHTS: _zone_lights(4), **options}
+        )
+
+
+def test_default_stages_follow_the_zones() -> None:
+    """Without breakpoints and ranges every zone adds a stage."""
+    for zone_count in range(2, const.MAX_ZONES + 1):
+        plan = zone_plan.compile_zone_plan(
+            {const.CONF_ZONE_LIGHTS: _zone_lights(zone_count)}
+        )
+
+        assert len(plan.breakpoints) == zone_count - 1
+        # The last zone only comes on in the last stage
+        assert plan.zone_tables[-1][1] == 0
+        assert all(table[255] == 255 for table in plan.zone_tables)
+
+
+@pytest.mark.parametrize(
+    ("min_pct", "max_pct", "gamma", "off_threshold"),
+    [(0, 100, 1.0, 0), (3, 90, 1.0, 1), (10, 60, 2.2, 5), (1, 100, 0.5, 0)],
+)
+def test_calibration_table(
+    min_pct: float, max_pct: float, gamma: float, off_threshold: float
+) -> None:
+    """Zone brightness maps onto the light's own range, never backwards."""
+    table = zone_plan.calibration_table(min_pct, max_pct, gamma, off_threshold)
+
+    assert table[0] == 0
+    assert table[255] == round(max_pct / 100 * 255)
+    for value in range(1, 256):
+        if value / 255 * 100 < off_threshold:
+            assert table[value] == 0
+        else:
+            assert table[value] >= max(1, round(min_pct / 100 * 255))
+        assert table[value] >= table[value - 1]
+
+
+def test_calibration_is_folded_into_the_targets() -> None:
+    """Calibrated lights get their own value, alike ones share one table."""
+    calibration = {"min": 3, "max": 90, "off_threshold": 2}
+    plan = zone_plan.compile_zone_plan(
+        {
+            const.CONF_ZONE_LIGHTS: [["light.strip", "light.bulb", "light.spot"]],
+            const.CONF_LIGHT_CALIBRATION: {
+                "light.strip": calibration,
+                "light.spot": calibration,
+            },
+        }
+    )
+    table = plan.light_calibration["light.strip"]
+
+    assert plan.light_calibration["light.spot"] is table
+    for brightness in range(1, 256):
+        zone_value = plan.zone_tables[0][brightness]
+        assert plan.light_targets(brightness) == {
+            "light.strip": table[zone_value],
+            "light.bulb": zone_value,
+            "light.spot": table[zone_value],
+        }
+
+
+def test_calibration_inverse_reproduces_the_light() -> None:
+    """A calibrated light's brightness is read back as its zone brightness."""
+    plan = zone_plan.compile_zone_plan(
+        {
+            const.CONF_ZONE_LIGHTS: [["light.strip"]],
+            const.CONF_LIGHT_CALIBRATION: {
+                "light.strip": {"min": 10, "max": 60, "gamma": 2.2}
+            },
+        }
+    )
+    table = plan.light_calibration["light.strip"]
+    inverse = plan.calibration_inverse["light.strip"]
+
+    for zone_value in range(1, 256):
+        assert table[inverse[table[zone_value]]] == table[zone_value]
+    # Brightness the light never gets is read as the nearest it does
+    assert table[inverse[255]] == table[255]
+    assert table[inverse[1]] == table[1]
+
+
+@pytest.mark.parametrize(
+    ("calibration", "message"),
+    [
+        ({"light.other": {}}, "in no zone"),
+        ({"light.zone_1": 50}, "must be a mapping"),
+        ({"light.zone_1": {"minimum": 3}}, "Unknown calibration settings"),
+        ({"light.zone_1": {"min": 80, "max": 20}}, "0 <= min <= max <= 100"),
+        ({"light.zone_1": {"max": 0}}, "max > 0"),
+        ({"light.zone_1": {"gamma": 0}}, "gamma must be positive"),
+        ({"light.zone_1": {"off_threshold": 120}}, "off threshold"),
+        (["light.zone_1"], "must map entity ids"),
+    ],
+)
+def test_invalid_calibration(calibration: Any, message: str) -> None:
+    """Invalid calibrations are rejected with a message saying why."""
+    with pytest.raises(ValueError, match=message):
+        zone_plan.compile_zone_plan(
+            {
+                const.CONF_ZONE_LIGHTS: _zone_lights(2),
+                const.CONF_LIGHT_CALIBRATION: calibration,
+            }
+        )